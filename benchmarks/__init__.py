@@ -0,0 +1,4 @@
+"""
+Contains benchmarks to measure the performance of the homepage app. The benchmarks are no unit tests and are run
+manually, e.g. `python -m benchmarks.bench_version_group --help`.
+"""
@@ -0,0 +1,198 @@
+"""
+Load test comparing the WSGI and the ASGI deployment (see `start-server.sh`). Both servers are started by gunicorn with
+the same number of worker processes on a synthetic data set (see `test_data/scale.py`): The sync workers of gunicorn
+serving `pulp_science.wsgi` and the uvicorn workers serving `pulp_science.asgi`. Then the pages of the article feed are
+requested by an increasing number of concurrent connections and the throughput and latencies are reported.
+The sync workers handle one request at a time. To show the effect of a database server on another host, every query
+can be delayed by `--query-latency`.
+
+Usage: python -m benchmarks.bench_asgi --workers 3 --concurrency 1,16,64 --query-latency 2
+"""
+import asyncio
+import os
+import socket
+import subprocess  # nosec
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import click
+
+from benchmarks.utils import benchmark_database, percentile, setup_django
+
+setup_django()
+
+# pylint: disable=wrong-import-position,wrong-import-order
+from django.db import connection
+from django.urls import reverse
+
+from homepage import feed
+from homepage.models import Article, Category
+from test_data.scale import generate_scaled_test_data
+
+REPOSITORY = Path(__file__).parent.parent
+SERVERS = {
+    "wsgi": ["pulp_science.wsgi"],
+    "asgi": ["pulp_science.asgi:application", "--worker-class", "uvicorn.workers.UvicornWorker"],
+}
+"The arguments of gunicorn by the names of the deployments"
+SETTINGS_TEMPLATE = """
+from {settings} import *
+
+DEBUG = False
+ALLOWED_HOSTS = ["127.0.0.1"]
+DATABASES["default"]["NAME"] = {name!r}
+HOMEPAGE_PROFILING = False
+
+from benchmarks.utils import add_query_latency
+
+add_query_latency({latency!r})
+"""
+"The settings of the servers. They use the database of the benchmark."
+
+
+def get_urls(pages: int) -> list[str]:
+    """
+    Returns the URLs of the first pages of the feed of all articles and of every category. Only the first page for
+    anonymous users is cached, the further pages are rendered by every request.
+    """
+    urls = []
+    articles = Article.objects.visible_to(None)
+    for category in [None, *Category.objects.all()]:
+        url = reverse("homepage:index", kwargs={} if category is None else {"active_category": category.name})
+        urls.append(url)
+        cursor = feed.get_feed_page(articles, category).next_cursor
+        for _ in range(pages - 1):
+            if cursor is None:
+                break
+            urls.append(f"{url}?after={cursor}")
+            cursor = feed.get_feed_page(articles, category, cursor).next_cursor
+    return urls
+
+
+def get_free_port() -> int:
+    """
+    Returns a free TCP port of localhost.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def run_server(name: str, workers: int, settings_directory: str) -> Iterator[int]:
+    """
+    Starts gunicorn with the deployment `name` and stops it afterwards.
+    :return: The port of the server
+    """
+    port = get_free_port()
+    environment = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": "benchmark_settings",
+        "PYTHONPATH": os.pathsep.join([settings_directory, str(REPOSITORY)]),
+    }
+    command = [sys.executable, "-m", "gunicorn", *SERVERS[name], "--bind", f"127.0.0.1:{port}"]
+    command += ["--workers", str(workers), "--log-level", "warning"]
+    with subprocess.Popen(command, cwd=REPOSITORY, env=environment) as server:  # nosec
+        try:
+            deadline = time.monotonic() + 30
+            while asyncio.run(request(port, "/"))[0] != 200:
+                if server.poll() is not None or time.monotonic() > deadline:
+                    raise click.ClickException(f"The {name} server didn't start")
+                time.sleep(0.2)
+            yield port
+        finally:
+            server.terminate()
+            server.wait()
+
+
+async def request(port: int, url: str) -> tuple[int, float]:
+    """
+    Requests the URL by a new connection (the sync workers of gunicorn don't support keep-alive).
+    :return: The status code (0 if the connection failed) and the latency in seconds
+    """
+    start = time.perf_counter()
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    except OSError:
+        return 0, time.perf_counter() - start
+    try:
+        writer.write(f"GET {url} HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n\r\n".encode("ascii"))
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    status = int(response.split(b" ", 2)[1]) if response.startswith(b"HTTP/") else 0
+    return status, time.perf_counter() - start
+
+
+async def load(port: int, urls: list[str], concurrency: int, duration: float) -> dict:
+    """
+    Requests the URLs round-robin by `concurrency` concurrent clients for `duration` seconds.
+    :return: The throughput, the latency percentiles in milliseconds and the number of failed requests
+    """
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def client(offset: int) -> None:
+        nonlocal errors
+        index = offset
+        while time.perf_counter() < deadline:
+            status, latency = await request(port, urls[index % len(urls)])
+            index += concurrency
+            if status == 200:
+                latencies.append(latency)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(offset) for offset in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000 if latencies else float("nan"),
+        "p95_ms": percentile(latencies, 95) * 1000 if latencies else float("nan"),
+        "errors": errors,
+    }
+
+
+@click.command()
+@click.option("--scale", default=0.05, help="Scale of the synthetic data set (see test_data/generate_test_data.py).")
+@click.option("--workers", default=3, help="Number of worker processes of both servers.")
+@click.option("--concurrency", default="1,8,32", help="Comma separated numbers of concurrent connections.")
+@click.option("--duration", default=10.0, help="Seconds of load per server and concurrency.")
+@click.option("--pages", default=3, help="Number of feed pages requested per category.")
+@click.option("--query-latency", default=0.0, help="Delay of every database query in milliseconds.")
+def main(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    scale: float, workers: int, concurrency: str, duration: float, pages: int, query_latency: float
+):
+    """
+    Compare the throughput of the WSGI and the ASGI deployment under concurrent load.
+    """
+    levels = [int(level) for level in concurrency.split(",")]
+    with benchmark_database() as database_name, tempfile.TemporaryDirectory() as settings_directory:
+        generate_scaled_test_data(scale, seed=42, batch_size=5000)
+        urls = get_urls(pages)
+        # The servers are other processes. On SQLite, they can only read the data after it is committed.
+        connection.close()
+        settings = SETTINGS_TEMPLATE.format(
+            settings=os.environ["DJANGO_SETTINGS_MODULE"], name=database_name, latency=query_latency / 1000
+        )
+        Path(settings_directory, "benchmark_settings.py").write_text(settings, encoding="utf-8")
+        print(f"{len(urls)} URLs, {workers} workers, query latency {query_latency}ms")
+        for name in SERVERS:
+            with run_server(name, workers, settings_directory) as port:
+                for level in levels:
+                    result = asyncio.run(load(port, urls, level, duration))
+                    print(
+                        f"{name} concurrency={level:<4} throughput={result['throughput']:.1f}/s "
+                        f"p50={result['p50_ms']:.1f}ms p95={result['p95_ms']:.1f}ms errors={result['errors']}"
+                    )
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,116 @@
+"""
+Benchmarks the cost of opening a database connection per request compared with persistent connections (see the
+database settings of `pulp_science/settings_production.py`). The requests are handled by django's WSGI handler like
+by a gunicorn worker, i.e. the connections are closed at the end of a request unless they are persistent. Run it
+against Postgres to include the TCP and authentication handshakes:
+DJANGO_SETTINGS_MODULE=pulp_science.settings_production python -m benchmarks.bench_connections
+
+The connection pool of django >= 5.1 is measured as well if it is available.
+"""
+import statistics
+from typing import Optional
+
+import click
+import django
+
+from benchmarks.utils import benchmark_database, format_durations, measure, setup_django
+
+setup_django()
+
+# pylint: disable=wrong-import-position,wrong-import-order
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+
+from homepage import feed
+from homepage.models import Article
+from test_data.scale import generate_scaled_test_data
+
+MODES: dict[str, dict] = {
+    "new connection per request": {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False},
+    "persistent": {"CONN_MAX_AGE": None, "CONN_HEALTH_CHECKS": False},
+    "persistent with health checks": {"CONN_MAX_AGE": None, "CONN_HEALTH_CHECKS": True},
+    "pool": {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False, "OPTIONS": {"pool": {"min_size": 1, "max_size": 2}}},
+}
+"The database settings of the measured modes"
+
+
+def supports_pool() -> bool:
+    """
+    Returns true if the database backend supports connection pools (Postgres with psycopg 3 and django >= 5.1).
+    """
+    return django.VERSION >= (5, 1) and connection.vendor == "postgresql" and connection.psycopg_version()[0] >= 3
+
+
+def configure(mode: dict) -> None:
+    """
+    Closes the connection and changes its settings. The next request opens a connection with the new settings.
+    """
+    connection.close()
+    if "pool" in connection.settings_dict.get("OPTIONS", {}):
+        connection.close_pool()
+    options = {key: value for key, value in connection.settings_dict.get("OPTIONS", {}).items() if key != "pool"}
+    connection.settings_dict.update({**mode, "OPTIONS": {**options, **mode.get("OPTIONS", {})}})
+    # The pool is cached by the connection
+    connection.__dict__.pop("pool", None)
+
+
+def measure_mode(handler: WSGIHandler, url: str, repeat: int) -> list[float]:
+    """
+    Requests the URL `repeat` times by the WSGI handler.
+    """
+    factory = RequestFactory()
+
+    def request():
+        result: Optional[str] = None
+
+        def start_response(status, headers):  # pylint: disable=unused-argument
+            nonlocal result
+            result = status
+
+        response = handler(factory.get(url).environ, start_response)
+        b"".join(response)
+        # Closing the response sends `request_finished` which closes connections that aren't persistent
+        response.close()
+        if result != "200 OK":
+            raise click.ClickException(f"{url} responded with {result}")
+
+    request()
+    return measure(request, repeat)
+
+
+@click.command()
+@click.option("--scale", default=0.01, help="Scale of the synthetic data set (see test_data/generate_test_data.py).")
+@click.option("--repeat", default=500, help="Number of measured requests per mode.")
+def main(scale: float, repeat: int):
+    """
+    Measure the latency of requests with a new, a persistent or a pooled database connection.
+    """
+    setup_test_environment()
+    with benchmark_database():
+        generate_scaled_test_data(scale, seed=42, batch_size=5000)
+        # The second page of the feed isn't cached, i.e. every request queries the database
+        cursor = feed.get_feed_page(Article.objects.visible_to(None), None).next_cursor
+        url = f"{reverse('homepage:index')}?after={cursor}"
+        handler = WSGIHandler()
+        saved_settings = {key: connection.settings_dict.get(key) for key in ("CONN_MAX_AGE", "CONN_HEALTH_CHECKS")}
+        saved_settings["OPTIONS"] = dict(connection.settings_dict.get("OPTIONS", {}))
+        baseline = None
+        try:
+            for name, mode in MODES.items():
+                if name == "pool" and not supports_pool():
+                    print(f"{name:<32} skipped (requires Postgres, psycopg 3 and django >= 5.1)")
+                    continue
+                configure(mode)
+                durations = measure_mode(handler, url, repeat)
+                mean = statistics.fmean(durations)
+                baseline = mean if baseline is None else baseline
+                print(f"{name:<32} {format_durations(durations)} saved={(baseline - mean) * 1000:.3f}ms/request")
+        finally:
+            configure(saved_settings)
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
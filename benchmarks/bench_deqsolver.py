@@ -0,0 +1,64 @@
+"""
+Benchmarks the server-side integration of the deqsolver widget (see `homepage/deqsolver.py`). It measures the cost per
+trajectory when integrating batches of initial conditions at once and the cost of streaming cached trajectories.
+
+Usage: python -m benchmarks.bench_deqsolver --system lorenz --frames 500 --batch-sizes 1,8,64
+"""
+import statistics
+from functools import partial
+
+import click
+import numpy as np
+
+from benchmarks.utils import format_durations, measure, setup_django
+
+setup_django()
+
+# pylint: disable=wrong-import-position,wrong-import-order
+from django.core.cache import cache
+
+from homepage import deqsolver
+
+
+def create_problem(system: str, tableau: str, batch_size: int, frames: int, steps_per_frame: int) -> deqsolver.Problem:
+    """
+    Returns a problem with `batch_size` random initial conditions near 1.
+    """
+    dimension = deqsolver.SYSTEMS[system].dimension
+    y0 = 1 + 0.1 * np.random.default_rng(42).random((batch_size, dimension))
+    return deqsolver.create_problem(system, tableau, 0.01, y0.tolist(), frames, steps_per_frame=steps_per_frame)
+
+
+def stream(problem: deqsolver.Problem, cached: bool) -> None:
+    """
+    Consumes the chunks of the trajectories of the problem. The cache is cleared before unless `cached` is true.
+    """
+    if not cached:
+        cache.clear()
+    list(deqsolver.get_trajectory_chunks(problem))
+
+
+@click.command()
+@click.option("--system", default="lorenz", type=click.Choice(list(deqsolver.SYSTEMS)), help="The integrated system.")
+@click.option("--tableau", default="rk4", type=click.Choice(list(deqsolver.TABLEAUS)), help="The Butcher tableau.")
+@click.option("--frames", default=500, help="Number of frames per trajectory.")
+@click.option("--steps-per-frame", default=4, help="Number of steps between two frames.")
+@click.option("--batch-sizes", default="1,8,64", help="Comma separated numbers of trajectories integrated at once.")
+@click.option("--repeat", default=5, help="Number of measured integrations per batch size.")
+def main(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    system: str, tableau: str, frames: int, steps_per_frame: int, batch_sizes: str, repeat: int
+):
+    """
+    Measure the integration of batches of trajectories and the streaming of cached trajectories.
+    """
+    for batch_size in [int(size) for size in batch_sizes.split(",")]:
+        problem = create_problem(system, tableau, batch_size, frames, steps_per_frame)
+        durations = measure(partial(stream, problem, cached=False), repeat)
+        per_trajectory = statistics.fmean(durations) / batch_size * 1000
+        print(f"batch={batch_size:<4} computed {format_durations(durations)} per trajectory={per_trajectory:.3f}ms")
+        cached = measure(partial(stream, problem, cached=True), repeat)
+        print(f"batch={batch_size:<4} cached   {format_durations(cached)}")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,168 @@
+"""
+Benchmarks the pages of the homepage app and the change lists of the admin on a large synthetic data set (see
+`test_data/scale.py`). Every page is requested with an empty cache, so the numbers reflect the work of the backend.
+The latency percentiles and query counts can be stored as baseline. Later runs are compared with the baseline and
+fail if a page needs more queries or its p95 latency regressed beyond the threshold.
+
+Usage:
+python -m benchmarks.bench_requests --scale 1 --save-baseline
+python -m benchmarks.bench_requests --scale 1
+"""
+import json
+from pathlib import Path
+from typing import Optional
+
+import click
+
+from benchmarks.utils import benchmark_database, measure, percentile, setup_django
+
+setup_django()
+
+# pylint: disable=wrong-import-position,wrong-import-order
+from django.contrib import admin
+from django.contrib.auth.models import User as AuthUser  # pylint: disable=imported-auth-user
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment
+from django.urls import reverse
+
+from test_data.scale import generate_scaled_test_data
+
+BASELINE_DIRECTORY = Path(__file__).parent / "baselines"
+
+
+def get_pages(client: Client) -> dict[str, str]:
+    """
+    Returns the URLs of the benchmarked pages of the homepage app by their names.
+    """
+    response = client.get(reverse("homepage:index"))
+    pages = {
+        "index": reverse("homepage:index"),
+        "index page 2": f"{reverse('homepage:index')}?after={response.context['next_cursor']}",
+        "category": reverse("homepage:index", kwargs={"active_category": "physics"}),
+        "login": reverse("auth:login"),
+    }
+    return pages
+
+
+def get_admin_pages() -> dict[str, str]:
+    """
+    Returns the URLs of the change lists of all models registered in the admin by their names.
+    """
+    pages = {}
+    for model in admin.site._registry:  # pylint: disable=protected-access
+        pages[f"admin {model._meta.model_name}"] = reverse(
+            f"admin:{model._meta.app_label}_{model._meta.model_name}_changelist"
+        )
+    return pages
+
+
+def measure_page(client: Client, url: str, repeat: int) -> dict:
+    """
+    Requests the page `repeat` times with an empty cache.
+    :return: The number of queries of a request and the latency percentiles in milliseconds
+    """
+
+    def request():
+        cache.clear()
+        response = client.get(url)
+        if response.status_code != 200:
+            raise click.ClickException(f"{url} responded with status {response.status_code}")
+
+    # The query log is limited. It has to be cleared as the generation of the data set may have filled it.
+    connection.queries_log.clear()
+    with CaptureQueriesContext(connection) as queries:
+        request()
+    durations = measure(request, repeat)
+    return {
+        "queries": len(queries),
+        "p50_ms": round(percentile(durations, 50) * 1000, 3),
+        "p95_ms": round(percentile(durations, 95) * 1000, 3),
+    }
+
+
+def compare(results: dict, baseline: dict, latency_threshold: float) -> list[str]:
+    """
+    Compares the results with the baseline.
+    :return: The descriptions of the regressions
+    """
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if result["queries"] > expected["queries"]:
+            regressions.append(f"{name}: {result['queries']} queries instead of {expected['queries']}")
+        if result["p95_ms"] > expected["p95_ms"] * (1 + latency_threshold):
+            regressions.append(f"{name}: p95 {result['p95_ms']:.1f}ms instead of {expected['p95_ms']:.1f}ms")
+    return regressions
+
+
+def run(scale: float, seed: int, repeat: int) -> tuple[dict, str]:
+    """
+    Generates the data set and measures all pages.
+    :return: The results by the names of the pages and the vendor of the database
+    """
+    setup_test_environment()
+    with benchmark_database():
+        generate_scaled_test_data(scale, seed, batch_size=5000)
+        anonymous = Client()
+        staff = Client()
+        staff.force_login(AuthUser.objects.create_superuser(username="benchmark"))
+        pages = [(anonymous, get_pages(anonymous), ""), (staff, get_pages(staff), " (staff)")]
+        pages.append((staff, get_admin_pages(), ""))
+        results = {}
+        for client, urls, suffix in pages:
+            for name, url in urls.items():
+                result = measure_page(client, url, repeat)
+                results[name + suffix] = result
+                print(
+                    f"{name + suffix:<32} queries={result['queries']:<4} "
+                    f"p50={result['p50_ms']:.3f}ms p95={result['p95_ms']:.3f}ms"
+                )
+        return results, connection.vendor
+
+
+@click.command()
+@click.option("--scale", default=0.1, help="Scale of the synthetic data set (see test_data/generate_test_data.py).")
+@click.option("--seed", default=42, help="Seed of the synthetic data set.")
+@click.option("--repeat", default=20, help="Number of measured requests per page.")
+@click.option("--baseline", "baseline_path", type=click.Path(path_type=Path), help="Path of the baseline file.")
+@click.option("--save-baseline", is_flag=True, help="Store the results as new baseline instead of comparing them.")
+@click.option("--latency-threshold", default=0.25, help="Allowed relative increase of the p95 latencies.")
+def main(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    scale: float,
+    seed: int,
+    repeat: int,
+    baseline_path: Optional[Path],
+    save_baseline: bool,
+    latency_threshold: float,
+):
+    """
+    Measure the latency and the number of queries of the pages and compare them with the baseline.
+    """
+    results, vendor = run(scale, seed, repeat)
+    baseline_path = baseline_path or BASELINE_DIRECTORY / f"bench_requests_{vendor}.json"
+    parameters = {"scale": scale, "seed": seed, "vendor": vendor}
+    if save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps({**parameters, "pages": results}, indent=2) + "\n", encoding="utf-8")
+        print(f"Stored baseline {baseline_path}")
+        return
+    if not baseline_path.exists():
+        print(f"No baseline {baseline_path} to compare with. Store one by --save-baseline.")
+        return
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    if {key: baseline.get(key) for key in parameters} != parameters:
+        raise click.ClickException(f"The baseline was measured with other parameters: {baseline_path}")
+    regressions = compare(results, baseline["pages"], latency_threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        raise click.ClickException(f"{len(regressions)} regressions compared with {baseline_path}")
+    print(f"No regressions compared with {baseline_path}")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,117 @@
+"""
+Benchmarks the storage of article revisions.
+An article with a long content is edited many times with small changes. The benchmark compares the storage used by
+the table of the articles (measured by the database before and after the revisions are created) and the latency of
+reading the head and an old revision with and without deltas. It supports SQLite and Postgres.
+
+Usage: python -m benchmarks.bench_revisions --revisions 200 --paragraphs 400
+"""
+import random
+
+import click
+
+from benchmarks.utils import benchmark_database, format_durations, measure, setup_django
+
+setup_django()
+
+# pylint: disable=wrong-import-position,wrong-import-order
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import override_settings
+
+from homepage.models import Article
+
+TABLE_SIZE_QUERIES = {
+    # The table including its indexes and the TOAST table of the long contents
+    "postgresql": "SELECT pg_total_relation_size(to_regclass(%s))",
+    # The pages of the table and of its indexes (dbstat is included in the SQLite builds of Python)
+    "sqlite": "SELECT SUM(pgsize) FROM dbstat WHERE name IN (SELECT name FROM sqlite_master WHERE tbl_name = %s)",
+}
+"The queries of the number of bytes used by a table by the database vendors"
+
+
+def get_table_size() -> int:
+    """
+    Returns the number of bytes used by the table of the articles. The space of deleted rows is reclaimed before.
+    """
+    if connection.vendor not in TABLE_SIZE_QUERIES:
+        raise click.ClickException(f"The storage can't be measured on {connection.vendor}")
+    table = Article._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(f"VACUUM FULL {connection.ops.quote_name(table)}")
+        else:
+            cursor.execute("VACUUM")
+        cursor.execute(TABLE_SIZE_QUERIES[connection.vendor], [table])
+        return cursor.fetchone()[0]
+
+
+def edit(rng: random.Random, paragraphs: list[str]) -> list[str]:
+    """
+    Changes, inserts or removes a few paragraphs like an author would do.
+    """
+    paragraphs = list(paragraphs)
+    for _ in range(rng.randint(1, 3)):
+        index = rng.randrange(len(paragraphs))
+        action = rng.random()
+        if action < 0.6:
+            paragraphs[index] = paragraphs[index] + f" Edited {rng.random():.6f}."
+        elif action < 0.8:
+            paragraphs.insert(index, f"New paragraph {rng.random():.6f}.")
+        elif len(paragraphs) > 1:
+            del paragraphs[index]
+    return paragraphs
+
+
+def run(revisions: int, paragraphs: int, keyframe_interval: int, repeat: int) -> None:
+    """
+    Creates the revisions and prints the stored size and the read latencies.
+    """
+    rng = random.Random(42)
+    text = [f"Paragraph {index}: " + "Lorem ipsum dolor sit amet. " * 12 for index in range(paragraphs)]
+    with override_settings(HOMEPAGE_REVISION_KEYFRAME_INTERVAL=keyframe_interval):
+        size_before = get_table_size()
+        article = Article(title="Benchmark", content="\n".join(text))
+        article.save()
+        for _ in range(revisions - 1):
+            text = edit(rng, text)
+            article = article.new_version()
+            article.content = "\n".join(text)
+            article.save()
+
+        size = get_table_size() - size_before
+        old_revision = Article.objects.get(version_group=article.version_group, version_number=revisions // 2 + 1)
+
+        def read_head():
+            Article.objects.latest_versions().get(version_group=article.version_group).get_content()
+
+        def read_old_cold():
+            cache.clear()
+            Article.objects.get(pk=old_revision.pk).get_content()
+
+        def read_old_warm():
+            Article.objects.get(pk=old_revision.pk).get_content()
+
+        print(f"keyframe interval {keyframe_interval}: {revisions} revisions use {size / 1024:.0f} KiB")
+        print(f"  read head:                 {format_durations(measure(read_head, repeat))}")
+        print(f"  read old revision (cold):  {format_durations(measure(read_old_cold, repeat))}")
+        print(f"  read old revision (warm):  {format_durations(measure(read_old_warm, repeat))}")
+        Article.objects.all().delete()
+
+
+@click.command()
+@click.option("--revisions", default=200, help="Number of revisions of the article.")
+@click.option("--paragraphs", default=400, help="Number of paragraphs of the initial content.")
+@click.option("--keyframe-interval", default=16, help="Keyframe interval of the delta storage.")
+@click.option("--repeat", default=50, help="Number of measured reads.")
+def main(revisions: int, paragraphs: int, keyframe_interval: int, repeat: int):
+    """
+    Compare full text storage (keyframe interval 1) with the delta storage.
+    """
+    with benchmark_database():
+        run(revisions, paragraphs, keyframe_interval=1, repeat=repeat)
+        run(revisions, paragraphs, keyframe_interval=keyframe_interval, repeat=repeat)
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,145 @@
+"""
+Benchmarks the full-text search.
+A corpus of synthetic articles is inserted by raw SQL and indexed. The words of the texts follow a Zipf distribution
+like natural language, so the benchmark covers rare and very common terms. The search latency is compared with a
+naive `icontains` filter which has to scan all articles.
+
+Usage: python -m benchmarks.bench_search --articles 100000
+"""
+import random
+import time
+from datetime import timedelta
+
+import click
+
+from benchmarks.utils import benchmark_database, format_durations, measure, setup_django
+
+setup_django()
+
+# pylint: disable=wrong-import-position,wrong-import-order
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+
+from homepage import search
+from homepage.models import Article, Category, Commentable, Versionable, Visibility
+from homepage.sequences import VERSION_GROUP_SEQUENCE, next_values
+from test_data.scale import make_vocabulary, zipf_cum_weights
+
+BATCH_SIZE = 1000
+
+
+def insert_articles(count: int, words_per_article: int, vocabulary: list[str], rng: random.Random) -> None:
+    # pylint: disable=too-many-locals
+    """
+    Inserts `count` public or registered-only articles with random texts and categories by raw SQL.
+    """
+    # Zipf distribution: The n-th most frequent word appears 1/n as often as the most frequent one.
+    cum_weights = zipf_cum_weights(len(vocabulary))
+    commentable_type = ContentType.objects.get_for_model(Article).pk
+    categories = list(Category.objects.values_list("pk", flat=True))
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT COALESCE(MAX(commentable_id), 0) FROM homepage_commentable")
+        next_commentable = cursor.fetchone()[0] + 1
+        cursor.execute("SELECT COALESCE(MAX(versionable_id), 0) FROM homepage_versionable")
+        next_versionable = cursor.fetchone()[0] + 1
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM homepage_article")
+        next_article = cursor.fetchone()[0] + 1
+    for start in range(0, count, BATCH_SIZE):
+        size = min(BATCH_SIZE, count - start)
+        version_groups = next_values(VERSION_GROUP_SEQUENCE, size)
+        commentables, versionables, articles, article_categories = [], [], [], []
+        for offset, version_group in enumerate(version_groups):
+            number = start + offset
+            title = " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=6)).capitalize()
+            content = " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=words_per_article))
+            visibility = Visibility.PUBLIC if rng.random() < 0.8 else Visibility.USER
+            commentables.append((next_commentable + number, commentable_type, 0, 0))
+            versionables.append(
+                (next_versionable + number, commentable_type, version_group, 1, now - timedelta(minutes=number), True)
+            )
+            articles.append(
+                (
+                    next_article + number,
+                    title,
+                    content,
+                    visibility,
+                    next_versionable + number,
+                    next_commentable + number,
+                )
+            )
+            article_categories.append((next_article + number, rng.choice(categories)))
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(
+                "INSERT INTO homepage_commentable (commentable_id, commentable_type_id, like_count, comment_count) "
+                "VALUES (%s, %s, %s, %s)",
+                commentables,
+            )
+            cursor.executemany(
+                "INSERT INTO homepage_versionable "
+                "(versionable_id, versionable_type_id, version_group, version_number, created, is_latest) "
+                "VALUES (%s, %s, %s, %s, %s, %s)",
+                versionables,
+            )
+            cursor.executemany(
+                "INSERT INTO homepage_article "
+                "(id, title, content, visibility, versionable_ptr_id, commentable_ptr_id) "
+                "VALUES (%s, %s, %s, %s, %s, %s)",
+                articles,
+            )
+            cursor.executemany(
+                "INSERT INTO homepage_article_related_categories (article_id, category_id) VALUES (%s, %s)",
+                article_categories,
+            )
+    # The IDs were set explicitly. Sequences (e.g. of PostgreSQL) have to continue after them.
+    with connection.cursor() as cursor:
+        for statement in connection.ops.sequence_reset_sql(no_style(), [Commentable, Versionable, Article]):
+            cursor.execute(statement)
+
+
+@click.command()
+@click.option("--articles", default=100_000, help="Number of synthetic articles.")
+@click.option("--words", default=150, help="Number of words per article.")
+@click.option("--vocabulary", "vocabulary_size", default=20_000, help="Number of distinct words.")
+@click.option("--repeat", default=50, help="Number of measured searches per query.")
+def main(articles: int, words: int, vocabulary_size: int, repeat: int):
+    """
+    Measure the latency of the full-text search on a synthetic corpus.
+    """
+    rng = random.Random(42)
+    vocabulary = make_vocabulary(rng, vocabulary_size)
+    with benchmark_database():
+        start = time.perf_counter()
+        insert_articles(articles, words, vocabulary, rng)
+        print(f"inserted {articles} articles in {time.perf_counter() - start:.1f}s")
+        start = time.perf_counter()
+        indexed = search.rebuild_index(batch_size=BATCH_SIZE)
+        print(f"indexed {indexed} documents in {time.perf_counter() - start:.1f}s")
+
+        physics = Category.objects.get(name="physics")
+        queries = {
+            "common term": {"query": vocabulary[0]},
+            "medium term": {"query": vocabulary[100]},
+            "rare term": {"query": vocabulary[-1]},
+            "two terms": {"query": f"{vocabulary[3]} {vocabulary[50]}"},
+            "registered user": {"query": vocabulary[100], "is_registered": True},
+            "category filter": {"query": vocabulary[100], "categories": [physics]},
+            "second page": {"query": vocabulary[0], "offset": 20},
+        }
+        for name, kwargs in queries.items():
+            hits = len(search.search(**kwargs))  # type: ignore[arg-type]
+            durations = measure(lambda kwargs=kwargs: search.search(**kwargs), repeat)  # type: ignore[misc]
+            print(f"search {name:<16} ({hits:>2} results): {format_durations(durations)}")
+
+        def scan():
+            # Like the search, the scan has to find all matches before it can return the best (here: newest) ones.
+            articles = Article.objects.filter(content__icontains=vocabulary[-1]).order_by("-created")
+            list(articles.defer("content")[:20])
+
+        print(f"icontains scan (baseline):       {format_durations(measure(scan, max(repeat // 10, 1)))}")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
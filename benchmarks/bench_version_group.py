@@ -0,0 +1,99 @@
+"""
+Benchmarks the allocation of `version_group`s under concurrent writers.
+Several processes insert comments into the same database at the same time. The benchmark compares the sequence based
+allocator with the former `MAX(version_group) + 1` approach which needs retries on collisions.
+
+Usage: python -m benchmarks.bench_version_group --processes 4 --inserts 500
+"""
+import multiprocessing
+import time
+
+import click
+
+from benchmarks.utils import benchmark_database, setup_django
+
+setup_django()
+
+# pylint: disable=wrong-import-position,wrong-import-order
+from django.db import IntegrityError, OperationalError, connections, models, transaction
+
+from homepage.models import Article, Comment, Versionable
+
+
+def allocate_legacy(comment: Comment) -> None:
+    """
+    The former allocation strategy: Scan for the maximum version group.
+    """
+    max_version_group = Versionable.objects.aggregate(models.Max("version_group"))["version_group__max"]
+    comment.version_group = max_version_group + 1 if max_version_group is not None else 1
+
+
+def insert_comments(article_id: int, inserts: int, legacy: bool, results) -> None:
+    """
+    Inserts `inserts` comments on the article. Puts the number of needed retries into `results`.
+    Failed inserts are retried until they succeed.
+    """
+    connections.close_all()
+    article = Article.objects.get(id=article_id)
+    retries = 0
+    for index in range(inserts):
+        while True:
+            comment = Comment(content=f"Comment {index}", commented_on=article)
+            try:
+                with transaction.atomic():
+                    if legacy:
+                        allocate_legacy(comment)
+                    comment.save()
+                break
+            except (IntegrityError, OperationalError):
+                # IntegrityError: Another process allocated the same version group.
+                # OperationalError: On SQLite, the read-then-write transaction can't be upgraded to a write lock.
+                retries += 1
+    results.put(retries)
+    connections.close_all()
+
+
+def run(processes: int, inserts: int, legacy: bool) -> None:
+    """
+    Runs the benchmark with the given parameters and prints the results.
+    """
+    article = Article(title="Benchmark", content="Benchmark")
+    article.save()
+    connections.close_all()
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    workers = [
+        context.Process(target=insert_comments, args=(article.id, inserts, legacy, results)) for _ in range(processes)
+    ]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    duration = time.perf_counter() - start
+    retries = sum(results.get() for _ in workers)
+    total = processes * inserts
+    distinct_groups = Comment.objects.values("version_group").distinct().count()
+    print(
+        f"{'legacy' if legacy else 'sequence'}: {total} inserts by {processes} processes in {duration:.2f}s "
+        f"({total / duration:.0f} inserts/s), {retries} retries, {distinct_groups} distinct version groups"
+    )
+
+
+@click.command()
+@click.option("--processes", default=4, help="Number of concurrent writer processes.")
+@click.option("--inserts", default=500, help="Number of inserts per process.")
+@click.option("--legacy/--no-legacy", default=True, help="Also benchmark the former MAX() + 1 allocation.")
+def main(processes: int, inserts: int, legacy: bool):
+    """
+    Benchmark the version group allocation with several writer processes.
+    """
+    with benchmark_database():
+        run(processes, inserts, legacy=False)
+    if legacy:
+        with benchmark_database():
+            run(processes, inserts, legacy=True)
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
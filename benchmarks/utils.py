@@ -0,0 +1,100 @@
+"""
+Contains helper functions shared by all benchmarks.
+"""
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+
+import django
+
+
+def setup_django() -> None:
+    """
+    Configure django to use the settings module of the project. Must be called before importing any models.
+    The settings module can be overridden by the environment variable `DJANGO_SETTINGS_MODULE`.
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "pulp_science.settings")
+    django.setup()
+
+
+@contextmanager
+def benchmark_database() -> Iterator[str]:
+    """
+    Creates a fresh and migrated database for the benchmark and destroys it afterwards.
+    On SQLite the database is written to a temporary file (instead of the in-memory database used by the unittests)
+    to be able to share it between several processes.
+    :return: The name of the database
+    """
+    # pylint: disable=import-outside-toplevel
+    from django.db import connection
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if connection.vendor == "sqlite":
+            connection.settings_dict["TEST"]["NAME"] = str(Path(temp_dir) / "benchmark.sqlite3")
+            connection.settings_dict["OPTIONS"]["timeout"] = 60
+        old_name = connection.settings_dict["NAME"]
+        name = connection.creation.create_test_db(
+            verbosity=0,
+            autoclobber=True,
+            serialize=False,
+        )
+        try:
+            yield name
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def measure(func: Callable[[], object], repeat: int) -> list[float]:
+    """
+    Calls `func` `repeat` times and returns the durations of each call in seconds.
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """
+    Returns the `percent` percentile of `values` (e.g. `percent=95` for the p95).
+    """
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(percent) - 1]
+
+
+def format_durations(durations: list[float]) -> str:
+    """
+    Returns a human-readable summary of the durations (in milliseconds).
+    """
+    return (
+        f"mean={statistics.fmean(durations) * 1000:.3f}ms "
+        f"p50={percentile(durations, 50) * 1000:.3f}ms "
+        f"p95={percentile(durations, 95) * 1000:.3f}ms "
+        f"n={len(durations)}"
+    )
+
+
+def add_query_latency(seconds: float) -> None:
+    """
+    Delays every database query by `seconds` to simulate a database server on another host. It is applied to all
+    connections opened after the call.
+    """
+    # pylint: disable=import-outside-toplevel
+    from django.db.backends.signals import connection_created
+
+    def delay(execute, sql, params, many, context):  # pylint: disable=too-many-arguments
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def install(connection, **kwargs):  # pylint: disable=unused-argument
+        if delay not in connection.execute_wrappers:
+            connection.execute_wrappers.append(delay)
+
+    connection_created.connect(install, weak=False)
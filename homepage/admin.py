@@ -1,18 +1,304 @@
 """
 Register your models here.
+The admins are tuned for tables with millions of rows:
+- The change lists load the related objects of a page at once (`list_select_related`, polymorphic resolution) and show
+  the counters of the entities instead of counting their relations.
+- The number of rows of unfiltered change lists is estimated by the statistics of the database
+  (`EstimatedCountPaginator`) and the total number of rows isn't counted for filtered ones.
+- Only indexed columns are sortable and the searches use indexes: prefix matches of indexed columns or the full-text
+  index of `homepage.search`.
+- The relations are edited by autocomplete or raw ID widgets instead of selects listing all rows.
 """
 # pylint: disable=unused-import
+from typing import Optional
+
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Count, OuterRef, QuerySet, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.functional import cached_property
+
+from homepage import models, search
+
+DEFAULT_EXACT_COUNT_LIMIT = 10000
+DEFAULT_SEARCH_LIMIT = 100
+ESTIMATE_QUERIES = {
+    "postgresql": "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)",
+    # The statistics exist after running ANALYZE. Every row of a table starts with its number of rows.
+    "sqlite": "SELECT CAST(stat AS INTEGER) FROM sqlite_stat1 WHERE tbl = %s LIMIT 1",
+}
+"The queries of the estimated number of rows of a table by the database vendors"
+
+
+def get_exact_count_limit() -> int:
+    """
+    Tables with fewer (estimated) rows are counted exactly. It can be configured by the setting
+    `HOMEPAGE_ADMIN_EXACT_COUNT_LIMIT`.
+    """
+    return getattr(settings, "HOMEPAGE_ADMIN_EXACT_COUNT_LIMIT", DEFAULT_EXACT_COUNT_LIMIT)
+
+
+def get_search_limit() -> int:
+    """
+    The maximum number of articles or projects found by a full-text search in the admin. They are the best matching
+    ones. It can be configured by the setting `HOMEPAGE_ADMIN_SEARCH_LIMIT`.
+    """
+    return getattr(settings, "HOMEPAGE_ADMIN_SEARCH_LIMIT", DEFAULT_SEARCH_LIMIT)
+
+
+def estimate_count(queryset) -> Optional[int]:
+    """
+    Returns the number of rows of an unfiltered queryset estimated by the statistics of the database. Returns None if
+    the queryset is filtered or there are no statistics.
+    """
+    if not isinstance(queryset, QuerySet):
+        return None
+    query = queryset.query
+    if query.where or query.distinct or query.combinator or query.is_sliced:
+        return None
+    connection = connections[queryset.db]
+    if connection.vendor not in ESTIMATE_QUERIES:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(ESTIMATE_QUERIES[connection.vendor], [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        # SQLite has no statistics table before the first ANALYZE
+        return None
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator which estimates the number of rows of large unfiltered tables instead of counting them. Counting all
+    rows needs a scan of the whole table (or index) on most databases.
+    """
+
+    @cached_property
+    def count(self) -> int:
+        """
+        The total number of objects. It is estimated if there are at least `get_exact_count_limit()` objects.
+        """
+        estimate = estimate_count(self.object_list)
+        if estimate is not None and estimate >= get_exact_count_limit():
+            return estimate
+        return super().count
+
+
+class ScalableChangeList(ChangeList):
+    """
+    Change list which resolves the concrete subclasses of a whole page at once. Otherwise, the `__str__` method of
+    every row of a polymorphic model (or of a polymorphic related object) would query its concrete subclass
+    separately. The fields of `ScalableAdmin.list_defer` aren't loaded.
+    """
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer(*self.model_admin.list_defer)
+
+    def get_results(self, request):
+        super().get_results(request)
+        if issubclass(self.model, models.PolymorphicMixin):
+            models.resolve_concrete(self.result_list)
+        for field in self.model_admin.list_polymorphic_related:
+            models.resolve_concrete(filter(None, (getattr(row, field) for row in self.result_list)))
+
+
+class ScalableAdmin(admin.ModelAdmin):
+    """
+    Base class of the admins (see the module documentation).
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    sortable_by: tuple[str, ...] = ()
+    "Only indexed columns are sortable. The change lists are ordered by the primary key by default."
+    list_defer: tuple[str, ...] = ()
+    "The (large) fields which aren't loaded by the change list."
+    list_polymorphic_related: tuple[str, ...] = ()
+    "The polymorphic related objects whose concrete types are resolved per page. Add them to `list_select_related`."
+
+    def get_changelist(self, request, **kwargs):
+        return ScalableChangeList
+
+
+class FullTextSearchAdmin(ScalableAdmin):
+    """
+    Admin of the models indexed by the full-text search (see `homepage.search`). Only the best matching entities are
+    found (see `get_search_limit()`). Only the newest version of an article is indexed.
+    """
+
+    search_fields = ["title"]
+    "Enables the search. The search uses the full-text index instead of the fields (see `get_search_results`)."
+    search_document_field = ""
+    "The field of `SearchDocument` referencing the model of the admin"
+
+    def get_search_results(self, request, queryset, search_term):
+        terms = search.get_terms(search_term)
+        if not terms:
+            return queryset, False
+        documents = models.SearchDocument.objects.filter(**{f"{self.search_document_field}__isnull": False})
+        matches = search.get_backend(queryset.db).search(terms, documents, get_search_limit(), 0)
+        return queryset.filter(search_document__in=[document_id for document_id, _, _ in matches]), False
+
+
+def count_related(through, field: str, **filters) -> Coalesce:
+    """
+    Returns a subquery counting the rows of `through` referencing the outer row by `field`. Unlike an aggregation
+    joining all rows, it is only evaluated for the rows of the page.
+    """
+    counted = through.objects.filter(**{field: OuterRef("pk")}, **filters).order_by().values(field)
+    return Coalesce(Subquery(counted.annotate(count=Count("pk")).values("count")), 0)
+
+
+class PolymorphicAdmin(ScalableAdmin):
+    """
+    Admin for the polymorphic super classes `Versionable`, `Commentable` and `Followable`.
+    """
+
+
+class TagAdmin(ScalableAdmin):
+    """
+    Admin for the tags. The numbers of tagged articles (newest versions) and projects are counted per page.
+    """
+
+    list_display = ["name", "article_count", "project_count"]
+    sortable_by = ("name",)
+    search_fields = ["name__startswith"]
+    related_field = "related_tags"
+    "The many-to-many field of the articles and projects referencing the model of the admin"
+
+    def get_queryset(self, request):
+        article_relation = getattr(models.Article, self.related_field).through
+        project_relation = getattr(models.Project, self.related_field).through
+        field = self.model._meta.model_name
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                article_count=count_related(article_relation, field, article__is_latest=True),
+                project_count=count_related(project_relation, field),
+            )
+        )
+
+    @admin.display(description="articles")
+    def article_count(self, obj) -> int:
+        """
+        The number of articles (newest versions) referencing the object.
+        """
+        return obj.article_count
+
+    @admin.display(description="projects")
+    def project_count(self, obj) -> int:
+        """
+        The number of projects referencing the object.
+        """
+        return obj.project_count
+
+
+class CategoryAdmin(TagAdmin):
+    """
+    Admin for the categories. The numbers of articles (newest versions) and projects are counted per page.
+    """
+
+    related_field = "related_categories"
+
+
+class UserAdmin(ScalableAdmin):
+    """
+    Admin for the users. The followed and liked entities are edited by their IDs.
+    """
+
+    list_display = ["alias", "name", "follower_count", "like_count", "comment_count"]
+    search_fields = ["alias__startswith"]
+    raw_id_fields = ["follows", "likes"]
+
+
+class CommentAdmin(ScalableAdmin):
+    """
+    Admin for the comments. They are found by the alias of their authors.
+    """
+
+    list_display = ["__str__", "written_by", "commented_on", "version_number", "is_latest", "created", "like_count"]
+    list_select_related = ["written_by", "commented_on"]
+    list_polymorphic_related = ("commented_on",)
+    search_fields = ["written_by__alias__startswith"]
+    raw_id_fields = ["commented_on", "written_by"]
+
+
+class ProjectAdmin(FullTextSearchAdmin):
+    """
+    Admin for the projects.
+    """
+
+    list_display = ["title", "visibility", "article_count", "follower_count", "like_count", "comment_count"]
+    list_filter = ["visibility"]
+    list_defer = ("description",)
+    autocomplete_fields = ["related_authors", "related_tags"]
+    search_document_field = "project"
+
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(article_count=count_related(models.Article, "related_project", is_latest=True))
+        )
+
+    @admin.display(description="articles")
+    def article_count(self, obj) -> int:
+        """
+        The number of articles (newest versions) of this project.
+        """
+        return obj.article_count
+
+
+class ArticleAdmin(FullTextSearchAdmin):
+    """
+    Admin for the articles. Every version is a row.
+    """
+
+    list_display = [
+        "title",
+        "version_group",
+        "version_number",
+        "is_latest",
+        "visibility",
+        "related_project",
+        "created",
+        "like_count",
+        "comment_count",
+    ]
+    list_select_related = ["related_project"]
+    list_filter = ["visibility"]
+    list_defer = ("content", "content_delta", "related_project__description")
+    sortable_by = ("version_group",)
+    autocomplete_fields = ["related_project", "related_authors", "related_tags"]
+    search_document_field = "article"
+
+
+class TimelineEntryAdmin(ScalableAdmin):
+    """
+    Admin for the timeline entries. Their `__str__` method shows the owner.
+    """
+
+    list_select_related = ["owner"]
+    search_fields = ["owner__alias__startswith"]
+    raw_id_fields = ["owner", "item", "source"]
 
-from homepage import models
 
 # Register your models here.
-admin.site.register(models.Followable)
-admin.site.register(models.Commentable)
-admin.site.register(models.Versionable)
-admin.site.register(models.Tag)
-admin.site.register(models.Category)
-admin.site.register(models.Comment)
-admin.site.register(models.User)
-admin.site.register(models.Project)
-admin.site.register(models.Article)
+admin.site.register(models.Followable, PolymorphicAdmin)
+admin.site.register(models.Commentable, PolymorphicAdmin)
+admin.site.register(models.Versionable, PolymorphicAdmin)
+admin.site.register(models.Tag, TagAdmin)
+admin.site.register(models.Category, CategoryAdmin)
+admin.site.register(models.Comment, CommentAdmin)
+admin.site.register(models.User, UserAdmin)
+admin.site.register(models.Project, ProjectAdmin)
+admin.site.register(models.Article, ArticleAdmin)
+admin.site.register(models.TimelineEntry, TimelineEntryAdmin)
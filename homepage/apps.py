@@ -11,3 +11,13 @@ class HomepageConfig(AppConfig):
 
     name = "homepage"
     default_auto_field = "django.db.models.BigAutoField"
+
+    def ready(self) -> None:
+        """
+        Build the subclass registry once the models are loaded and connect the signal receivers.
+        """
+        # pylint: disable=import-outside-toplevel,unused-import
+        from homepage import signals
+        from homepage.registry import subclass_registry
+
+        subclass_registry.populate(self.get_models())
@@ -0,0 +1,173 @@
+"""
+Contains the build stage of the static assets. It runs when `collectstatic` post-processes the files:
+- The scripts and stylesheets of every page are concatenated and minified into bundles (see `DEFAULT_BUNDLES`). Local
+  `@import`s of the stylesheets are inlined.
+- All files (including the bundles) get content-hashed names by django's `ManifestStaticFilesStorage`.
+- The compressible files are precompressed to `.gz` and `.br` siblings, so nginx serves them without compressing
+  them on every request (`gzip_static`).
+The templates include the bundles by the `bundle` tag of `homepage.templatetags.assets`. Without the bundling storage
+(e.g. with the development server), the tag includes the source files instead.
+"""
+import gzip
+import posixpath
+import re
+from typing import Iterator
+
+import brotli
+import rcssmin
+import rjsmin
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.files.base import ContentFile
+
+DEFAULT_BUNDLES = {
+    "homepage/css/base.bundle.css": ["homepage/css/main_base.css"],
+    "homepage/css/index.bundle.css": ["homepage/css/main_index.css"],
+    "homepage/js/base.bundle.js": [
+        "homepage/js/jquery-3.4.1.min.js",
+        "homepage/js/breakpoints.js",
+        "homepage/js/timedhover.js",
+        "homepage/js/dropdown.js",
+    ],
+    "homepage/js/index.bundle.js": ["homepage/js/navbar.js", "homepage/js/main.js"],
+}
+"""
+The source files of the bundles by the names of the bundles. A bundle is stored next to its sources, so relative URLs
+(e.g. of fonts) stay valid.
+"""
+COMPRESSED_EXTENSIONS = (".css", ".js", ".svg", ".eot", ".ttf", ".json", ".txt", ".map")
+"The files which are precompressed. Images and web fonts like WOFF are compressed already."
+
+IMPORT_PATTERN = re.compile(r"""@import\s+(?:url\()?\s*["']?([^"')\s]+)["']?\s*\)?([^;]*);""")
+URL_PATTERN = re.compile(r"""url\(\s*(["']?)([^"')]+)\1\s*\)""")
+
+
+def get_bundles() -> dict[str, list[str]]:
+    """
+    The source files of the bundles by the names of the bundles. It can be configured by the setting
+    `HOMEPAGE_BUNDLES`.
+    """
+    return getattr(settings, "HOMEPAGE_BUNDLES", DEFAULT_BUNDLES)
+
+
+def is_bundled() -> bool:
+    """
+    Returns true if the static files are built by `BundlingStaticFilesStorage`, i.e. the bundles exist.
+    """
+    return isinstance(staticfiles_storage, BundlingStaticFilesStorage)
+
+
+def _is_relative(url: str) -> bool:
+    return not re.match(r"^(?:[a-z]+:|/|#)", url)
+
+
+def _rebase_urls(css: str, source: str, bundle: str) -> str:
+    # Rewrites the relative URLs of a stylesheet included into a bundle in another directory
+    def rebase(match: re.Match) -> str:
+        url = match.group(2)
+        if not _is_relative(url):
+            return match.group(0)
+        target = posixpath.normpath(posixpath.join(posixpath.dirname(source), url))
+        return f'url("{posixpath.relpath(target, posixpath.dirname(bundle))}")'
+
+    return URL_PATTERN.sub(rebase, css)
+
+
+def concatenate_css(read, sources: list[str], bundle: str) -> str:
+    """
+    Concatenates stylesheets and inlines their local imports. Imports of other hosts are moved to the beginning as
+    CSS ignores imports after other rules.
+    :param read: Returns the content of a static file by its name
+    """
+    external_imports: list[str] = []
+    included: set[str] = set()
+
+    def include(source: str) -> str:
+        if source in included:
+            return ""
+        included.add(source)
+
+        css = read(source)
+        parts = []
+        position = 0
+        for match in IMPORT_PATTERN.finditer(css):
+            parts.append(_rebase_urls(css[position : match.start()], source, bundle))
+            position = match.end()
+            url, media = match.group(1), match.group(2).strip()
+            if _is_relative(url) and not media:
+                parts.append(include(posixpath.normpath(posixpath.join(posixpath.dirname(source), url))))
+            else:
+                external_imports.append(_rebase_urls(match.group(0), source, bundle))
+        parts.append(_rebase_urls(css[position:], source, bundle))
+        return "".join(parts)
+
+    body = "\n".join(include(source) for source in sources)
+    return "\n".join([*external_imports, body])
+
+
+def build_bundle(read, name: str, sources: list[str]) -> str:
+    """
+    Returns the minified bundle of the sources.
+    :param read: Returns the content of a static file by its name
+    """
+    if name.endswith(".css"):
+        return rcssmin.cssmin(concatenate_css(read, sources, name), keep_bang_comments=True)
+    # The semicolons terminate scripts relying on automatic semicolon insertion
+    return "\n;".join(rjsmin.jsmin(read(source), keep_bang_comments=True) for source in sources)
+
+
+def compress(content: bytes, brotli_quality: int = 11) -> dict[str, bytes]:
+    """
+    Returns the gzip and brotli compressions of the content by their file extensions.
+    """
+    return {
+        ".gz": gzip.compress(content, compresslevel=9, mtime=0),
+        ".br": brotli.compress(content, quality=brotli_quality),
+    }
+
+
+class BundlingStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Builds the bundles, hashes the file names and precompresses the files (see the module documentation).
+    """
+
+    patterns = (("*.css", ManifestStaticFilesStorage.patterns[0][1][:2]),)
+    """
+    The patterns of the references to other files which are replaced by their hashed names: `url()` and `@import` of
+    stylesheets. The references to source maps are skipped as the source maps compiled by sass aren't committed.
+    """
+    keep_intermediate_files = False
+    brotli_quality = 11
+    "The quality of the brotli compression. The highest quality is slow, but the files are only compressed once."
+
+    def post_process(self, *args, **kwargs) -> Iterator[tuple]:
+        """
+        Post-processes the collected files. It is called by `collectstatic` with the collected files.
+        """
+        paths, dry_run = args[0], kwargs.get("dry_run", False)
+        if not dry_run:
+            for name, sources in get_bundles().items():
+                content = build_bundle(self._read, name, sources)
+                if self.exists(name):
+                    self.delete(name)
+                self.save(name, ContentFile(content.encode("utf-8")))
+                paths[name] = (self, name)
+        yield from super().post_process(*args, **kwargs)
+        if not dry_run:
+            for name in set(self.hashed_files.values()):
+                if name.endswith(COMPRESSED_EXTENSIONS):
+                    self._compress(name)
+
+    def _read(self, name: str) -> str:
+        with self.open(name) as file:
+            return file.read().decode("utf-8")
+
+    def _compress(self, name: str) -> None:
+        with self.open(name) as file:
+            content = file.read()
+        for extension, compressed in compress(content, self.brotli_quality).items():
+            # Compressing tiny files can make them larger
+            if len(compressed) < len(content):
+                if self.exists(name + extension):
+                    self.delete(name + extension)
+                self.save(name + extension, ContentFile(compressed))
@@ -0,0 +1,185 @@
+"""
+Contains the caches of the homepage app. All caches are stored in the cache backend configured in the settings,
+i.e. they are shared by all workers if the backend is shared.
+The functions used by the async views have async variants prefixed by `a` like the async interfaces of django.
+"""
+import asyncio
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, TypedDict
+
+from django.core.cache import cache
+from django.db import connections
+from django.urls import reverse
+from django.utils.translation import get_language
+
+from homepage.models import Category
+
+CATEGORY_NAV_KEY = "homepage:category-nav"
+CATEGORIES_VERSION_KEY = "homepage:categories-version"
+PAGE_GENERATION_KEY = "homepage:page-generation"
+
+_categories: tuple[Optional[str], dict[str, Category]] = (None, {})
+"The categories of this process by name and the version they were loaded with."
+_loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="categories")
+"Loads the categories if they are requested by the event loop (see `get_categories`)."
+
+
+class CategoryNavEntry(TypedDict):
+    """
+    An entry of the category navigation. The active state is not included as it depends on the request.
+    """
+
+    name: str
+    label: str
+    link: str
+
+
+def get_categories() -> dict[str, Category]:
+    """
+    Returns all categories by name. The categories are kept in the memory of this process. Only a version stamp is
+    read from the cache backend to detect if another process changed the categories. In this case (and only then)
+    the categories are loaded from the database again.
+    """
+    global _categories  # pylint: disable=global-statement
+    version = cache.get(CATEGORIES_VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(CATEGORIES_VERSION_KEY, version, None):
+            version = cache.get(CATEGORIES_VERSION_KEY)
+    loaded_version, categories = _categories
+    if version != loaded_version:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            categories = _load_categories()
+        else:
+            # The URL converters are called by the event loop if the app is served by ASGI. They can't be async and
+            # the ORM can't be used by the event loop. The rare reloads block the loop while a thread queries them.
+            categories = _loader.submit(_load_categories_in_thread).result()
+        _categories = (version, categories)
+    return categories
+
+
+def _load_categories() -> dict[str, Category]:
+    return {category.name: category for category in Category.objects.all()}
+
+
+def _load_categories_in_thread() -> dict[str, Category]:
+    try:
+        return _load_categories()
+    finally:
+        connections.close_all()
+
+
+def _create_nav_entry(category: Category) -> CategoryNavEntry:
+    return CategoryNavEntry(
+        name=category.name,
+        label=category.name.capitalize(),
+        link=reverse("homepage:index", kwargs={"active_category": category.name}),
+    )
+
+
+def get_category_nav() -> list[CategoryNavEntry]:
+    """
+    Returns the entries of the category navigation. They are computed once and cached until a category changes.
+    """
+    entries = cache.get(CATEGORY_NAV_KEY)
+    if entries is None:
+        entries = [_create_nav_entry(category) for category in Category.objects.all()]
+        cache.set(CATEGORY_NAV_KEY, entries, None)
+    return entries
+
+
+async def aget_category_nav() -> list[CategoryNavEntry]:
+    """
+    Async variant of `get_category_nav`.
+    """
+    entries = await cache.aget(CATEGORY_NAV_KEY)
+    if entries is None:
+        entries = [_create_nav_entry(category) async for category in Category.objects.all()]
+        await cache.aset(CATEGORY_NAV_KEY, entries, None)
+    return entries
+
+
+def get_page_generation() -> str:
+    """
+    Returns the current generation of the cached pages. Every cached page is stored under a key containing the
+    generation. A new generation invalidates all cached pages at once. The generations are random and never repeat,
+    so pages of an old generation can't become valid again if the generation is evicted from the cache.
+    """
+    generation = cache.get(PAGE_GENERATION_KEY)
+    if generation is None:
+        generation = uuid.uuid4().hex
+        if not cache.add(PAGE_GENERATION_KEY, generation, None):
+            generation = cache.get(PAGE_GENERATION_KEY)
+    return generation
+
+
+def invalidate_pages() -> None:
+    """
+    Invalidates all cached pages.
+    """
+    cache.set(PAGE_GENERATION_KEY, uuid.uuid4().hex, None)
+
+
+def invalidate_categories() -> None:
+    """
+    Invalidates the categories of all processes, the category navigation and all pages containing it.
+    """
+    cache.set(CATEGORIES_VERSION_KEY, uuid.uuid4().hex, None)
+    cache.delete(CATEGORY_NAV_KEY)
+    invalidate_pages()
+
+
+def _get_page_key(name: str, category: Optional[Category], audience: str) -> str:
+    category_name = category.name if category is not None else ""
+    return f"homepage:page:{get_page_generation()}:{name}:{category_name}:{get_language()}:{audience}"
+
+
+def get_cached_page(name: str, category: Optional[Category], audience: str = "anonymous") -> Optional[bytes]:
+    """
+    Returns the cached rendering of the page `name` or None if it isn't cached.
+    :param audience: The users the page is rendered for ("anonymous" or "registered"). The rendering must not contain
+        anything specific to a single user (see `homepage.fragments`).
+    """
+    return cache.get(_get_page_key(name, category, audience))
+
+
+def set_cached_page(name: str, category: Optional[Category], audience: str, content: bytes) -> None:
+    """
+    Caches the rendering of the page `name` for an audience until the pages get invalidated.
+    """
+    cache.set(_get_page_key(name, category, audience), content, None)
+
+
+async def aget_cached_page(name: str, category: Optional[Category], audience: str = "anonymous") -> Optional[bytes]:
+    """
+    Async variant of `get_cached_page`.
+    """
+    return await cache.aget(await _aget_page_key(name, category, audience))
+
+
+async def aset_cached_page(name: str, category: Optional[Category], audience: str, content: bytes) -> None:
+    """
+    Async variant of `set_cached_page`.
+    """
+    await cache.aset(await _aget_page_key(name, category, audience), content, None)
+
+
+async def aget_page_generation() -> str:
+    """
+    Async variant of `get_page_generation`.
+    """
+    generation = await cache.aget(PAGE_GENERATION_KEY)
+    if generation is None:
+        generation = uuid.uuid4().hex
+        if not await cache.aadd(PAGE_GENERATION_KEY, generation, None):
+            generation = await cache.aget(PAGE_GENERATION_KEY)
+    return generation
+
+
+async def _aget_page_key(name: str, category: Optional[Category], audience: str) -> str:
+    category_name = category.name if category is not None else ""
+    generation = await aget_page_generation()
+    return f"homepage:page:{generation}:{name}:{category_name}:{get_language()}:{audience}"
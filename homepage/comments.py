@@ -0,0 +1,77 @@
+"""
+Contains the loading of discussions, i.e. all comments (of any depth) under a commentable which is no comment.
+Every comment stores its materialized path (see `Comment.path`). Therefore, a page of a discussion is loaded by a
+single range scan on the index of (thread_root, path), regardless of how deep the discussion is nested.
+The discussion of a versioned commentable (e.g. an article) spans all its versions: Every version is the thread root
+of the comments written while it was the newest one. The paths are unique across the versions, so the discussion is
+ordered depth-first as well.
+"""
+from typing import NamedTuple, Optional, Union
+
+from django.conf import settings
+from django.db.models import F, QuerySet, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from homepage.models import Comment, Commentable, Versionable
+
+DEFAULT_PAGE_SIZE = 20
+PATH_END = "~"
+"A character sorting after all characters used in the paths. `path + PATH_END` is greater than all sub-paths."
+
+
+class ThreadPage(NamedTuple):
+    """
+    A page of a discussion.
+    """
+
+    comments: list[Comment]
+    "The comments ordered depth-first. The nesting level is given by `Comment.depth`."
+    next_cursor: Optional[str]
+    "The cursor to fetch the next page or None if this is the last page."
+
+
+def get_page_size() -> int:
+    """
+    The number of top level comments per page. It can be configured by the setting `HOMEPAGE_THREAD_PAGE_SIZE`.
+    """
+    return getattr(settings, "HOMEPAGE_THREAD_PAGE_SIZE", DEFAULT_PAGE_SIZE)
+
+
+def get_thread_roots(root: Commentable) -> Union[list[int], QuerySet]:
+    """
+    Returns the IDs of the thread roots of the discussion under `root`: The commentable IDs of all versions of a
+    versioned commentable or the ID of `root` otherwise.
+    """
+    if isinstance(root, Versionable):
+        return root.__class__.objects.filter(version_group=root.version_group).values("commentable_ptr_id")
+    return [root.commentable_id]
+
+
+def get_thread_page(root: Commentable, cursor: Optional[str] = None) -> ThreadPage:
+    """
+    Returns the newest versions of the comments of a page of the discussion under `root`. A page consists of a number
+    of top level comments and all their replies. Needs a single query.
+    :param root: The commentable at the top of the discussion, e.g. an article
+    :param cursor: The cursor of the previous page or None for the first page. It is the path of the last top level
+        comment of the previous page.
+    """
+    page_size = get_page_size()
+    thread_roots = get_thread_roots(root)
+    comments = Comment.objects.latest_versions().filter(thread_root_id__in=thread_roots)
+    lower_bound = "" if cursor is None else cursor + PATH_END
+    # The page ends with the first top level comment of the next page (without its replies). It is only fetched to
+    # tell whether there is a next page. Top level comments comment on their root.
+    next_top_level = (
+        Comment.objects.latest_versions()
+        .filter(thread_root_id__in=thread_roots, commented_on_id=F("thread_root_id"), path__gt=lower_bound)
+        .order_by("path")
+        .values("path")[page_size : page_size + 1]
+    )
+    comments = comments.filter(
+        path__gt=lower_bound, path__lte=Coalesce(Subquery(next_top_level), Value(PATH_END))
+    ).order_by("path")
+    page = list(comments)
+    top_level = [comment for comment in page if comment.commented_on_id == comment.thread_root_id]
+    if len(top_level) > page_size:
+        return ThreadPage(page[:-1], top_level[page_size - 1].path)
+    return ThreadPage(page, None)
@@ -1,8 +1,7 @@
 """
 Contains custom converters to convert custom types in URL parameters.
 """
-from django.db.utils import OperationalError
-
+from homepage import caching
 from homepage.models import Category
 
 
@@ -11,30 +10,23 @@ class CategoryConverter:
     Converter for Model `Category`.
     """
 
-    @property
-    def regex(self) -> str:
-        """
-        Returns a regex string to match all categories.
-        It is implemented as property because Django calls like `python manage.py migrate` will fail if the database
-        has no table `homepage_category` yet. This is because this property is called during the migration process
-        (idk why, some initialization process of Django I guess).
-        """
-        try:
-            return "|".join([category.name for category in Category.objects.all()])
-        except OperationalError as error:
-            if "no such table" not in str(error):
-                raise
-            return ""
+    regex = "[^/]+"
+    """
+    Matches any category name. The regex can't contain the names of the categories as Django compiles it only once
+    per process. Unknown categories are rejected by `to_python` instead.
+    """
 
     def to_python(self, value: str) -> Category:
         """
         Converts provided parameter to Category enum instance.
+        The categories are cached in the memory of each process (see `caching.get_categories`), i.e. this doesn't
+        query the database.
         :param value: Provided URL parameter as string
         :return: The corresponding `Category` enum object
         """
         try:
-            return Category.objects.get(name=value.lower())
-        except Category.DoesNotExist as error:
+            return caching.get_categories()[value.lower()]
+        except KeyError as error:
             raise ValueError(f"Unknown category {value.lower()}") from error
 
     def to_url(self, value: str) -> str:
@@ -0,0 +1,180 @@
+"""
+Contains the denormalized counters of the homepage app: `Commentable.like_count`, `Commentable.comment_count` and
+`Followable.follower_count`. They are updated by the signal receivers in `homepage.signals`.
+The increments are buffered in the memory of the process and written in batches: All pending increments of one
+counter are merged into a single UPDATE. This way, a popular entity doesn't lock its row for every single like.
+An increment is buffered once the transaction changing the relation is committed, i.e. rolled back likes or comments
+aren't counted. The buffer is flushed when it is full or when the flush interval elapsed (checked by every increment
+and at the end of every request) and at exit. Thus, the increments of many requests are written together.
+Flushing the counters shown by the pages invalidates the cached pages (see `homepage.caching`).
+"""
+import atexit
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from homepage import caching
+from homepage.models import Comment, Commentable, Followable, User
+
+DEFAULT_FLUSH_SIZE = 100
+DEFAULT_FLUSH_INTERVAL = 5.0
+DISPLAYED_COUNTERS = ("like_count", "comment_count")
+"The counters shown by the cached pages"
+
+
+def get_flush_size() -> int:
+    """
+    The number of pending counters which triggers a flush. It can be configured by the setting
+    `HOMEPAGE_COUNTER_FLUSH_SIZE`. A size of 1 writes every increment immediately.
+    """
+    return getattr(settings, "HOMEPAGE_COUNTER_FLUSH_SIZE", DEFAULT_FLUSH_SIZE)
+
+
+def get_flush_interval() -> float:
+    """
+    The maximum number of seconds increments are buffered. It can be configured by the setting
+    `HOMEPAGE_COUNTER_FLUSH_INTERVAL`.
+    """
+    return getattr(settings, "HOMEPAGE_COUNTER_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL)
+
+
+class CounterBuffer:
+    """
+    A thread safe buffer of counter increments.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pending: dict[tuple[type[models.Model], str, int], int] = defaultdict(int)
+        self._last_flush = time.monotonic()
+
+    def add(self, model: type[models.Model], field: str, pk: int, delta: int) -> None:
+        """
+        Buffers an increment (or a decrement if `delta` is negative) of the counter `field` of the row `pk` once the
+        current transaction is committed. Flushes the buffer if it is due.
+        """
+        transaction.on_commit(lambda: self._add(model, field, pk, delta))
+
+    def _add(self, model: type[models.Model], field: str, pk: int, delta: int) -> None:
+        with self._lock:
+            self._pending[(model, field, pk)] += delta
+        self.flush_if_due()
+
+    def flush_if_due(self) -> None:
+        """
+        Writes all pending increments if the buffer is full or the flush interval elapsed.
+        """
+        with self._lock:
+            due = len(self._pending) >= get_flush_size() or (
+                self._pending and time.monotonic() - self._last_flush >= get_flush_interval()
+            )
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes all pending increments. Rows with the same increment are updated by the same query. Invalidates the
+        cached pages if a counter shown by them changed.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(int)
+            self._last_flush = time.monotonic()
+        batches: dict[tuple[type[models.Model], str, int], list[int]] = defaultdict(list)
+        for (model, field, pk), delta in pending.items():
+            if delta != 0:
+                batches[(model, field, delta)].append(pk)
+        for (model, field, delta), pks in batches.items():
+            # The counters can't become negative, even if they drifted.
+            value = F(field) + delta if delta > 0 else Greatest(F(field) + delta, Value(0))
+            model.objects.filter(pk__in=pks).update(**{field: value})
+        if any(field in DISPLAYED_COUNTERS for _, field, _ in batches):
+            caching.invalidate_pages()
+
+
+counter_buffer = CounterBuffer()
+"The counter buffer of this process."
+
+atexit.register(counter_buffer.flush)
+
+
+def add_likes(commentable_ids, delta: int) -> None:
+    """
+    Adds `delta` to the like counters of the commentables.
+    """
+    for commentable_id in commentable_ids:
+        counter_buffer.add(Commentable, "like_count", commentable_id, delta)
+
+
+def add_comments(commentable_ids, delta: int) -> None:
+    """
+    Adds `delta` to the comment counters of the commentables.
+    """
+    for commentable_id in commentable_ids:
+        counter_buffer.add(Commentable, "comment_count", commentable_id, delta)
+
+
+def add_followers(followable_ids, delta: int) -> None:
+    """
+    Adds `delta` to the follower counters of the followables.
+    """
+    for followable_id in followable_ids:
+        counter_buffer.add(Followable, "follower_count", followable_id, delta)
+
+
+def flush() -> None:
+    """
+    Writes all pending increments of this process.
+    """
+    counter_buffer.flush()
+
+
+def flush_if_due() -> None:
+    """
+    Writes all pending increments of this process if the buffer is full or the flush interval elapsed.
+    """
+    counter_buffer.flush_if_due()
+
+
+def _count(queryset: models.QuerySet, field: str) -> Coalesce:
+    counts = queryset.filter(**{field: OuterRef("pk")}).order_by().values(field).annotate(count=Count("pk"))
+    return Coalesce(Subquery(counts.values("count")), 0)
+
+
+def _get_actual_counts() -> list[tuple[type[models.Model], str, Coalesce]]:
+    return [
+        (Commentable, "like_count", _count(User.likes.through.objects, "commentable")),
+        (Commentable, "comment_count", _count(Comment.objects.latest_versions(), "commented_on")),
+        (Followable, "follower_count", _count(User.follows.through.objects, "followable")),
+    ]
+
+
+def reconcile_counters() -> int:
+    """
+    Recomputes all counters from the relations and fixes the rows whose counters drifted.
+    :return: The number of fixed rows
+    """
+    flush()
+    fixed = 0
+    with transaction.atomic():
+        for model, field, actual in _get_actual_counts():
+            drifted = model.objects.annotate(actual=actual).exclude(**{field: F("actual")})
+            for pk, value in drifted.values_list("pk", "actual").iterator():
+                model.objects.filter(pk=pk).update(**{field: value})
+                fixed += 1
+    return fixed
+
+
+def recount_counters() -> None:
+    """
+    Recomputes all counters from the relations by a single UPDATE per counter. Unlike `reconcile_counters()` it
+    rewrites every row, which is much faster after a bulk import (e.g. of test data) where all counters are wrong.
+    """
+    flush()
+    with transaction.atomic():
+        for model, field, actual in _get_actual_counts():
+            model.objects.update(**{field: actual})
@@ -0,0 +1,303 @@
+"""
+Contains the server-side engine of the deqsolver widget (see `static/homepage/js/deqsolver`). It integrates ordinary
+differential equations by explicit Runge-Kutta methods given by their Butcher tableaus, like `worker_deq.js` does in the
+browser. A batch of initial conditions is integrated at once by NumPy, i.e. every stage of a step is a single
+vectorized evaluation of the system for all trajectories.
+The trajectories are deterministic. They are cached in chunks of frames by their system, parameters, tableau, step
+size and initial conditions (see `get_trajectory_chunks`), so a figure is only computed for its first reader. Only the
+systems of `SYSTEMS` can be integrated, the server doesn't evaluate code of the clients.
+"""
+import hashlib
+import json
+import math
+from typing import Callable, Iterator, NamedTuple, Optional, Union
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+DEFAULT_CHUNK_FRAMES = 200
+MAX_BATCH_SIZE = 64
+"The maximum number of initial conditions integrated at once"
+MAX_STAGES = 16
+"The maximum number of stages of a Butcher tableau"
+MAX_EVALUATIONS = 20_000
+"""
+The maximum number of stage evaluations of a request summed over all trajectories, i.e. the product of the batch size,
+the frames, the steps per frame and the stages. A stage evaluation of a single trajectory takes about 20 µs, so a
+request is integrated in a few hundred milliseconds at most.
+"""
+CACHE_KEY_PREFIX = "homepage:deq"
+
+
+class ButcherTableau(NamedTuple):
+    """
+    The Butcher tableau of an explicit Runge-Kutta method. The matrix `a` is strictly lower triangular.
+    """
+
+    a: np.ndarray
+    b: np.ndarray
+    c: np.ndarray
+
+    @classmethod
+    def from_dict(cls, tableau: dict) -> "ButcherTableau":
+        """
+        Creates a tableau from the format of `worker_deq.js`: `{"a": [[...], ...], "b": [...], "c": [...]}`. The rows
+        of `a` may omit the entries on and above the diagonal.
+        :raises ValueError: If the tableau is malformed or not explicit
+        """
+        try:
+            b = np.asarray(tableau["b"], dtype=float)
+            c = np.asarray(tableau["c"], dtype=float)
+            stages = len(b)
+            if stages > MAX_STAGES:
+                raise ValueError(f"It must not have more than {MAX_STAGES} stages")
+            a = np.zeros((stages, stages))
+            for row, values in enumerate(tableau["a"][:stages]):
+                a[row, : len(values)] = values
+        except (KeyError, TypeError, ValueError) as error:
+            raise ValueError(f"Invalid Butcher tableau: {error}") from error
+        if stages == 0 or b.ndim != 1 or c.shape != b.shape or np.triu(a).any():
+            raise ValueError("Invalid Butcher tableau: It must be explicit and the dimensions must match")
+        if not (np.isfinite(a).all() and np.isfinite(b).all() and np.isfinite(c).all()):
+            raise ValueError("Invalid Butcher tableau: The coefficients must be finite")
+        return cls(a, b, c)
+
+    def to_dict(self) -> dict:
+        """
+        Returns the tableau in the format of `worker_deq.js`.
+        """
+        return {"a": self.a.tolist(), "b": self.b.tolist(), "c": self.c.tolist(), "dim": len(self.b)}
+
+
+TABLEAUS = {
+    "euler": ButcherTableau.from_dict({"a": [[]], "b": [1], "c": [0]}),
+    "midpoint": ButcherTableau.from_dict({"a": [[], [0.5]], "b": [0, 1], "c": [0, 0.5]}),
+    "heun": ButcherTableau.from_dict({"a": [[], [1]], "b": [0.5, 0.5], "c": [0, 1]}),
+    "ralston": ButcherTableau.from_dict({"a": [[], [2 / 3]], "b": [0.25, 0.75], "c": [0, 2 / 3]}),
+    "kutta3": ButcherTableau.from_dict({"a": [[], [0.5], [-1, 2]], "b": [1 / 6, 2 / 3, 1 / 6], "c": [0, 0.5, 1]}),
+    "rk4": ButcherTableau.from_dict(
+        {"a": [[], [0.5], [0, 0.5], [0, 0, 1]], "b": [1 / 6, 1 / 3, 1 / 3, 1 / 6], "c": [0, 0.5, 0.5, 1]}
+    ),
+    "rk38": ButcherTableau.from_dict(
+        {"a": [[], [1 / 3], [-1 / 3, 1], [1, -1, 1]], "b": [1 / 8, 3 / 8, 3 / 8, 1 / 8], "c": [0, 1 / 3, 2 / 3, 1]}
+    ),
+}
+"The Butcher tableaus of common explicit Runge-Kutta methods by their names"
+
+
+class System(NamedTuple):
+    """
+    A system of ordinary differential equations y' = f(t, y).
+    """
+
+    dimension: int
+    parameters: dict[str, float]
+    "The parameters of the system and their default values"
+    f: Callable[[float, np.ndarray, dict[str, float]], np.ndarray]
+    """
+    Returns the derivatives of a batch of states, i.e. it maps the time, an array of the shape (batch, dimension) and
+    the parameters to an array of the same shape.
+    """
+
+
+def _harmonic_oscillator(_t: float, y: np.ndarray, p: dict[str, float]) -> np.ndarray:
+    return np.stack([y[:, 1], -p["omega"] ** 2 * y[:, 0] - 2 * p["damping"] * y[:, 1]], axis=1)
+
+
+def _pendulum(_t: float, y: np.ndarray, p: dict[str, float]) -> np.ndarray:
+    return np.stack([y[:, 1], -p["g"] / p["length"] * np.sin(y[:, 0])], axis=1)
+
+
+def _van_der_pol(_t: float, y: np.ndarray, p: dict[str, float]) -> np.ndarray:
+    return np.stack([y[:, 1], p["mu"] * (1 - y[:, 0] ** 2) * y[:, 1] - y[:, 0]], axis=1)
+
+
+def _lotka_volterra(_t: float, y: np.ndarray, p: dict[str, float]) -> np.ndarray:
+    prey, predators = y[:, 0], y[:, 1]
+    return np.stack(
+        [p["alpha"] * prey - p["beta"] * prey * predators, p["delta"] * prey * predators - p["gamma"] * predators],
+        axis=1,
+    )
+
+
+def _lorenz(_t: float, y: np.ndarray, p: dict[str, float]) -> np.ndarray:
+    return np.stack(
+        [
+            p["sigma"] * (y[:, 1] - y[:, 0]),
+            y[:, 0] * (p["rho"] - y[:, 2]) - y[:, 1],
+            y[:, 0] * y[:, 1] - p["beta"] * y[:, 2],
+        ],
+        axis=1,
+    )
+
+
+SYSTEMS = {
+    "harmonic-oscillator": System(2, {"omega": 1.0, "damping": 0.0}, _harmonic_oscillator),
+    "pendulum": System(2, {"g": 9.81, "length": 1.0}, _pendulum),
+    "van-der-pol": System(2, {"mu": 1.0}, _van_der_pol),
+    "lotka-volterra": System(2, {"alpha": 1.1, "beta": 0.4, "gamma": 0.4, "delta": 0.1}, _lotka_volterra),
+    "lorenz": System(3, {"sigma": 10.0, "rho": 28.0, "beta": 8 / 3}, _lorenz),
+}
+"The systems which can be integrated by their names"
+
+
+class Problem(NamedTuple):
+    """
+    An initial value problem for a batch of initial conditions. The trajectories are sampled every `steps_per_frame`
+    steps, the first frame is the initial condition.
+    """
+
+    system: str
+    parameters: dict[str, float]
+    tableau: ButcherTableau
+    step: float
+    t0: float
+    y0: np.ndarray
+    "The initial conditions of the shape (batch, dimension)"
+    frames: int
+    steps_per_frame: int
+
+    def get_cache_key(self) -> str:
+        """
+        Returns the prefix of the cache keys of the chunks of the trajectories. It is a digest of the problem.
+        """
+        description = json.dumps(
+            [
+                self.system,
+                sorted(self.parameters.items()),
+                self.tableau.to_dict(),
+                self.step,
+                self.t0,
+                self.y0.tolist(),
+                self.steps_per_frame,
+            ]
+        )
+        return f"{CACHE_KEY_PREFIX}:{hashlib.sha256(description.encode('utf-8')).hexdigest()}"
+
+
+def get_chunk_frames() -> int:
+    """
+    The number of frames per chunk of the streamed and cached trajectories. It can be configured by the setting
+    `HOMEPAGE_DEQ_CHUNK_FRAMES`.
+    """
+    return getattr(settings, "HOMEPAGE_DEQ_CHUNK_FRAMES", DEFAULT_CHUNK_FRAMES)
+
+
+def create_problem(  # pylint: disable=too-many-arguments
+    system: str,
+    tableau: Union[str, dict],
+    step: float,
+    y0: list,
+    frames: int,
+    *,
+    steps_per_frame: int = 1,
+    t0: float = 0.0,
+    parameters: Optional[dict] = None,
+) -> Problem:
+    """
+    Validates the arguments and returns the problem.
+    :param tableau: The name of a tableau of `TABLEAUS` or a tableau in the format of `worker_deq.js`
+    :param y0: A list of initial conditions (or a single initial condition)
+    :param parameters: The parameters of the system. Missing parameters have their default value.
+    :raises ValueError: If an argument is invalid
+    """
+    if system not in SYSTEMS:
+        raise ValueError(f"Unknown system {system!r}")
+    definition = SYSTEMS[system]
+    if isinstance(tableau, str):
+        if tableau not in TABLEAUS:
+            raise ValueError(f"Unknown Butcher tableau {tableau!r}")
+        butcher_tableau = TABLEAUS[tableau]
+    else:
+        butcher_tableau = ButcherTableau.from_dict(tableau)
+    unknown = set(parameters or {}) - set(definition.parameters)
+    if unknown:
+        raise ValueError(f"Unknown parameters {', '.join(sorted(unknown))}")
+    merged_parameters = {name: float(value) for name, value in {**definition.parameters, **(parameters or {})}.items()}
+    try:
+        initial = np.atleast_2d(np.asarray(y0, dtype=float))
+    except (TypeError, ValueError) as error:
+        raise ValueError(f"Invalid initial conditions: {error}") from error
+    if initial.ndim != 2 or initial.shape[1] != definition.dimension or not 0 < len(initial) <= MAX_BATCH_SIZE:
+        raise ValueError(
+            f"The initial conditions must be 1 to {MAX_BATCH_SIZE} states of dimension {definition.dimension}"
+        )
+    values = [step, t0, *merged_parameters.values()]
+    if not (all(math.isfinite(value) for value in values) and np.isfinite(initial).all()):
+        raise ValueError("The numbers must be finite")
+    if step <= 0 or frames < 1 or steps_per_frame < 1:
+        raise ValueError("The step size, the number of frames and the steps per frame must be positive")
+    if len(initial) * frames * steps_per_frame * len(butcher_tableau.b) > MAX_EVALUATIONS:
+        raise ValueError(f"The trajectories must not exceed {MAX_EVALUATIONS} stage evaluations in total")
+    return Problem(system, merged_parameters, butcher_tableau, step, t0, initial, frames, steps_per_frame)
+
+
+def integrate(  # pylint: disable=too-many-locals
+    problem: Problem, t: float, y: np.ndarray, frames: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Integrates the batch of states `y` at the time `t` for `frames` frames.
+    :return: The times of the shape (frames,) and the states of the shape (frames, batch, dimension)
+    """
+    system = SYSTEMS[problem.system]
+    h = problem.step
+    # The non-zero coefficients scaled by the step size. For small systems, the overhead of the NumPy calls dominates.
+    weights = [[(index, h * value) for index, value in enumerate(row) if value] for row in problem.tableau.a]
+    final_weights = [(index, h * value) for index, value in enumerate(problem.tableau.b) if value]
+    offsets = [h * value for value in problem.tableau.c]
+    times = np.empty(frames)
+    states = np.empty((frames, *y.shape))
+    k: list[np.ndarray] = [y] * len(offsets)
+    step = 0
+    for frame in range(frames):
+        for _ in range(problem.steps_per_frame):
+            t_step = t + step * h
+            for stage, stage_weights in enumerate(weights):
+                # The stages only depend on the previous ones (explicit method)
+                y_stage = y
+                for index, weight in stage_weights:
+                    y_stage = y_stage + weight * k[index]
+                k[stage] = system.f(t_step + offsets[stage], y_stage, problem.parameters)
+            for index, weight in final_weights:
+                y = y + weight * k[index]
+            step += 1
+        # The time is computed from the start to avoid accumulating rounding errors
+        times[frame] = t + step * h
+        states[frame] = y
+    return times, states
+
+
+def _to_json(array: np.ndarray) -> list:
+    # JSON has no representation of diverged (infinite) values
+    if np.isfinite(array).all():
+        return array.tolist()
+    converted = array.astype(object)
+    converted[~np.isfinite(array)] = None
+    return converted.tolist()
+
+
+def get_trajectory_chunks(problem: Problem) -> Iterator[dict]:
+    """
+    Yields the trajectories chunk by chunk as `{"t": [times], "y": [[states of all trajectories] per time]}`. Chunks
+    are taken from the cache. The first missing chunk is computed from the last state of the previous chunk, i.e. the
+    result doesn't depend on the cached chunks.
+    """
+    chunk_frames = get_chunk_frames()
+    key = f"{problem.get_cache_key()}:{chunk_frames}"
+    t, y = problem.t0, problem.y0
+    yield {"t": [t], "y": _to_json(y[np.newaxis])}
+    remaining = problem.frames - 1
+    index = 0
+    while remaining > 0:
+        frames = min(chunk_frames, remaining)
+        chunk = cache.get(f"{key}:{index}")
+        if chunk is None or len(chunk["t"]) < frames:
+            times, states = integrate(problem, t, y, frames)
+            chunk = {"t": times.tolist(), "y": _to_json(states), "state": states[-1].tolist()}
+            cache.set(f"{key}:{index}", chunk)
+        # The full state of the last frame (JSON loses diverged values) to continue the integration
+        t, y = chunk["t"][-1], np.asarray(chunk["state"], dtype=float)
+        yield {"t": chunk["t"][:frames], "y": chunk["y"][:frames]}
+        remaining -= frames
+        index += 1
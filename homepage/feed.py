@@ -0,0 +1,97 @@
+"""
+Contains the article feed of the index page.
+The feed uses keyset pagination: Instead of an OFFSET, each page starts after the (created, versionable_id) of the
+last article of the previous page. This way, every page costs the same regardless of its depth.
+"""
+import base64
+import binascii
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.db.models import Q
+
+from homepage.models import Article, ArticleQuerySet, Category
+
+DEFAULT_PAGE_SIZE = 10
+
+
+class FeedPage(NamedTuple):
+    """
+    A page of the article feed.
+    """
+
+    articles: list[Article]
+    next_cursor: Optional[str]
+    "The cursor to fetch the next page or None if this is the last page."
+
+
+def get_page_size() -> int:
+    """
+    The number of articles per page. It can be configured by the setting `HOMEPAGE_FEED_PAGE_SIZE`.
+    """
+    return getattr(settings, "HOMEPAGE_FEED_PAGE_SIZE", DEFAULT_PAGE_SIZE)
+
+
+def encode_cursor(article: Article) -> str:
+    """
+    Encodes the position of the article in the feed as URL safe string.
+    """
+    position = f"{article.created.isoformat()}|{article.versionable_id}"
+    return base64.urlsafe_b64encode(position.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Decodes a cursor created by `encode_cursor`.
+    :raises ValueError: If the cursor is malformed
+    """
+    try:
+        created, versionable_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return datetime.fromisoformat(created), int(versionable_id)
+    except (binascii.Error, UnicodeError) as error:
+        raise ValueError(f"Invalid cursor {cursor}") from error
+
+
+def get_feed_page(articles: ArticleQuerySet, category: Optional[Category], cursor: Optional[str] = None) -> FeedPage:
+    """
+    Returns a page of the newest versions of the articles ordered by creation date (newest first).
+    Needs two queries: One for the articles and one for their authors.
+    :param articles: The articles to show, usually `Article.objects.visible_to(...)`.
+    :param category: Only show articles of this category. Shows all articles if None.
+    :param cursor: The cursor of the previous page or None for the first page.
+    :raises ValueError: If the cursor is malformed
+    """
+    page_size = get_page_size()
+    return _create_page(list(_get_page_query(articles, category, cursor)[: page_size + 1]), page_size)
+
+
+async def aget_feed_page(
+    articles: ArticleQuerySet, category: Optional[Category], cursor: Optional[str] = None
+) -> FeedPage:
+    """
+    Async variant of `get_feed_page`.
+    """
+    page_size = get_page_size()
+    query = _get_page_query(articles, category, cursor)[: page_size + 1]
+    return _create_page([article async for article in query], page_size)
+
+
+def _get_page_query(articles: ArticleQuerySet, category: Optional[Category], cursor: Optional[str]) -> ArticleQuerySet:
+    articles = articles.latest_versions()
+    if category is not None:
+        articles = articles.filter(related_categories=category)
+    if cursor is not None:
+        created, versionable_id = decode_cursor(cursor)
+        articles = articles.filter(Q(created__lt=created) | Q(created=created, versionable_id__lt=versionable_id))
+    return (
+        articles.order_by("-created", "-versionable_id")
+        .defer("content", "content_delta")
+        .prefetch_related("related_authors")
+    )
+
+
+def _create_page(page: list[Article], page_size: int) -> FeedPage:
+    if len(page) > page_size:
+        return FeedPage(page[:page_size], encode_cursor(page[page_size - 1]))
+    return FeedPage(page, None)
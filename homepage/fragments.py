@@ -0,0 +1,76 @@
+"""
+Contains the user specific fragments of the pages. The pages are rendered as shells which are the same for all users
+of an audience (anonymous or registered users) and can be cached once per page, category and language. The shells
+contain a placeholder (an HTML comment) for every fragment, which is substituted on every request by the rendering of
+the fragment for the user (see `fill_fragments`). Similar to ESI, the fragments can also be requested by the
+`homepage:fragment` endpoint, e.g. by a proxy or a script.
+The placeholders are rendered by the `fragment` tag of `homepage.templatetags.fragments`.
+"""
+import re
+from typing import Callable, NamedTuple
+
+from django.http import HttpRequest
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.http import url_has_allowed_host_and_scheme
+
+PLACEHOLDER_PATTERN = re.compile(rb"<!--homepage:fragment:(\w+)-->")
+
+
+class Fragment(NamedTuple):
+    """
+    A user specific fragment of the pages.
+    """
+
+    template_name: str
+    get_context: Callable[[HttpRequest, str], dict]
+    "Returns the context of the template for the request and the URL of the page containing the fragment."
+
+
+def _get_loginout_context(request: HttpRequest, page_url: str) -> dict:
+    if request.user.is_authenticated:
+        return {"label": "Logout", "url": reverse("auth:logout") + f"?next={page_url}"}
+    return {"label": "Login", "url": reverse("auth:login") + f"?next={page_url}"}
+
+
+FRAGMENTS = {
+    "loginout": Fragment("homepage/fragments/loginout.html", _get_loginout_context),
+}
+"The fragments by their names"
+
+
+def get_placeholder(name: str) -> str:
+    """
+    Returns the placeholder of the fragment `name` in the page shells.
+    """
+    if name not in FRAGMENTS:
+        raise ValueError(f"Unknown fragment {name!r}")
+    return f"<!--homepage:fragment:{name}-->"
+
+
+def render_fragment(request: HttpRequest, name: str, page_url: str) -> str:
+    """
+    Renders the fragment `name` for the user of the request.
+    :param page_url: The URL of the page containing the fragment. It must be a local URL, otherwise the index page is
+        used.
+    """
+    if not url_has_allowed_host_and_scheme(page_url, allowed_hosts=None):
+        page_url = reverse("homepage:index")
+    fragment = FRAGMENTS[name]
+    return render_to_string(fragment.template_name, fragment.get_context(request, page_url))
+
+
+def fill_fragments(request: HttpRequest, shell: bytes, page_url: str) -> bytes:
+    """
+    Substitutes the placeholders of a page shell by the fragments for the user of the request. Every fragment is only
+    rendered once.
+    """
+    renderings: dict[bytes, bytes] = {}
+
+    def substitute(match: re.Match) -> bytes:
+        name = match.group(1)
+        if name not in renderings:
+            renderings[name] = render_fragment(request, name.decode("ascii"), page_url).encode("utf-8")
+        return renderings[name]
+
+    return PLACEHOLDER_PATTERN.sub(substitute, shell)
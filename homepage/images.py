@@ -0,0 +1,171 @@
+"""
+Contains the pipeline creating the resized variants of the thumbnails of articles and projects.
+When a thumbnail is saved, its variants are created in a background thread pool, so the request uploading the image
+doesn't wait for the conversions. Every width is stored as WebP and in a fallback format (JPEG, or PNG for images with
+transparency). The variants are named by the SHA-256 digest of the original image: Identical images (e.g. of all
+versions of an article) share their variants and existing variants are never converted again.
+Once the variants exist, they are stored in the `thumbnail_variants` field of all rows using the image. The templates
+use them by the `thumbnail` tag of `homepage.templatetags.images`.
+"""
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Optional, Union
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+
+from homepage import caching
+from homepage.models import Article, Project
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WIDTHS = (320, 640, 1280)
+DEFAULT_WORKERS = 2
+WEBP_QUALITY = 80
+JPEG_QUALITY = 85
+VARIANT_DIRECTORY = "thumbnails"
+WEBP = "image/webp"
+FORMATS = {"image/webp": ("WEBP", "webp"), "image/jpeg": ("JPEG", "jpg"), "image/png": ("PNG", "png")}
+"The format names of Pillow and the file extensions by the MIME types of the variants"
+
+
+def get_widths() -> tuple[int, ...]:
+    """
+    The widths of the variants. Images are never enlarged, i.e. narrower images only get the widths below their own
+    width and a variant of their own width. It can be configured by the setting `HOMEPAGE_THUMBNAIL_WIDTHS`.
+    """
+    return tuple(sorted(getattr(settings, "HOMEPAGE_THUMBNAIL_WIDTHS", DEFAULT_WIDTHS)))
+
+
+def get_workers() -> int:
+    """
+    The number of threads converting the images. 0 converts them in the saving thread (after the commit). It can be
+    configured by the setting `HOMEPAGE_THUMBNAIL_WORKERS`.
+    """
+    return getattr(settings, "HOMEPAGE_THUMBNAIL_WORKERS", DEFAULT_WORKERS)
+
+
+_executor: Optional[ThreadPoolExecutor] = None  # pylint: disable=invalid-name
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor  # pylint: disable=global-statement
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=get_workers(), thread_name_prefix="thumbnails")
+        return _executor
+
+
+def needs_variants(instance: Union[Article, Project]) -> bool:
+    """
+    Returns true if the thumbnail of the instance has no variants yet (or variants of another image).
+    """
+    if not instance.thumbnail:
+        return False
+    return (instance.thumbnail_variants or {}).get("original") != instance.thumbnail.name
+
+
+def schedule_variants(instance: Union[Article, Project]) -> None:
+    """
+    Creates the variants of the thumbnail of the instance after the current transaction is committed. They are
+    created in the background unless the number of workers is 0.
+    """
+    name = instance.thumbnail.name
+    model = type(instance)
+
+    def submit():
+        if get_workers() == 0:
+            create_variants(model, name)
+        else:
+            _get_executor().submit(_create_variants_in_thread, model, name)
+
+    transaction.on_commit(submit, using=instance._state.db)  # pylint: disable=protected-access
+
+
+def _create_variants_in_thread(model: type[Union[Article, Project]], name: str) -> None:
+    try:
+        create_variants(model, name)
+    except Exception:  # pylint: disable=broad-exception-caught
+        logger.exception("Can't create the variants of %s", name)
+    finally:
+        # The worker threads have their own database connections
+        connections.close_all()
+
+
+def _encode(image: Image.Image, mime_type: str) -> bytes:
+    pillow_format, _ = FORMATS[mime_type]
+    output = BytesIO()
+    if mime_type == "image/jpeg":
+        image.convert("RGB").save(output, pillow_format, quality=JPEG_QUALITY, optimize=True, progressive=True)
+    elif mime_type == "image/webp":
+        image.save(output, pillow_format, quality=WEBP_QUALITY, method=4)
+    else:
+        image.save(output, pillow_format, optimize=True)
+    return output.getvalue()
+
+
+def _load(name: str) -> tuple[str, Image.Image]:
+    # Returns the digest of the file and the upright image in RGB or (if it has transparency) RGBA
+    with default_storage.open(name, "rb") as file:
+        data = file.read()
+    with Image.open(BytesIO(data)) as original:
+        image = ImageOps.exif_transpose(original)
+        has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+        return hashlib.sha256(data).hexdigest(), image.convert("RGBA" if has_alpha else "RGB")
+
+
+def create_variants(model: type[Union[Article, Project]], name: str) -> dict:
+    """
+    Creates the missing variants of an image and stores their description in all rows of the model using the image.
+    :param model: `Article` or `Project`
+    :param name: The name of the original image in the default storage
+    :return: The description of the variants (see `Article.thumbnail_variants`)
+    """
+    digest, image = _load(name)
+    fallback = "image/png" if image.mode == "RGBA" else "image/jpeg"
+    widths = [width for width in get_widths() if width < image.width] + [min(image.width, get_widths()[-1])]
+    sources: dict[str, list] = {WEBP: [], fallback: []}
+    for width in sorted(set(widths)):
+        height = max(round(image.height * width / image.width), 1)
+        resized = None
+        for mime_type in (WEBP, fallback):
+            variant = f"{VARIANT_DIRECTORY}/{digest[:2]}/{digest}-{width}.{FORMATS[mime_type][1]}"
+            if not default_storage.exists(variant):
+                if resized is None:
+                    resized = image.resize((width, height), Image.Resampling.LANCZOS)
+                default_storage.save(variant, ContentFile(_encode(resized, mime_type)))
+            sources[mime_type].append([width, variant])
+    variants = {
+        "original": name,
+        "digest": digest,
+        "width": image.width,
+        "height": image.height,
+        "fallback": fallback,
+        "sources": sources,
+    }
+    if model.objects.filter(thumbnail=name).update(thumbnail_variants=variants):
+        # The cached pages still refer to the original image
+        caching.invalidate_pages()
+    return variants
+
+
+def get_srcset(variants: dict, mime_type: str) -> str:
+    """
+    Returns the `srcset` attribute of the variants of a format.
+    """
+    return ", ".join(f"{default_storage.url(name)} {width}w" for width, name in variants["sources"][mime_type])
+
+
+def get_url(variants: dict, mime_type: str) -> str:
+    """
+    Returns the URL of the widest variant of a format, e.g. for browsers not supporting `srcset`.
+    """
+    _, name = variants["sources"][mime_type][-1]
+    return default_storage.url(name)
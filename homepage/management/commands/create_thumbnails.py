@@ -0,0 +1,37 @@
+"""
+Creates a custom command to create the missing variants of the thumbnails, e.g. after the widths were changed or
+images were uploaded before the variants existed.
+"""
+from django.core.management.base import BaseCommand
+
+from homepage import images
+from homepage.models import Article, Project
+
+
+class Command(BaseCommand):
+    """
+    Creates the missing resized variants of the thumbnails of all articles and projects
+    """
+
+    help = "Creates the missing resized variants of the thumbnails of all articles and projects"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Recreate the descriptions of all thumbnails")
+
+    def handle(self, *args, **options):
+        """
+        Handle the command
+        """
+        created = 0
+        for model in (Article, Project):
+            names = model.objects.exclude(thumbnail="").exclude(thumbnail=None)
+            if not options["all"]:
+                names = names.filter(thumbnail_variants__isnull=True)
+            for name in names.values_list("thumbnail", flat=True).distinct():
+                try:
+                    images.create_variants(model, name)
+                except (OSError, ValueError) as error:
+                    self.stderr.write(f"Can't create the variants of {name}: {error}")
+                    continue
+                created += 1
+        self.stdout.write(f"Created the variants of {created} images")
@@ -0,0 +1,21 @@
+"""
+Creates a custom command to rebuild the full-text search index, e.g. after test data was inserted by raw SQL.
+"""
+from django.core.management.base import BaseCommand
+
+from homepage import search
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the full-text search index of all articles and projects
+    """
+
+    help = "Rebuilds the full-text search index of all articles and projects"
+
+    def handle(self, *args, **options):
+        """
+        Handle the command
+        """
+        indexed = search.rebuild_index()
+        self.stdout.write(f"Indexed {indexed} documents")
@@ -0,0 +1,21 @@
+"""
+Creates a custom command to fix drifted like, comment and follower counters.
+"""
+from django.core.management.base import BaseCommand
+
+from homepage import counters
+
+
+class Command(BaseCommand):
+    """
+    Recomputes the like, comment and follower counters and fixes drifted ones
+    """
+
+    help = "Recomputes the like, comment and follower counters and fixes drifted ones"
+
+    def handle(self, *args, **options):
+        """
+        Handle the command
+        """
+        fixed = counters.reconcile_counters()
+        self.stdout.write(f"Fixed {fixed} counters")
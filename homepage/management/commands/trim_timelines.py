@@ -0,0 +1,31 @@
+"""
+Creates a custom command to enforce the retention of the user timelines. It should be run periodically (e.g. by cron).
+"""
+from django.core.management.base import BaseCommand
+
+from homepage import timeline
+
+
+class Command(BaseCommand):
+    """
+    Deletes the oldest entries of every timeline exceeding the retention
+    """
+
+    help = "Deletes the oldest entries of every timeline exceeding the retention"
+
+    def add_arguments(self, parser):
+        """
+        Add arguments to the command
+        """
+        parser.add_argument(
+            "--retention",
+            type=int,
+            help="Number of entries to keep per timeline (default: HOMEPAGE_TIMELINE_RETENTION)",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Handle the command
+        """
+        deleted = timeline.trim_timelines(options["retention"])
+        self.stdout.write(f"Deleted {deleted} timeline entries")
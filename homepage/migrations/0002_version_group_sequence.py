@@ -0,0 +1,21 @@
+from django.db import migrations
+
+from homepage.sequences import VERSION_GROUP_SEQUENCE, create_sequence, drop_sequence
+
+
+def create_version_group_sequence(apps, schema_editor):
+    create_sequence(schema_editor.connection, VERSION_GROUP_SEQUENCE, "homepage_versionable", "version_group")
+
+
+def drop_version_group_sequence(apps, schema_editor):
+    drop_sequence(schema_editor.connection, VERSION_GROUP_SEQUENCE)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("homepage", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_version_group_sequence, reverse_code=drop_version_group_sequence),
+    ]
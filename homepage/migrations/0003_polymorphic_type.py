@@ -0,0 +1,71 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+SUBCLASSES = {
+    ("versionable", "versionable_type", "versionable_ptr"): ["article", "comment"],
+    ("commentable", "commentable_type", "commentable_ptr"): ["user", "comment", "project", "article"],
+    ("followable", "followable_type", "followable_ptr"): ["user", "project"],
+}
+
+
+def set_polymorphic_types(apps, schema_editor):
+    # We can't import the models directly as they may be a newer
+    # version than this migration expects. We use the historical version.
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    for (base_name, type_field, parent_link), subclass_names in SUBCLASSES.items():
+        base = apps.get_model("homepage", base_name)
+        for subclass_name in subclass_names:
+            subclass = apps.get_model("homepage", subclass_name)
+            content_type, _ = ContentType.objects.get_or_create(app_label="homepage", model=subclass_name)
+            base.objects.filter(
+                **{f"{type_field}__isnull": True, "pk__in": subclass.objects.values(f"{parent_link}_id")}
+            ).update(**{type_field: content_type})
+        if base.objects.filter(**{f"{type_field}__isnull": True}).exists():
+            content_type, _ = ContentType.objects.get_or_create(app_label="homepage", model=base_name)
+            base.objects.filter(**{f"{type_field}__isnull": True}).update(**{type_field: content_type})
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("homepage", "0002_version_group_sequence"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="commentable",
+            name="commentable_type",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="contenttypes.contenttype",
+            ),
+        ),
+        migrations.AddField(
+            model_name="followable",
+            name="followable_type",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="contenttypes.contenttype",
+            ),
+        ),
+        migrations.AddField(
+            model_name="versionable",
+            name="versionable_type",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="contenttypes.contenttype",
+            ),
+        ),
+        migrations.RunPython(set_polymorphic_types, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:35
+
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+def set_latest_versions(apps, schema_editor):
+    # We can't import the Versionable model directly as it may be a newer
+    # version than this migration expects. We use the historical version.
+    Versionable = apps.get_model("homepage", "Versionable")
+    newer_versions = Versionable.objects.filter(
+        version_group=OuterRef("version_group"), version_number__gt=OuterRef("version_number")
+    )
+    Versionable.objects.filter(~Exists(newer_versions)).update(is_latest=True)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("homepage", "0003_polymorphic_type"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="versionable",
+            name="is_latest",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(set_latest_versions, reverse_code=migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="versionable",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("is_latest", True)), fields=("version_group",), name="unique_latest_version"
+            ),
+        ),
+    ]
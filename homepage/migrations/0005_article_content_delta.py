@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("homepage", "0004_versionable_is_latest"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="article",
+            name="content_delta",
+            field=models.BinaryField(null=True),
+        ),
+        migrations.AlterField(
+            model_name="article",
+            name="content",
+            field=models.TextField(blank=True),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("homepage", "0005_article_content_delta"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="article",
+            index=models.Index(fields=["visibility", "versionable_ptr"], name="article_visibility"),
+        ),
+        migrations.AddIndex(
+            model_name="versionable",
+            index=models.Index(
+                condition=models.Q(("is_latest", True)),
+                fields=["-created", "-versionable_id"],
+                name="latest_version_feed",
+            ),
+        ),
+    ]
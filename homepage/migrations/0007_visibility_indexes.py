@@ -0,0 +1,16 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("homepage", "0006_feed_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(fields=["visibility", "followable_ptr"], name="project_visibility"),
+        ),
+    ]
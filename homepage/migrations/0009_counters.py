@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:48
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count(queryset, field):
+    counts = queryset.filter(**{field: OuterRef("pk")}).order_by().values(field).annotate(count=Count("pk"))
+    return Coalesce(Subquery(counts.values("count")), 0)
+
+
+def set_counters(apps, schema_editor):
+    # We can't import the models directly as they may be newer
+    # versions than this migration expects. We use the historical versions.
+    User = apps.get_model("homepage", "User")
+    Comment = apps.get_model("homepage", "Comment")
+    Commentable = apps.get_model("homepage", "Commentable")
+    Followable = apps.get_model("homepage", "Followable")
+    Commentable.objects.update(
+        like_count=count(User.likes.through.objects, "commentable"),
+        comment_count=count(Comment.objects.filter(is_latest=True), "commented_on"),
+    )
+    Followable.objects.update(follower_count=count(User.follows.through.objects, "followable"))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("homepage", "0008_timeline_entry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="commentable",
+            name="comment_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="commentable",
+            name="like_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="followable",
+            name="follower_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(set_counters, reverse_code=migrations.RunPython.noop),
+    ]
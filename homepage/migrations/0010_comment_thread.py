@@ -0,0 +1,57 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+PATH_SEGMENT_WIDTH = 12
+
+
+def set_comment_threads(apps, schema_editor):
+    # We can't import the Comment model directly as it may be a newer
+    # version than this migration expects. We use the historical version.
+    Comment = apps.get_model("homepage", "Comment")
+    comments = {comment.commentable_ptr_id: comment for comment in Comment.objects.all()}
+
+    def resolve(comment):
+        if not comment.path:
+            parent = comments.get(comment.commented_on_id)
+            if parent is None:
+                comment.thread_root_id, parent_path = comment.commented_on_id, ""
+            else:
+                resolve(parent)
+                comment.thread_root_id, parent_path = parent.thread_root_id, parent.path
+            comment.path = parent_path + str(comment.version_group).zfill(PATH_SEGMENT_WIDTH)
+
+    for comment in comments.values():
+        resolve(comment)
+    Comment.objects.bulk_update(comments.values(), ["thread_root", "path"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("homepage", "0009_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="path",
+            field=models.TextField(default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="thread_root",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="thread_comments",
+                to="homepage.commentable",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(fields=["thread_root", "path"], name="comment_thread"),
+        ),
+        migrations.RunPython(set_comment_threads, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,131 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+SQLITE_CREATE = [
+    # External content table: The FTS5 table only stores the index, the texts are read from the documents.
+    "CREATE VIRTUAL TABLE homepage_searchdocument_fts USING fts5("
+    "title, body, content='homepage_searchdocument', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER homepage_searchdocument_ai AFTER INSERT ON homepage_searchdocument BEGIN "
+    "INSERT INTO homepage_searchdocument_fts (rowid, title, body) VALUES (new.id, new.title, new.body); END",
+    "CREATE TRIGGER homepage_searchdocument_ad AFTER DELETE ON homepage_searchdocument BEGIN "
+    "INSERT INTO homepage_searchdocument_fts (homepage_searchdocument_fts, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); END",
+    "CREATE TRIGGER homepage_searchdocument_au AFTER UPDATE ON homepage_searchdocument BEGIN "
+    "INSERT INTO homepage_searchdocument_fts (homepage_searchdocument_fts, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); "
+    "INSERT INTO homepage_searchdocument_fts (rowid, title, body) VALUES (new.id, new.title, new.body); END",
+]
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS homepage_searchdocument_au",
+    "DROP TRIGGER IF EXISTS homepage_searchdocument_ad",
+    "DROP TRIGGER IF EXISTS homepage_searchdocument_ai",
+    "DROP TABLE IF EXISTS homepage_searchdocument_fts",
+]
+POSTGRES_CREATE = [
+    "ALTER TABLE homepage_searchdocument ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', title), 'A') || setweight(to_tsvector('english', body), 'B')) STORED",
+    "CREATE INDEX homepage_searchdocument_vector ON homepage_searchdocument USING GIN (search_vector)",
+]
+POSTGRES_DROP = [
+    "DROP INDEX IF EXISTS homepage_searchdocument_vector",
+    "ALTER TABLE homepage_searchdocument DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def execute_for_vendor(statements):
+    def execute(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+
+    return execute
+
+
+def index_documents(apps, schema_editor):
+    # We can't import the models directly as they may be newer
+    # versions than this migration expects. We use the historical versions.
+    Article = apps.get_model("homepage", "Article")
+    Project = apps.get_model("homepage", "Project")
+    SearchDocument = apps.get_model("homepage", "SearchDocument")
+    documents = [
+        SearchDocument(
+            key=f"article:{article.version_group}",
+            article=article,
+            title=article.title,
+            body="\n".join(filter(None, [article.subtitle, article.content])),
+            visibility=article.visibility,
+        )
+        for article in Article.objects.filter(is_latest=True).iterator()
+    ]
+    documents += [
+        SearchDocument(
+            key=f"project:{project.pk}",
+            project=project,
+            title=project.title,
+            body="\n".join(filter(None, [project.subtitle, project.description])),
+            visibility=project.visibility,
+        )
+        for project in Project.objects.iterator()
+    ]
+    SearchDocument.objects.bulk_create(documents, batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("homepage", "0010_comment_thread"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchDocument",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("key", models.CharField(max_length=32, unique=True)),
+                ("title", models.TextField()),
+                ("body", models.TextField()),
+                (
+                    "visibility",
+                    models.CharField(
+                        choices=[
+                            ("moderator", "moderator"),
+                            ("private", "private"),
+                            ("review", "review"),
+                            ("follower", "follower"),
+                            ("user", "user"),
+                            ("public", "public"),
+                        ],
+                        max_length=16,
+                    ),
+                ),
+                (
+                    "article",
+                    models.OneToOneField(
+                        editable=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_document",
+                        to="homepage.article",
+                    ),
+                ),
+                (
+                    "project",
+                    models.OneToOneField(
+                        editable=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_document",
+                        to="homepage.project",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [models.Index(fields=["visibility"], name="search_document_visibility")],
+            },
+        ),
+        migrations.RunPython(
+            execute_for_vendor({"sqlite": SQLITE_CREATE, "postgresql": POSTGRES_CREATE}),
+            reverse_code=execute_for_vendor({"sqlite": SQLITE_DROP, "postgresql": POSTGRES_DROP}),
+        ),
+        migrations.RunPython(index_documents, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("homepage", "0011_search_document"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="article",
+            name="thumbnail_variants",
+            field=models.JSONField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="thumbnail_variants",
+            field=models.JSONField(editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("homepage", "0012_thumbnail_variants"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="user",
+            name="alias",
+            field=models.CharField(db_index=True, max_length=32),
+        ),
+    ]
@@ -1,13 +1,22 @@
 """
 This module contains all database models for django.
 """
-from typing import TypeVar
+import abc
+import zlib
+from collections import defaultdict
+from typing import Iterable, Optional, TypeVar
 
 from django.contrib.contenttypes.models import ContentType
-from django.db import models
+from django.core.cache import cache
+from django.db import models, router, transaction
+from django.db.models.query import ModelIterable
 from django.utils import timezone
 from django.utils.translation import gettext_lazy
 
+from homepage import revisions
+from homepage.registry import subclass_registry
+from homepage.sequences import next_version_group
+
 
 class Visibility(models.TextChoices):
     """
@@ -30,6 +39,17 @@ class Visibility(models.TextChoices):
 
 ModelT = TypeVar("ModelT", bound=models.Model)
 
+PATH_SEGMENT_WIDTH = 12
+"The width of a segment of the materialized path of a `Comment`."
+
+
+def format_path_segment(version_group: int) -> str:
+    """
+    Formats a segment of the materialized path of a `Comment`. The segments are zero-padded so the lexicographical
+    order of the paths matches the numerical order of the version groups.
+    """
+    return str(version_group).zfill(PATH_SEGMENT_WIDTH)
+
 
 # pylint: disable=too-few-public-methods
 class GetSubclassesMixin:
@@ -45,19 +65,296 @@ class GetSubclassesMixin:
     @classmethod
     def get_subclasses(cls: type[ModelT]) -> list[type[ModelT]]:  # type: ignore[misc]
         """
-        Returns all subclasses of the calling class.
+        Returns all subclasses of the calling class. The subclasses are looked up in the `subclass_registry`, i.e.
+        this doesn't query the database.
         """
         if not hasattr(cls, "_meta"):
             raise TypeError("This mixin can only be used with classes that derive from Model.")
-        content_types = ContentType.objects.filter(app_label=cls._meta.app_label)
-        model_classes = [ct.model_class() for ct in content_types]
-        return [model for model in model_classes if (model is not None and issubclass(model, cls) and model is not cls)]
+        return list(subclass_registry.get_subclasses(cls))  # type: ignore[arg-type]
+
+
+class PolymorphicMixin(GetSubclassesMixin):
+    """
+    This mixin is used by the super classes `Versionable`, `Commentable` and `Followable`. Each of them persists the
+    content type of the concrete subclass which created the row in the field named by `type_field_name`.
+    This way, the concrete subclass of a row can be determined without probing every subclass table.
+    """
+
+    type_field_name: str
+    "The name of the field holding the content type of the concrete subclass. Must be defined by each super class."
+
+    _concrete_instance: Optional[models.Model]
+
+    def save(self, *args, **kwargs):
+        """
+        Automatically set the content type of the concrete subclass for every polymorphic super class.
+        """
+        content_type = None
+        for klass in type(self).__mro__:
+            field_name = klass.__dict__.get("type_field_name")
+            if field_name is not None and getattr(self, f"{field_name}_id") is None:
+                if content_type is None:
+                    content_type = ContentType.objects.get_for_model(self)
+                setattr(self, field_name, content_type)
+        return super().save(*args, **kwargs)  # type: ignore[misc]
+
+    def get_concrete_model(self) -> Optional[type[models.Model]]:
+        """
+        Returns the concrete subclass which created this object. This doesn't query the database as the content
+        types are cached by django. Returns None if the row has no (known) concrete type.
+        """
+        type_field_name = type(self).__dict__.get("type_field_name")
+        if type_field_name is None:
+            # This object is already an instance of a concrete subclass
+            return type(self)  # type: ignore[return-value]
+        content_type_id = getattr(self, f"{type_field_name}_id")
+        if content_type_id is None:
+            # Rows not created by django (e.g. by raw SQL) have no type. Fall back to probing the subclasses.
+            for subclass in self.get_subclasses():  # type: ignore[misc]
+                parent_link = subclass_registry.get_parent_link(subclass, type(self))  # type: ignore[arg-type]
+                if subclass.objects.filter(**{parent_link.attname: self.pk}).exists():
+                    return subclass
+            return type(self)  # type: ignore[return-value]
+        return ContentType.objects.get_for_id(content_type_id).model_class()
+
+    def get_concrete(self) -> models.Model:
+        """
+        Returns the instance of the concrete subclass which created this object. If it is already an instance of the
+        concrete subclass this object is returned itself. The result is cached on this object.
+        To resolve many objects at once with one query per concrete type use `resolve_concrete`.
+        """
+        if getattr(self, "_concrete_instance", None) is None:
+            resolve_concrete([self])
+        return self._concrete_instance  # type: ignore[return-value]
+
+    def __str__(self) -> str:
+        """
+        Determine which type created this object and return its name + its __str__ value.
+        """
+        concrete = self.get_concrete()
+        if concrete is self:
+            return f"{type(self).__name__}: {self.pk}"  # type: ignore[attr-defined]
+        return f"{type(concrete).__name__}: {str(concrete)}"
+
+
+PolymorphicT = TypeVar("PolymorphicT", bound=PolymorphicMixin)
+
+
+def _get_cached_subclass_instance(instance: models.Model, subclass: type[models.Model]) -> Optional[models.Model]:
+    """
+    Returns the instance of `subclass` which is already loaded by the reverse accessor of its parent link (e.g. by
+    `Commentable.objects.select_related("article")`). Returns None if it isn't loaded.
+    """
+    # pylint: disable=protected-access
+    for accessor_name, related in instance._state.fields_cache.items():
+        try:
+            if subclass_registry.get_subclass_by_accessor(type(instance), accessor_name) is subclass:
+                return related
+        except KeyError:
+            # A cached forward relation
+            continue
+    return None
+
+
+def resolve_concrete(instances: Iterable[PolymorphicT]) -> list[PolymorphicT]:
+    """
+    Resolves the instances of the concrete subclasses for all given objects of the polymorphic super classes.
+    Needs one query per concrete subclass, regardless of the number of objects. The result is cached on each object
+    and can be retrieved by `get_concrete()`. Objects whose concrete instance is already loaded by the reverse accessor
+    of the parent link (e.g. by `select_related("article")`) need no query.
+    :param instances: Objects of `Versionable`, `Commentable` or `Followable`
+    :return: The given objects as list
+    """
+    # pylint: disable=protected-access
+    instances = list(instances)
+    # Several objects may refer to the same row (e.g. the parents of many comments). All of them are resolved.
+    pending: defaultdict[tuple[type, type[models.Model], Optional[str]], defaultdict[int, list[PolymorphicT]]]
+    pending = defaultdict(lambda: defaultdict(list))
+    for instance in instances:
+        if getattr(instance, "_concrete_instance", None) is not None:
+            continue
+        concrete_model = instance.get_concrete_model()
+        if concrete_model is None or concrete_model is instance.__class__:
+            instance._concrete_instance = instance
+        elif (concrete := _get_cached_subclass_instance(instance, concrete_model)) is not None:
+            instance._concrete_instance = concrete
+        else:
+            key = (type(instance), concrete_model, instance._state.db)  # type: ignore[attr-defined]
+            pending[key][instance.pk].append(instance)  # type: ignore[attr-defined]
+    for (base, concrete_model, using), instances_by_pk in pending.items():
+        parent_link = subclass_registry.get_parent_link(concrete_model, base)
+        concrete_objects = concrete_model._base_manager.using(using).filter(
+            **{f"{parent_link.attname}__in": instances_by_pk}
+        )
+        for concrete in concrete_objects:
+            for instance in instances_by_pk.pop(getattr(concrete, parent_link.attname)):
+                instance._concrete_instance = concrete
+        for orphans in instances_by_pk.values():
+            for orphan in orphans:
+                orphan._concrete_instance = orphan
+    return instances
+
+
+class PolymorphicQuerySet(models.QuerySet):
+    """
+    QuerySet for the polymorphic super classes `Versionable`, `Commentable` and `Followable`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._as_concrete = False
+
+    def as_concrete(self) -> "PolymorphicQuerySet":
+        """
+        Returns a QuerySet which yields the instances of the concrete subclasses (e.g. `Article` or `User` instead of
+        `Commentable`) in the original order. Needs one additional query per concrete subclass for the whole
+        QuerySet. It can be used in prefetches as well, e.g.
+        `User.objects.prefetch_related(Prefetch("likes", queryset=Commentable.objects.as_concrete()))`.
+        """
+        clone = self._chain()  # type: ignore[attr-defined]
+        clone._as_concrete = True  # pylint: disable=protected-access
+        return clone
+
+    def _clone(self):
+        clone = super()._clone()  # type: ignore[misc]
+        clone._as_concrete = self._as_concrete  # pylint: disable=protected-access
+        return clone
+
+    def _fetch_all(self):
+        if self._result_cache is None and self._as_concrete and issubclass(self._iterable_class, ModelIterable):
+            # Fill the result cache before django does. Prefetches are then done on the concrete instances.
+            instances = list(self._iterable_class(self))
+            # Annotations and the values used by prefetches to match the results (`_prefetch_related_val_*`) are
+            # set as attributes on the fetched instances. They have to be passed to the concrete instances.
+            attributes = [*self.query.annotation_select, *self.query.extra_select]
+            self._result_cache = []
+            for instance in resolve_concrete(instances):
+                concrete = instance.get_concrete()
+                for attribute in attributes:
+                    setattr(concrete, attribute, getattr(instance, attribute))
+                self._result_cache.append(concrete)
+        super()._fetch_all()  # type: ignore[misc]
+
+
+class VersionableQuerySet(PolymorphicQuerySet):
+    """
+    QuerySet for `Versionable` and its subclasses.
+    """
+
+    def latest_versions(self) -> "VersionableQuerySet":
+        """
+        Returns only the newest version of each version group. The lookup is backed by a partial index on the
+        'version_group' of all rows flagged with 'is_latest'.
+        """
+        return self.filter(is_latest=True)
+
+
+def get_visible_levels(is_registered: bool, is_reviewer: bool) -> list[str]:
+    """
+    Returns the visibilities which are visible to a viewer without being an author or a follower of the entity.
+    """
+    visibilities = [Visibility.PUBLIC]
+    if is_registered:
+        visibilities.append(Visibility.USER)
+    if is_reviewer:
+        visibilities += [Visibility.FOLLOWER, Visibility.REVIEW]
+    return visibilities
+
+
+class VisibilityQuerySetMixin(abc.ABC):
+    """
+    Adds `visible_to()` to the QuerySets of the entities having a `visibility` field (`Article` and `Project`).
+    The subclasses define who is an author and who is a follower of the entities.
+    """
+
+    @abc.abstractmethod
+    def _authored_by(self, user: "User") -> models.Q:
+        """
+        Returns the condition of the entities authored by the user.
+        """
+
+    @abc.abstractmethod
+    def _followed_by(self, user: "User") -> models.Q:
+        """
+        Returns the condition of the entities whose authors (or project) the user follows.
+        """
+
+    def visible_to(
+        self,
+        user: Optional["User"],
+        *,
+        is_registered: Optional[bool] = None,
+        is_reviewer: bool = False,
+        is_moderator: bool = False,
+    ):
+        """
+        Returns only the entities the user is allowed to see. The visibility rules are compiled into a single
+        predicate. The author and follower checks are correlated subqueries on the primary keys of the M2M tables.
+        :param user: The user or None for anonymous users and registered users without profile.
+        :param is_registered: Whether the viewer is a registered user. Defaults to `user is not None`.
+        :param is_reviewer: Whether the viewer is a reviewer.
+        :param is_moderator: Whether the viewer is a moderator. Moderators can see everything.
+        """
+        if is_moderator:
+            return self.all()  # type: ignore[attr-defined]
+        if is_registered is None:
+            is_registered = user is not None
+        condition = models.Q(visibility__in=get_visible_levels(is_registered, is_reviewer))
+        if user is not None:
+            condition |= models.Q(visibility=Visibility.FOLLOWER) & self._followed_by(user)
+            condition |= models.Q(
+                visibility__in=[Visibility.FOLLOWER, Visibility.REVIEW, Visibility.PRIVATE]
+            ) & self._authored_by(user)
+        return self.filter(condition)  # type: ignore[attr-defined]
+
+
+def _follows(user: "User") -> models.Exists:
+    """
+    Checks if the user follows the `Followable` of the outer query.
+    """
+    return models.Exists(
+        User.follows.through.objects.filter(user_id=user.pk, followable_id=models.OuterRef("followable_ptr_id"))
+    )
+
+
+class ProjectQuerySet(VisibilityQuerySetMixin, PolymorphicQuerySet):
+    """
+    QuerySet for `Project`.
+    """
+
+    def _authored_by(self, user: "User") -> models.Q:
+        return models.Q(
+            models.Exists(
+                Project.related_authors.through.objects.filter(project_id=models.OuterRef("pk"), user_id=user.pk)
+            )
+        )
+
+    def _followed_by(self, user: "User") -> models.Q:
+        return models.Q(_follows(user))
+
+
+class ArticleQuerySet(VisibilityQuerySetMixin, VersionableQuerySet):
+    """
+    QuerySet for `Article`. The followers of an article are the followers of its project and of its authors.
+    """
+
+    def _authored_by(self, user: "User") -> models.Q:
+        return models.Q(
+            models.Exists(
+                Article.related_authors.through.objects.filter(article_id=models.OuterRef("pk"), user_id=user.pk)
+            )
+        )
+
+    def _followed_by(self, user: "User") -> models.Q:
+        followed_project = Project.objects.filter(pk=models.OuterRef("related_project_id")).filter(_follows(user))
+        followed_author = User.objects.filter(related_articles=models.OuterRef("pk")).filter(_follows(user))
+        return models.Q(models.Exists(followed_project)) | models.Q(models.Exists(followed_author))
 
 
 VersionableT = TypeVar("VersionableT", bound="Versionable")
 
 
-class Versionable(models.Model, GetSubclassesMixin):
+class Versionable(PolymorphicMixin, models.Model):
     """
     This serves as super class to all entities being considered as 'versionable'.
     An entity relate to a 'version_group' as its ID and the 'version_number' as its version.
@@ -66,27 +363,55 @@ class Versionable(models.Model, GetSubclassesMixin):
     """
 
     versionable_id = models.BigAutoField(primary_key=True)
+    versionable_type = models.ForeignKey(
+        ContentType, on_delete=models.PROTECT, null=True, editable=False, related_name="+"
+    )
     version_group = models.BigIntegerField()
     version_number = models.PositiveIntegerField()
     created = models.DateTimeField(editable=False)
+    is_latest = models.BooleanField(default=False, editable=False)
+    """
+    Flags the newest version of the version group (the head). It is maintained by `save()` and on deletion by
+    `homepage.signals.promote_previous_version`, i.e. for queryset and cascading deletes as well.
+    """
+
+    type_field_name = "versionable_type"
+
+    objects = VersionableQuerySet.as_manager()
 
     def save(self, *args, **kwargs):
         """
-        Automatically set creation date
+        Automatically set creation date and allocate a new 'version_group' for new entities.
+        If a new version is added, it becomes the head of its version group.
         """
+        using = kwargs.get("using") or router.db_for_write(self.__class__, instance=self)
         if not self.versionable_id:  # pylint: disable=no-member
             self.created = timezone.now()
-        if not self.version_group:
-            max_version_group = Versionable.objects.aggregate(models.Max("version_group"))["version_group__max"]
-            self.version_group = max_version_group + 1 if max_version_group is not None else 1
         if not self.version_number:
             self.version_number = 1
         # self.modified = timezone.now()
-        return super().save(*args, **kwargs)
+        if not self.version_group:
+            self.allocate_version_group(using)
+            return super().save(*args, **kwargs)
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+        with transaction.atomic(using=using):
+            versions = Versionable.objects.using(using).filter(version_group=self.version_group)
+            self.is_latest = not versions.filter(version_number__gt=self.version_number).exists()
+            if self.is_latest:
+                versions.filter(is_latest=True).update(is_latest=False)
+            return super().save(*args, **kwargs)
+
+    def allocate_version_group(self, using: str) -> None:
+        """
+        Allocates a new 'version_group' for a new entity. The entity becomes the head of its version group.
+        """
+        self.version_group = next_version_group(using=using)
+        self.is_latest = True
 
     def new_version(self: VersionableT) -> VersionableT:
         """
-        Creates a new version of this entity. Copies all fields except the IDs and increments the
+        Creates a new version of this entity. Copies all fields except the IDs and counters and increments the
         'version_number'.
         """
         fields = {
@@ -95,89 +420,74 @@ class Versionable(models.Model, GetSubclassesMixin):
             if field.name
             not in (
                 "versionable_id",
+                "versionable_type",
                 "versionable_ptr",
                 "commentable_id",
+                "commentable_type",
                 "commentable_ptr",
                 "followable_id",
+                "followable_type",
                 "followable_ptr",
                 "id",
+                "like_count",
+                "comment_count",
+                "follower_count",
             )
         }
         fields["version_number"] += 1
         return self.__class__(**fields)
 
-    def __str__(self) -> str:
-        """
-        Determine which type created this object and return its name + its __str__ value.
-        """
-        subclasses = self.get_subclasses()
-        for subclass in subclasses:
-            try:
-                matches = subclass.objects.filter(versionable_ptr_id=self.versionable_id)  # type: ignore[misc]
-                # mypy error:
-                # Cannot resolve keyword 'versionable_ptr_id' into field.
-                # Choices are: article, comment, created, version_group, version_number, versionable_id
-                # With the try-except block we make sure that the error is ignored.
-                if matches.count() == 1:
-                    return f"{subclass.__name__}: {str(matches.first())}"
-            except AttributeError:
-                pass
-        return f"Versionable: {self.versionable_id}"
-
     class Meta:
-        constraints = [models.UniqueConstraint(fields=["version_group", "version_number"], name="unique_version")]
-
-
-class Commentable(models.Model, GetSubclassesMixin):
+        constraints = [
+            models.UniqueConstraint(fields=["version_group", "version_number"], name="unique_version"),
+            models.UniqueConstraint(
+                fields=["version_group"], condition=models.Q(is_latest=True), name="unique_latest_version"
+            ),
+        ]
+        indexes = [
+            # Backs the keyset pagination of the article feed (see `homepage.feed`)
+            models.Index(
+                fields=["-created", "-versionable_id"], condition=models.Q(is_latest=True), name="latest_version_feed"
+            ),
+        ]
+
+
+class Commentable(PolymorphicMixin, models.Model):
     """
     This serves as super class to all entities being considered as 'commentable'.
     """
 
     commentable_id = models.BigAutoField(primary_key=True)
+    commentable_type = models.ForeignKey(
+        ContentType, on_delete=models.PROTECT, null=True, editable=False, related_name="+"
+    )
 
-    def __str__(self) -> str:
-        """
-        Determine which type created this object and return its name + its __str__ value.
-        """
-        subclasses = self.get_subclasses()
-        for subclass in subclasses:
-            try:
-                matches = subclass.objects.filter(commentable_ptr_id=self.commentable_id)  # type: ignore[misc]
-                # mypy error:
-                # Cannot resolve keyword 'commentable_ptr_id' into field.
-                # Choices are: article, comment, commentable_id, comments, liked_by, project, user
-                # With the try-except block we make sure that the error is ignored.
-                if matches.count() == 1:
-                    return f"{subclass.__name__}: {str(matches.first())}"
-            except AttributeError:
-                pass
-        return f"Commentable: {self.commentable_id}"
+    like_count = models.PositiveIntegerField(default=0, editable=False)
+    "The number of users liking this entity. It is maintained by `homepage.counters`."
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    "The number of comments (not versions) on this entity. It is maintained by `homepage.counters`."
+
+    type_field_name = "commentable_type"
+
+    objects = PolymorphicQuerySet.as_manager()
 
 
-class Followable(models.Model, GetSubclassesMixin):
+class Followable(PolymorphicMixin, models.Model):
     """
     This serves as super class to all entities being considered as 'followable'.
     """
 
     followable_id = models.BigAutoField(primary_key=True)
+    followable_type = models.ForeignKey(
+        ContentType, on_delete=models.PROTECT, null=True, editable=False, related_name="+"
+    )
 
-    def __str__(self) -> str:
-        """
-        Determine which type created this object and return its name + its __str__ value.
-        """
-        subclasses = self.get_subclasses()
-        for subclass in subclasses:
-            try:
-                matches = subclass.objects.filter(followable_ptr_id=self.followable_id)  # type: ignore[misc]
-                # mypy error:
-                # Cannot resolve keyword 'followable_ptr_id' into field.
-                # Choices are: followable_id, followed_by, project, user
-                # With the try-except block we make sure that the error is ignored.
-                if matches.count() == 1:
-                    return f"{subclass.__name__}: {str(matches.first())}"
-            except AttributeError:
-                pass
-        return f"Followable: {self.followable_id}"
+    follower_count = models.PositiveIntegerField(default=0, editable=False)
+    "The number of users following this entity. It is maintained by `homepage.counters`."
+
+    type_field_name = "followable_type"
+
+    objects = PolymorphicQuerySet.as_manager()
 
 
 class Tag(models.Model):
@@ -209,7 +519,8 @@ class User(Followable, Commentable):
     """
 
     id = models.BigAutoField(primary_key=True)
-    alias = models.CharField(max_length=32)
+    alias = models.CharField(max_length=32, db_index=True)
+    "Indexed for the prefix search of the admin"
     name = models.CharField(max_length=32)
     follows = models.ManyToManyField(Followable, blank=True, related_name="followed_by")
     likes = models.ManyToManyField(Commentable, blank=True, related_name="liked_by")
@@ -227,10 +538,68 @@ class Comment(Commentable, Versionable):
     content = models.TextField()
     commented_on = models.ForeignKey(Commentable, on_delete=models.RESTRICT, related_name="comments")
     written_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name="written_comments")
+    thread_root = models.ForeignKey(
+        Commentable, on_delete=models.CASCADE, null=True, editable=False, related_name="thread_comments"
+    )
+    "The commentable (which is no comment) at the top of the discussion."
+    path = models.TextField(default="", editable=False)
+    """
+    The materialized path of this comment in the discussion: The zero-padded version groups of all parent comments
+    and of this comment. Ordering a discussion by the path yields its comments depth-first.
+    """
+
+    objects = VersionableQuerySet.as_manager()
+
+    @property
+    def depth(self) -> int:
+        """
+        The nesting level of this comment. Comments directly on the thread root have the depth 1.
+        """
+        return len(self.path) // PATH_SEGMENT_WIDTH
+
+    def save(self, *args, **kwargs):
+        """
+        Saves the comment. The materialized path of a new comment is inserted along with it. New versions keep the path
+        of the comment.
+        """
+        if self.path:
+            return super().save(*args, **kwargs)
+        using = kwargs.get("using") or router.db_for_write(self.__class__, instance=self)
+        with transaction.atomic(using=using):
+            if self.version_group:
+                self._set_path(using)
+            return super().save(*args, **kwargs)
+
+    def allocate_version_group(self, using: str) -> None:
+        """
+        Allocates the 'version_group' and sets the materialized path. The allocation acquires the write lock, i.e. the
+        parent is read afterwards in the same transaction.
+        """
+        super().allocate_version_group(using)
+        self._set_path(using)
+
+    def _set_path(self, using: str) -> None:
+        # pylint: disable=attribute-defined-outside-init,no-member
+        parent = (
+            Comment.objects.using(using)
+            .filter(commentable_ptr_id=self.commented_on_id)
+            .values_list("thread_root_id", "path")
+            .first()
+        )
+        if parent is None:
+            self.thread_root_id, parent_path = self.commented_on_id, ""
+        else:
+            self.thread_root_id, parent_path = parent
+        self.path = parent_path + format_path_segment(self.version_group)
 
     def __str__(self) -> str:
         return self.content if len(self.content) <= 64 else self.content[:61] + "..."
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["thread_root", "path"], name="comment_thread"),
+        ]
+
 
 class Project(Commentable, Followable):
     """
@@ -242,14 +611,23 @@ class Project(Commentable, Followable):
     subtitle = models.CharField(max_length=128, null=True)
     description = models.TextField()
     thumbnail = models.ImageField(null=True, blank=True)
+    thumbnail_variants = models.JSONField(null=True, editable=False)
+    "The resized variants of the thumbnail (see `homepage.images`). They are created in the background after saving."
     related_authors = models.ManyToManyField(User, blank=True, related_name="related_projects")
     related_tags = models.ManyToManyField(Tag, blank=True, related_name="related_projects")
     related_categories = models.ManyToManyField(Category, blank=True, related_name="related_projects")
     visibility = models.CharField(max_length=16, choices=Visibility.choices, default=Visibility.PRIVATE)
 
+    objects = ProjectQuerySet.as_manager()
+
     def __str__(self) -> str:
         return self.title
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["visibility", "followable_ptr"], name="project_visibility"),
+        ]
+
 
 class Article(Commentable, Versionable):
     """
@@ -259,13 +637,163 @@ class Article(Commentable, Versionable):
     id = models.BigAutoField(primary_key=True)
     title = models.CharField(max_length=64)
     subtitle = models.CharField(max_length=128, null=True)
-    content = models.TextField()
+    content = models.TextField(blank=True)
+    "The full text of the article. It is empty for old revisions stored as delta, use `get_content()` instead."
+    content_delta = models.BinaryField(null=True, editable=False)
+    "The compressed delta to rebuild the content from the next newer revision (see `homepage.revisions`)."
     thumbnail = models.ImageField(null=True, blank=True)
+    thumbnail_variants = models.JSONField(null=True, editable=False)
+    "The resized variants of the thumbnail (see `homepage.images`). They are created in the background after saving."
     related_project = models.ForeignKey(Project, on_delete=models.SET_NULL, null=True, related_name="related_articles")
     related_authors = models.ManyToManyField(User, blank=True, related_name="related_articles")
     related_tags = models.ManyToManyField(Tag, blank=True, related_name="related_articles")
     related_categories = models.ManyToManyField(Category, blank=True, related_name="related_articles")
     visibility = models.CharField(max_length=16, choices=Visibility.choices, default=Visibility.PRIVATE)
 
+    objects = ArticleQuerySet.as_manager()
+
+    def get_content(self) -> str:
+        """
+        Returns the full text of this revision. Old revisions stored as delta are rebuilt from the next newer
+        revisions. The rebuilt text is cached as revisions never change.
+        """
+        if self.content_delta is None:
+            return self.content
+        # The checksum protects against stale entries if IDs are reused (e.g. after the database was reset)
+        cache_key = f"homepage:article-content:{self.versionable_id}:{zlib.crc32(self.content_delta)}"
+        content = cache.get(cache_key)
+        if content is None:
+            newer_revisions = (
+                Article.objects.using(self._state.db)
+                .filter(version_group=self.version_group, version_number__gt=self.version_number)
+                .order_by("version_number")
+                .values_list("content", "content_delta")
+                .iterator(chunk_size=revisions.get_keyframe_interval())
+            )
+            deltas = [self.content_delta]
+            for newer_content, newer_delta in newer_revisions:
+                if newer_delta is None:
+                    content = newer_content
+                    break
+                deltas.append(newer_delta)
+            else:
+                raise ValueError(f"Revision {self.versionable_id} can't be rebuilt: No newer full text found.")
+            for delta in reversed(deltas):
+                content = revisions.apply_delta(content, delta)
+            cache.set(cache_key, content, None)
+        return content
+
+    def new_version(self) -> "Article":
+        """
+        Creates a new version of this article. The new version always holds the full text.
+        """
+        article = super().new_version()
+        article.content = self.get_content()
+        article.content_delta = None
+        return article
+
+    def _get_previous_revision(self, using: str) -> Optional["Article"]:
+        return (
+            Article.objects.using(using)
+            .filter(version_group=self.version_group, version_number__lt=self.version_number)
+            .order_by("-version_number")
+            .only("versionable_id", "version_group", "version_number", "content", "content_delta")
+            .first()
+        )
+
+    def save(self, *args, **kwargs):
+        """
+        Saves the article. If a new version is added (or the full text of a revision is changed) the next older
+        revision is stored as delta to this one, unless it is a keyframe.
+        """
+        using = kwargs.get("using") or router.db_for_write(self.__class__, instance=self)
+        if not self.version_group or self.content_delta is not None:
+            return super().save(*args, **kwargs)
+        with transaction.atomic(using=using):
+            previous = self._get_previous_revision(using)
+            previous_content = None
+            if previous is not None and previous.content_delta is not None:
+                # The delta of the previous revision refers to the text this revision had before.
+                previous_content = previous.get_content()
+            elif previous is not None and self._state.adding and not revisions.is_keyframe(previous.version_number):
+                previous_content = previous.content
+            result = super().save(*args, **kwargs)
+            if previous_content is not None:
+                if revisions.is_keyframe(previous.version_number):  # type: ignore[union-attr]
+                    changes = {"content": previous_content, "content_delta": None}
+                else:
+                    changes = {"content": "", "content_delta": revisions.make_delta(self.content, previous_content)}
+                Article.objects.using(using).filter(pk=previous.pk).update(**changes)  # type: ignore[union-attr]
+            return result
+
+    def restore_previous_revision(self, using: str) -> None:
+        """
+        Restores the full text of the next older revision if it is stored as delta to this one. It is called before
+        the article is deleted (see `homepage.signals.restore_previous_revision`).
+        """
+        previous = self._get_previous_revision(using) if self.version_group else None
+        if previous is not None and previous.content_delta is not None:
+            Article.objects.using(using).filter(pk=previous.pk).update(
+                content=previous.get_content(), content_delta=None
+            )
+
     def __str__(self) -> str:
         return self.title
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["visibility", "versionable_ptr"], name="article_visibility"),
+        ]
+
+
+class TimelineEntry(models.Model):
+    """
+    An entry of the materialized timeline of a user. It is created for every follower of the followable `source`
+    when a new article or comment of the source is saved (fan-out on write, see `homepage.timeline`).
+    """
+
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="timeline_entries")
+    item = models.ForeignKey(Versionable, on_delete=models.CASCADE, related_name="+")
+    "The first version of the new article or comment."
+    source = models.ForeignKey(Followable, on_delete=models.CASCADE, related_name="+")
+    created = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return f"{self.owner}: {self.item_id}"  # pylint: disable=no-member
+
+    class Meta:
+        verbose_name_plural = "timeline entries"
+        constraints = [
+            models.UniqueConstraint(fields=["owner", "item"], name="unique_timeline_entry"),
+        ]
+        indexes = [
+            models.Index(fields=["owner", "-created"], name="timeline_entry_owner"),
+        ]
+
+
+class SearchDocument(models.Model):
+    """
+    The searchable text of an article (its newest version) or a project. The full-text index of the documents is
+    maintained by the database (see `homepage.search`) and has no model field.
+    """
+
+    key = models.CharField(max_length=32, unique=True)
+    "Identifies the indexed entity, e.g. 'article:<version_group>' or 'project:<id>'."
+    article = models.OneToOneField(
+        Article, on_delete=models.CASCADE, null=True, editable=False, related_name="search_document"
+    )
+    project = models.OneToOneField(
+        Project, on_delete=models.CASCADE, null=True, editable=False, related_name="search_document"
+    )
+    title = models.TextField()
+    body = models.TextField()
+    visibility = models.CharField(max_length=16, choices=Visibility.choices)
+    "A copy of the visibility of the indexed entity to filter the public documents without a join."
+
+    def __str__(self) -> str:
+        return self.key
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["visibility"], name="search_document_visibility"),
+        ]
@@ -0,0 +1,395 @@
+"""
+Contains the opt-in profiling of the requests. It is enabled by the setting `HOMEPAGE_PROFILING`.
+For every sampled request, `RequestProfilingMiddleware` records the duration, the number and the total time of the
+database queries, the time spent rendering templates, the name of the view and the category of the page. Queries
+executed many times by one request (e.g. by the `__str__` methods of polymorphic models in a list) are logged as
+warning. The measurements are aggregated into histograms per view which are
+- logged every `HOMEPAGE_PROFILING_LOG_INTERVAL` seconds by the logger `homepage.profiling`
+- returned as JSON by the view `homepage:profiling` (staff users only)
+The overhead is a timer and a dictionary update per query and per rendered template. The aggregation is shared by all
+threads of a process, i.e. every worker process reports its own numbers.
+The middleware supports sync and async requests. The profile of the current request is stored in a context variable,
+so the queries are attributed to it in the threads running the sync parts of async requests as well.
+"""
+import logging
+import random
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.base import Template
+
+from homepage.models import Category
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_RATE = 1.0
+DEFAULT_REPEATED_QUERY_THRESHOLD = 10
+DEFAULT_LOG_INTERVAL = 60.0
+DURATION_BOUNDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+"The upper bounds (in milliseconds) of the buckets of the duration histograms"
+QUERY_COUNT_BOUNDS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+"The upper bounds of the buckets of the query count histograms"
+
+
+def is_enabled() -> bool:
+    """
+    Whether the requests are profiled. It can be configured by the setting `HOMEPAGE_PROFILING`.
+    """
+    return getattr(settings, "HOMEPAGE_PROFILING", False)
+
+
+def get_sample_rate() -> float:
+    """
+    The share of the requests which are profiled. It can be configured by the setting
+    `HOMEPAGE_PROFILING_SAMPLE_RATE`.
+    """
+    return getattr(settings, "HOMEPAGE_PROFILING_SAMPLE_RATE", DEFAULT_SAMPLE_RATE)
+
+
+def get_repeated_query_threshold() -> int:
+    """
+    A warning is logged if a request executes the same SQL statement (with any parameters) at least this often. It can
+    be configured by the setting `HOMEPAGE_PROFILING_REPEATED_QUERY_THRESHOLD`.
+    """
+    return getattr(settings, "HOMEPAGE_PROFILING_REPEATED_QUERY_THRESHOLD", DEFAULT_REPEATED_QUERY_THRESHOLD)
+
+
+def get_log_interval() -> float:
+    """
+    The number of seconds between the log lines of the aggregated histograms. It can be configured by the setting
+    `HOMEPAGE_PROFILING_LOG_INTERVAL`.
+    """
+    return getattr(settings, "HOMEPAGE_PROFILING_LOG_INTERVAL", DEFAULT_LOG_INTERVAL)
+
+
+class Histogram:
+    """
+    A histogram with fixed buckets. The last bucket counts the values greater than the largest bound.
+    """
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def add(self, value: float) -> None:
+        """
+        Adds a value to its bucket.
+        """
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, quantile: float) -> float:
+        """
+        Returns the upper bound of the bucket containing the quantile (e.g. 0.95 for the p95). It is infinite if the
+        quantile is greater than the largest bound.
+        """
+        rank = quantile * self.count
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return float("inf")
+
+    def to_dict(self) -> dict:
+        """
+        Returns the histogram with cumulative buckets like Prometheus.
+        """
+        buckets = {}
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        buckets["+Inf"] = self.count
+        return {"count": self.count, "sum": round(self.sum, 3), "buckets": buckets}
+
+
+class RequestProfile:
+    """
+    The measurements of a single request.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.duration = 0.0
+        self.statements: Counter[str] = Counter()
+        "The number of executions of every SQL statement (regardless of its parameters)"
+        self.duplicates = 0
+        "The number of queries which repeated an earlier query with the same parameters"
+        self.executed: set = set()
+        self.rendering = False
+        "Whether a template is rendered. Nested templates (e.g. includes) are measured by the outermost one."
+
+    def execute(self, execute, sql, params, many, context):  # pylint: disable=too-many-arguments
+        """
+        Measures a query of the request.
+        """
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.queries += 1
+            self.statements[sql] += 1
+            try:
+                key = (sql, tuple(params) if isinstance(params, list) else params)
+                hash(key)
+            except TypeError:
+                key = (sql, repr(params))
+            if key in self.executed:
+                self.duplicates += 1
+            else:
+                self.executed.add(key)
+
+    def get_most_repeated(self) -> tuple[Optional[str], int]:
+        """
+        Returns the SQL statement executed most often and the number of its executions.
+        """
+        if not self.statements:
+            return None, 0
+        return self.statements.most_common(1)[0]
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("homepage_profile", default=None)
+
+
+def _execute(execute, sql, params, many, context):  # pylint: disable=too-many-arguments
+    profile = _current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    return profile.execute(execute, sql, params, many, context)
+
+
+def _instrument_connection(connection, **kwargs) -> None:  # pylint: disable=unused-argument
+    if _execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute)
+
+
+def instrument_queries() -> None:
+    """
+    Installs an execute wrapper measuring the queries of the profiled requests into every database connection. Every
+    thread has its own connections, so the wrapper is installed when they are connected.
+    """
+    connection_created.connect(_instrument_connection, dispatch_uid="homepage.profiling")
+    for connection in connections.all(initialized_only=True):
+        _instrument_connection(connection)
+
+
+def instrument_templates() -> None:
+    """
+    Wraps the rendering of django templates to measure the render time of the profiled requests. The time includes
+    the queries executed while rendering, e.g. of lazy querysets.
+    """
+    if getattr(Template.render, "profiled", False):
+        return
+    render = Template.render
+
+    def profiled_render(self, context):
+        profile = _current_profile.get()
+        if profile is None or profile.rendering:
+            return render(self, context)
+        profile.rendering = True
+        start = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            profile.template_time += time.perf_counter() - start
+            profile.rendering = False
+
+    profiled_render.profiled = True  # type: ignore[attr-defined]
+    Template.render = profiled_render  # type: ignore[method-assign]
+
+
+class ViewStats:
+    """
+    The aggregated measurements of the requests of a view.
+    """
+
+    def __init__(self) -> None:
+        self.duration = Histogram(DURATION_BOUNDS)
+        self.sql_time = Histogram(DURATION_BOUNDS)
+        self.template_time = Histogram(DURATION_BOUNDS)
+        self.queries = Histogram(QUERY_COUNT_BOUNDS)
+        self.duplicates = 0
+        "The number of duplicate queries of all requests"
+        self.repeated_query_requests = 0
+        "The number of requests exceeding the repeated query threshold"
+
+    def add(self, profile: RequestProfile, repeated: bool) -> None:
+        """
+        Adds the measurements of a request.
+        """
+        self.duration.add(profile.duration * 1000)
+        self.sql_time.add(profile.sql_time * 1000)
+        self.template_time.add(profile.template_time * 1000)
+        self.queries.add(profile.queries)
+        self.duplicates += profile.duplicates
+        self.repeated_query_requests += repeated
+
+    def summarize(self) -> str:
+        """
+        Returns a summary for a log line.
+        """
+        count = self.duration.count
+        return (
+            f"requests={count} duration_p50<={self.duration.quantile(0.5)}ms "
+            f"duration_p95<={self.duration.quantile(0.95)}ms queries_p95<={self.queries.quantile(0.95)} "
+            f"sql_mean={self.sql_time.sum / count:.1f}ms template_mean={self.template_time.sum / count:.1f}ms "
+            f"duplicates={self.duplicates} repeated_query_requests={self.repeated_query_requests}"
+        )
+
+    def to_dict(self) -> dict:
+        """
+        Returns the histograms and counters.
+        """
+        return {
+            "duration_ms": self.duration.to_dict(),
+            "sql_time_ms": self.sql_time.to_dict(),
+            "template_time_ms": self.template_time.to_dict(),
+            "queries": self.queries.to_dict(),
+            "duplicates": self.duplicates,
+            "repeated_query_requests": self.repeated_query_requests,
+        }
+
+
+class ProfilingStats:
+    """
+    The aggregated measurements of all profiled requests of this process by view (and category).
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.views: dict[str, ViewStats] = {}
+        self.last_log = time.monotonic()
+
+    def add(self, profile: RequestProfile, view: str, category: Optional[str]) -> None:
+        """
+        Adds the measurements of a request and logs the histograms if the log interval elapsed.
+        """
+        key = view if category is None else f"{view}[{category}]"
+        statement, executions = profile.get_most_repeated()
+        repeated = executions >= get_repeated_query_threshold()
+        if repeated:
+            logger.warning(
+                "%s executed the same query %d times (%d queries in total): %.200s",
+                key,
+                executions,
+                profile.queries,
+                statement,
+            )
+        logger.debug(
+            "%s duration=%.1fms queries=%d sql=%.1fms template=%.1fms duplicates=%d",
+            key,
+            profile.duration * 1000,
+            profile.queries,
+            profile.sql_time * 1000,
+            profile.template_time * 1000,
+            profile.duplicates,
+        )
+        lines = []
+        with self.lock:
+            self.views.setdefault(key, ViewStats()).add(profile, repeated)
+            if time.monotonic() - self.last_log >= get_log_interval():
+                self.last_log = time.monotonic()
+                lines = [(name, stats.summarize()) for name, stats in sorted(self.views.items())]
+        for name, summary in lines:
+            logger.info("%s %s", name, summary)
+
+    def to_dict(self) -> dict:
+        """
+        Returns the histograms of all views.
+        """
+        with self.lock:
+            return {name: stats.to_dict() for name, stats in sorted(self.views.items())}
+
+    def reset(self) -> None:
+        """
+        Discards all measurements.
+        """
+        with self.lock:
+            self.views.clear()
+
+
+stats = ProfilingStats()
+
+
+def _get_category(kwargs: dict) -> Optional[str]:
+    # The category resolved by the `CategoryConverter` of the URL
+    for value in kwargs.values():
+        if isinstance(value, Category):
+            return value.name
+    return None
+
+
+# pylint: disable=too-few-public-methods
+class RequestProfilingMiddleware:
+    """
+    Profiles a sample of the requests (see the module documentation). It should be the first middleware to include
+    the other middlewares into the measurements. It isn't used if the profiling is disabled.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        if not is_enabled():
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        instrument_queries()
+        instrument_templates()
+
+    def __call__(self, request):
+        if self.is_async:
+            return self._acall(request)
+        if random.random() >= get_sample_rate():  # nosec
+            return self.get_response(request)
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+        self._add(request, profile, start)
+        return response
+
+    async def _acall(self, request):
+        if random.random() >= get_sample_rate():  # nosec
+            return await self.get_response(request)
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+        self._add(request, profile, start)
+        return response
+
+    @staticmethod
+    def _add(request, profile: RequestProfile, start: float) -> None:
+        profile.duration = time.perf_counter() - start
+        match = request.resolver_match
+        if match is None:
+            stats.add(profile, "<unresolved>", None)
+        else:
+            stats.add(profile, match.view_name, _get_category(match.kwargs))
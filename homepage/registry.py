@@ -0,0 +1,99 @@
+"""
+Contains a registry of the model class hierarchy of the homepage app.
+The hierarchy can't change while the server is running. Therefore, the registry is built once when the app is ready
+(see `HomepageConfig.ready()`) and is immutable afterwards.
+"""
+from types import MappingProxyType
+from typing import Iterable, Mapping, Optional
+
+from django.core.exceptions import AppRegistryNotReady
+from django.db import models
+
+
+class SubclassRegistry:
+    """
+    Maps the models of an app to their subclasses and the parent links of multi-table inheritance to the subclasses.
+    """
+
+    def __init__(self) -> None:
+        self._subclasses: Optional[Mapping[type[models.Model], tuple[type[models.Model], ...]]] = None
+        self._parent_links: Optional[
+            Mapping[tuple[type[models.Model], type[models.Model]], models.OneToOneField]
+        ] = None
+        self._subclasses_by_parent_link: Optional[Mapping[models.OneToOneField, type[models.Model]]] = None
+        self._subclasses_by_accessor: Optional[Mapping[tuple[type[models.Model], str], type[models.Model]]] = None
+
+    @property
+    def ready(self) -> bool:
+        """
+        Whether the registry is populated.
+        """
+        return self._subclasses is not None
+
+    def populate(self, model_classes: Iterable[type[models.Model]]) -> None:
+        """
+        Builds the registry from the given model classes. Can only be called once.
+        """
+        # pylint: disable=protected-access
+        if self.ready:
+            raise RuntimeError("The subclass registry is already populated.")
+        model_classes = list(model_classes)
+        subclasses = {
+            base: tuple(model for model in model_classes if issubclass(model, base) and model is not base)
+            for base in model_classes
+        }
+        parent_links = {
+            (model, parent): parent_link
+            for model in model_classes
+            for parent, parent_link in model._meta.parents.items()
+            if parent_link is not None
+        }
+        self._parent_links = MappingProxyType(parent_links)
+        self._subclasses_by_parent_link = MappingProxyType(
+            {parent_link: model for (model, _), parent_link in parent_links.items()}
+        )
+        self._subclasses_by_accessor = MappingProxyType(
+            {
+                (parent, parent_link.remote_field.get_accessor_name()): model
+                for (model, parent), parent_link in parent_links.items()
+            }
+        )
+        self._subclasses = MappingProxyType(subclasses)
+
+    def _check_ready(self) -> None:
+        if not self.ready:
+            raise AppRegistryNotReady("The subclass registry isn't populated yet.")
+
+    def get_subclasses(self, base: type[models.Model]) -> tuple[type[models.Model], ...]:
+        """
+        Returns all (direct and indirect) subclasses of `base`.
+        """
+        self._check_ready()
+        return self._subclasses.get(base, ())  # type: ignore[union-attr]
+
+    def get_parent_link(self, subclass: type[models.Model], base: type[models.Model]) -> models.OneToOneField:
+        """
+        Returns the field linking the table of `subclass` to the table of its direct parent `base`,
+        e.g. `Article.commentable_ptr` for `(Article, Commentable)`.
+        """
+        self._check_ready()
+        return self._parent_links[(subclass, base)]  # type: ignore[index]
+
+    def get_subclass_by_parent_link(self, parent_link: models.OneToOneField) -> type[models.Model]:
+        """
+        Returns the subclass owning the parent link, e.g. `Article` for `Article.commentable_ptr`.
+        """
+        self._check_ready()
+        return self._subclasses_by_parent_link[parent_link]  # type: ignore[index]
+
+    def get_subclass_by_accessor(self, base: type[models.Model], accessor_name: str) -> type[models.Model]:
+        """
+        Returns the subclass of `base` which is reachable by the reverse accessor of its parent link,
+        e.g. `Article` for `(Commentable, "article")`.
+        """
+        self._check_ready()
+        return self._subclasses_by_accessor[(base, accessor_name)]  # type: ignore[index]
+
+
+subclass_registry = SubclassRegistry()
+"The registry of the homepage app. It is populated by `HomepageConfig.ready()`."
@@ -0,0 +1,67 @@
+"""
+Contains functions to store old revisions of texts as compressed deltas.
+A delta describes how to rebuild an old revision from the text of the next newer revision (reverse delta). This way,
+the newest revision (the head) is always stored as full text and reading it doesn't need to apply any delta.
+"""
+import difflib
+import json
+import zlib
+
+from django.conf import settings
+
+DEFAULT_KEYFRAME_INTERVAL = 16
+
+
+def get_keyframe_interval() -> int:
+    """
+    Every revision whose version number is a multiple of this interval is stored as full text (keyframe).
+    This limits the number of deltas to apply when rebuilding an old revision.
+    It can be configured by the setting `HOMEPAGE_REVISION_KEYFRAME_INTERVAL`. An interval of 1 disables the deltas.
+    """
+    return getattr(settings, "HOMEPAGE_REVISION_KEYFRAME_INTERVAL", DEFAULT_KEYFRAME_INTERVAL)
+
+
+def is_keyframe(version_number: int) -> bool:
+    """
+    Returns true if the revision with this version number has to be stored as full text.
+    """
+    return version_number % get_keyframe_interval() == 0
+
+
+def make_delta(base: str, target: str) -> bytes:
+    """
+    Creates a compressed line based delta to rebuild `target` from `base`.
+    :param base: The text the delta will be applied to (i.e. the newer revision)
+    :param target: The text the delta rebuilds (i.e. the older revision)
+    :return: The compressed delta
+    """
+    base_lines = base.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+    operations: list[list] = []
+    matcher = difflib.SequenceMatcher(None, base_lines, target_lines, autojunk=False)
+    for tag, base_start, base_end, target_start, target_end in matcher.get_opcodes():
+        if tag == "equal":
+            # Copy the lines [base_start, base_end) of the base
+            operations.append([base_start, base_end])
+        elif tag in ("replace", "insert"):
+            # Insert the lines of the target
+            operations.append(target_lines[target_start:target_end])
+        # "delete" needs no operation as the lines of the base are simply not copied.
+    return zlib.compress(json.dumps(operations, separators=(",", ":")).encode("utf-8"))
+
+
+def apply_delta(base: str, delta: bytes) -> str:
+    """
+    Applies a delta created by `make_delta` to `base`.
+    :param base: The text of the newer revision
+    :param delta: The compressed delta
+    :return: The text of the older revision
+    """
+    base_lines = base.splitlines(keepends=True)
+    result: list[str] = []
+    for operation in json.loads(zlib.decompress(bytes(delta))):
+        if operation and isinstance(operation[0], int):
+            result.extend(base_lines[operation[0] : operation[1]])
+        else:
+            result.extend(operation)
+    return "".join(result)
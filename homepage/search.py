@@ -0,0 +1,307 @@
+"""
+Contains the full-text search over articles and projects.
+The searchable text of every project and of the newest version of every article is stored as `SearchDocument`. The
+documents are updated by the signal receivers in `homepage.signals` whenever an article or project is saved. The
+full-text index itself is maintained by the database (see migration `0011_search_document`):
+- PostgreSQL: A generated `tsvector` column with a GIN index
+- SQLite: An FTS5 table kept in sync by triggers
+Both are queried by a backend with the same interface. Use `search()` to query the index of the default database.
+"""
+import abc
+import re
+from typing import Iterable, NamedTuple, Optional, Union
+
+from django.db import connections, models
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import SafeString, mark_safe
+
+from homepage.models import (
+    Article,
+    Category,
+    Project,
+    SearchDocument,
+    Tag,
+    User,
+    get_visible_levels,
+)
+
+DEFAULT_LIMIT = 20
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+"The markers of the matches in the snippets created by the databases. They are replaced after escaping the snippet."
+
+
+class SearchResult(NamedTuple):
+    """
+    A search result ordered by its rank (higher is better).
+    """
+
+    document: SearchDocument
+    rank: float
+    snippet: SafeString
+    "An excerpt of the text with the matches highlighted by `<mark>`."
+
+    @property
+    def entity(self) -> Union[Article, Project]:
+        """
+        The found article or project.
+        """
+        return self.document.article or self.document.project  # type: ignore[return-value]
+
+
+def get_terms(query: str) -> list[str]:
+    """
+    Splits the query of the user into search terms. All terms have to match. Operators of the databases' query
+    syntax are ignored, i.e. any user input is a valid query.
+    """
+    return re.findall(r"\w+", query)
+
+
+def format_snippet(snippet: str) -> SafeString:
+    """
+    Escapes the snippet and highlights the matches.
+    """
+    return mark_safe(escape(snippet).replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_END, "</mark>"))  # nosec
+
+
+# pylint: disable=too-few-public-methods
+class SearchBackend(abc.ABC):
+    """
+    Queries the full-text index of a database.
+    """
+
+    def __init__(self, using: str) -> None:
+        self.using = using
+
+    @abc.abstractmethod
+    def search(
+        self, terms: list[str], documents: Optional[models.QuerySet], limit: int, offset: int
+    ) -> list[tuple[int, float, str]]:
+        """
+        Returns the IDs, ranks and raw snippets of the best matching documents.
+        :param terms: The search terms. All terms have to match.
+        :param documents: Only return these documents. None to search all documents.
+        :param limit: The maximum number of results
+        :param offset: The number of results to skip
+        """
+
+    def _execute(self, sql: str, params: list) -> list[tuple[int, float, str]]:
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    @staticmethod
+    def _filter(document_id: str, documents: Optional[models.QuerySet]) -> tuple[str, list]:
+        """
+        Returns the SQL condition to restrict the matches to `documents`. It is a correlated subquery (instead of
+        `IN`) so the full-text match stays the driving part of the query.
+        """
+        if documents is None:
+            return "", []
+        sql, params = documents.filter(id=RawSQL(document_id, [])).values("id").query.sql_with_params()
+        return f" AND EXISTS ({sql})", list(params)
+
+
+class SqliteSearchBackend(SearchBackend):
+    """
+    Queries the FTS5 table of SQLite. The documents are ranked by BM25 with the title weighted ten times the body.
+    """
+
+    def search(
+        self, terms: list[str], documents: Optional[models.QuerySet], limit: int, offset: int
+    ) -> list[tuple[int, float, str]]:
+        filter_sql, filter_params = self._filter("homepage_searchdocument_fts.rowid", documents)
+        # Quoted terms are matched literally. Consecutive terms are combined by AND.
+        match = " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+        # The snippets are only created for the returned page.
+        return self._execute(
+            "SELECT rowid, -bm25(homepage_searchdocument_fts, 10.0, 1.0) AS rank, "
+            "snippet(homepage_searchdocument_fts, 1, %s, %s, '…', 24) "
+            "FROM homepage_searchdocument_fts WHERE homepage_searchdocument_fts MATCH %s AND rowid IN ("
+            "SELECT rowid FROM homepage_searchdocument_fts "
+            f"WHERE homepage_searchdocument_fts MATCH %s{filter_sql} "
+            "ORDER BY bm25(homepage_searchdocument_fts, 10.0, 1.0) LIMIT %s OFFSET %s"
+            ") ORDER BY rank DESC",
+            [HIGHLIGHT_START, HIGHLIGHT_END, match, match, *filter_params, limit, offset],
+        )
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    Queries the GIN index of the `tsvector` column of PostgreSQL. The documents are ranked by cover density. The
+    snippets are only created for the returned page as `ts_headline` has to parse the whole text.
+    """
+
+    def search(
+        self, terms: list[str], documents: Optional[models.QuerySet], limit: int, offset: int
+    ) -> list[tuple[int, float, str]]:
+        filter_sql, filter_params = self._filter("document.id", documents)
+        options = f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, MinWords=15, MaxWords=35"
+        return self._execute(
+            "SELECT id, rank, ts_headline('english', body, query, %s) FROM ("
+            "SELECT document.id, document.body, q.query, ts_rank_cd(document.search_vector, q.query) AS rank "
+            "FROM homepage_searchdocument document, plainto_tsquery('english', %s) AS q(query) "
+            f"WHERE document.search_vector @@ q.query{filter_sql} "
+            "ORDER BY rank DESC LIMIT %s OFFSET %s"
+            ") AS ranked ORDER BY rank DESC",
+            [options, " ".join(terms), *filter_params, limit, offset],
+        )
+
+
+BACKENDS: dict[str, type[SearchBackend]] = {
+    "sqlite": SqliteSearchBackend,
+    "postgresql": PostgresSearchBackend,
+}
+
+
+def get_backend(using: str = "default") -> SearchBackend:
+    """
+    Returns the search backend for the database `using`.
+    """
+    vendor = connections[using].vendor
+    if vendor not in BACKENDS:
+        raise NotImplementedError(f"Full-text search is not supported for database vendor {vendor}")
+    return BACKENDS[vendor](using)
+
+
+def search(  # pylint: disable=too-many-arguments
+    query: str,
+    *,
+    user: Optional[User] = None,
+    is_registered: Optional[bool] = None,
+    is_reviewer: bool = False,
+    is_moderator: bool = False,
+    tags: Iterable[Union[Tag, int]] = (),
+    categories: Iterable[Union[Category, int]] = (),
+    limit: int = DEFAULT_LIMIT,
+    offset: int = 0,
+) -> list[SearchResult]:
+    """
+    Searches the articles and projects visible to the viewer. Needs two queries.
+    :param query: The search query of the user
+    :param user: The viewer (see `visible_to()`)
+    :param is_registered: Whether the viewer is a registered user (see `visible_to()`)
+    :param is_reviewer: Whether the viewer is a reviewer (see `visible_to()`)
+    :param is_moderator: Whether the viewer is a moderator (see `visible_to()`)
+    :param tags: Only return entities with any of these tags
+    :param categories: Only return entities with any of these categories
+    :param limit: The maximum number of results
+    :param offset: The number of results to skip (used for pagination)
+    """
+    terms = get_terms(query)
+    if not terms:
+        return []
+    documents = None
+    if not is_moderator:
+        if is_registered is None:
+            is_registered = user is not None
+        condition = models.Q(visibility__in=get_visible_levels(is_registered, is_reviewer))
+        if user is not None:
+            # The author and follower checks are only necessary for the documents which aren't visible anyway.
+            condition |= models.Q(
+                article__in=Article.objects.visible_to(user, is_registered=is_registered, is_reviewer=is_reviewer)
+            ) | models.Q(
+                project__in=Project.objects.visible_to(user, is_registered=is_registered, is_reviewer=is_reviewer)
+            )
+        documents = SearchDocument.objects.filter(condition)
+    tags = list(tags)
+    if tags:
+        documents = (SearchDocument.objects.all() if documents is None else documents).filter(
+            models.Q(article__related_tags__in=tags) | models.Q(project__related_tags__in=tags)
+        )
+    categories = list(categories)
+    if categories:
+        documents = (SearchDocument.objects.all() if documents is None else documents).filter(
+            models.Q(article__related_categories__in=categories) | models.Q(project__related_categories__in=categories)
+        )
+    matches = get_backend().search(terms, documents, limit, offset)
+    found = (
+        SearchDocument.objects.select_related("article", "project")
+        .defer("body", "article__content", "article__content_delta", "project__description")
+        .in_bulk([document_id for document_id, _, _ in matches])
+    )
+    return [
+        SearchResult(found[document_id], rank, format_snippet(snippet))
+        for document_id, rank, snippet in matches
+        if document_id in found
+    ]
+
+
+def _get_article_fields(article: Article) -> dict:
+    return {
+        "article": article,
+        "project": None,
+        "title": article.title,
+        "body": "\n".join(filter(None, [article.subtitle, article.content])),
+        "visibility": article.visibility,
+    }
+
+
+def _get_project_fields(project: Project) -> dict:
+    return {
+        "article": None,
+        "project": project,
+        "title": project.title,
+        "body": "\n".join(filter(None, [project.subtitle, project.description])),
+        "visibility": project.visibility,
+    }
+
+
+def index_article(article: Article) -> None:
+    """
+    Adds the article to the index or updates its document. Only intended to be called for the newest version.
+    """
+    SearchDocument.objects.using(article._state.db).update_or_create(  # pylint: disable=protected-access
+        key=f"article:{article.version_group}", defaults=_get_article_fields(article)
+    )
+
+
+def index_article_group(version_group: int, using: str = "default") -> None:
+    """
+    Indexes the newest remaining version of the version group, e.g. after the head was deleted. Removes the
+    document if no version is left.
+    """
+    head = Article.objects.using(using).filter(version_group=version_group).order_by("-version_number").first()
+    if head is None:
+        SearchDocument.objects.using(using).filter(key=f"article:{version_group}").delete()
+    else:
+        index_article(head)
+
+
+def index_project(project: Project) -> None:
+    """
+    Adds the project to the index or updates its document.
+    """
+    SearchDocument.objects.using(project._state.db).update_or_create(  # pylint: disable=protected-access
+        key=f"project:{project.pk}", defaults=_get_project_fields(project)
+    )
+
+
+def rebuild_index(batch_size: int = 500) -> int:
+    """
+    Rebuilds the whole index, e.g. after articles were inserted by raw SQL.
+    :return: The number of indexed documents
+    """
+    SearchDocument.objects.all().delete()
+    documents = (
+        SearchDocument(key=f"article:{article.version_group}", **_get_article_fields(article))
+        for article in Article.objects.latest_versions().iterator(chunk_size=batch_size)
+    )
+    count = _bulk_create(documents, batch_size)
+    documents = (
+        SearchDocument(key=f"project:{project.pk}", **_get_project_fields(project))
+        for project in Project.objects.iterator(chunk_size=batch_size)
+    )
+    return count + _bulk_create(documents, batch_size)
+
+
+def _bulk_create(documents: Iterable[SearchDocument], batch_size: int) -> int:
+    count = 0
+    batch: list[SearchDocument] = []
+    for document in documents:
+        batch.append(document)
+        if len(batch) >= batch_size:
+            count += len(SearchDocument.objects.bulk_create(batch))
+            batch = []
+    return count + len(SearchDocument.objects.bulk_create(batch))
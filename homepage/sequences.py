@@ -0,0 +1,88 @@
+"""
+Contains database backed sequences to allocate IDs which are not primary keys.
+The sequences are created by migrations. On PostgreSQL a native sequence is used, on SQLite a single row counter
+table emulates it.
+"""
+from django.db import connections, transaction
+
+VERSION_GROUP_SEQUENCE = "homepage_version_group_seq"
+
+
+def create_sequence(connection, name: str, table: str, column: str) -> None:
+    """
+    Creates the sequence `name` and initializes it with the maximum value of `table`.`column`.
+    Only intended to be used inside migrations.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(f"CREATE SEQUENCE IF NOT EXISTS {name}")
+            cursor.execute(f"SELECT setval('{name}', COALESCE((SELECT MAX({column}) FROM {table}), 0) + 1, false)")
+        elif connection.vendor == "sqlite":
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {name} "
+                "(id integer NOT NULL PRIMARY KEY CHECK (id = 1), value bigint NOT NULL)"
+            )
+            cursor.execute(f"INSERT INTO {name} (id, value) SELECT 1, COALESCE(MAX({column}), 0) FROM {table}")
+
+
+def drop_sequence(connection, name: str) -> None:
+    """
+    Drops the sequence `name`. Only intended to be used inside migrations.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(f"DROP SEQUENCE IF EXISTS {name}")
+        elif connection.vendor == "sqlite":
+            cursor.execute(f"DROP TABLE IF EXISTS {name}")
+
+
+def next_value(name: str, using: str = "default") -> int:
+    """
+    Returns the next value of the sequence `name`. The allocation is atomic, i.e. concurrent callers (even from
+    different processes) will never get the same value and never have to retry.
+    :param name: The name of the sequence
+    :param using: The database alias to use
+    :return: The allocated value
+    """
+    connection = connections[using]
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT nextval(%s)", [name])
+            return cursor.fetchone()[0]
+    if connection.vendor == "sqlite":
+        # The UPDATE acquires the write lock of the database which is held until the end of the transaction.
+        # Therefore, nobody can increment the counter between the UPDATE and the SELECT.
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.execute(f"UPDATE {name} SET value = value + 1 WHERE id = 1")
+            cursor.execute(f"SELECT value FROM {name} WHERE id = 1")
+            return cursor.fetchone()[0]
+    raise NotImplementedError(f"Sequences are not supported for database vendor {connection.vendor}")
+
+
+def next_values(name: str, count: int, using: str = "default") -> list[int]:
+    """
+    Allocates `count` values of the sequence `name` at once. Intended for bulk inserts.
+    :param name: The name of the sequence
+    :param count: The number of values to allocate
+    :param using: The database alias to use
+    :return: The allocated values in ascending order
+    """
+    connection = connections[using]
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT nextval(%s) FROM generate_series(1, %s)", [name, count])
+            return sorted(row[0] for row in cursor.fetchall())
+    if connection.vendor == "sqlite":
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.execute(f"UPDATE {name} SET value = value + %s WHERE id = 1", [count])
+            cursor.execute(f"SELECT value FROM {name} WHERE id = 1")
+            last = cursor.fetchone()[0]
+            return list(range(last - count + 1, last + 1))
+    raise NotImplementedError(f"Sequences are not supported for database vendor {connection.vendor}")
+
+
+def next_version_group(using: str = "default") -> int:
+    """
+    Allocates a new and unused `version_group` for a `Versionable`.
+    """
+    return next_value(VERSION_GROUP_SEQUENCE, using=using)
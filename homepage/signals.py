@@ -0,0 +1,184 @@
+"""
+Contains the signal receivers of the homepage app. They are connected when this module is imported by
+`HomepageConfig.ready()`.
+"""
+from django.core.signals import request_finished
+from django.db.models import Count, Max
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from homepage import caching, counters, images, search, timeline
+from homepage.models import Article, Category, Comment, Project, User, Versionable
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_categories(**kwargs) -> None:  # pylint: disable=unused-argument
+    """
+    Invalidates the cached category navigation if a category changes.
+    """
+    caching.invalidate_categories()
+
+
+@receiver([post_save, post_delete], sender=Article)
+@receiver([post_save, post_delete], sender=User)
+@receiver(m2m_changed, sender=Article.related_authors.through)
+@receiver(m2m_changed, sender=Article.related_categories.through)
+def invalidate_feed(**kwargs) -> None:  # pylint: disable=unused-argument
+    """
+    Invalidates the cached pages showing the article feed if an article or one of its authors changes.
+    """
+    caching.invalidate_pages()
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_save, sender=Comment)
+def fan_out_new_item(instance, created: bool, raw: bool, **kwargs) -> None:  # pylint: disable=unused-argument
+    """
+    Adds new articles and comments to the timelines of the followers. New versions of existing items are skipped as
+    the timelines always show the newest version.
+    """
+    if created and not raw and instance.version_number == 1:
+        timeline.fan_out(instance, timeline.get_sources(instance))
+
+
+@receiver(m2m_changed, sender=Article.related_authors.through)
+def fan_out_new_authors(instance, action: str, reverse: bool, pk_set: set[int], **kwargs) -> None:
+    # pylint: disable=unused-argument
+    """
+    Adds new articles to the timelines of the followers of authors added after the article was saved.
+    """
+    if action != "post_add":
+        return
+    if reverse:
+        for article in Article.objects.filter(pk__in=pk_set, version_number=1):
+            timeline.fan_out(article, [instance.followable_ptr_id])
+    elif instance.version_number == 1:
+        timeline.fan_out(instance, User.objects.filter(pk__in=pk_set).values_list("followable_ptr_id", flat=True))
+
+
+@receiver(post_delete, sender=Versionable)
+def promote_previous_version(instance, using: str, **kwargs) -> None:  # pylint: disable=unused-argument
+    """
+    Makes the next older version the head of its version group if the head is deleted. The receiver runs for every
+    deleted version, i.e. for deletes of single objects, querysets and cascades alike.
+    """
+    if instance.is_latest:
+        versions = Versionable.objects.using(using).filter(version_group=instance.version_group)
+        head = versions.order_by("-version_number").values("pk")[:1]
+        Versionable.objects.using(using).filter(pk__in=head).update(is_latest=True)
+
+
+@receiver(m2m_changed, sender=User.likes.through)
+def count_likes(instance, action: str, reverse: bool, pk_set: set[int], **kwargs) -> None:
+    # pylint: disable=unused-argument
+    """
+    Keeps `Commentable.like_count` in sync.
+    """
+    if action in ("post_add", "post_remove"):
+        delta = 1 if action == "post_add" else -1
+        if reverse:
+            counters.add_likes([instance.commentable_id], delta * len(pk_set))
+        else:
+            counters.add_likes(pk_set, delta)
+    elif action == "pre_clear":
+        if reverse:
+            counters.add_likes([instance.commentable_id], -instance.liked_by.count())
+        else:
+            counters.add_likes(instance.likes.values_list("pk", flat=True), -1)
+
+
+@receiver(m2m_changed, sender=User.follows.through)
+def count_followers(instance, action: str, reverse: bool, pk_set: set[int], **kwargs) -> None:
+    # pylint: disable=unused-argument
+    """
+    Keeps `Followable.follower_count` in sync.
+    """
+    if action in ("post_add", "post_remove"):
+        delta = 1 if action == "post_add" else -1
+        if reverse:
+            counters.add_followers([instance.followable_id], delta * len(pk_set))
+        else:
+            counters.add_followers(pk_set, delta)
+    elif action == "pre_clear":
+        if reverse:
+            counters.add_followers([instance.followable_id], -instance.followed_by.count())
+        else:
+            counters.add_followers(instance.follows.values_list("pk", flat=True), -1)
+
+
+@receiver(post_save, sender=Comment)
+def count_new_comment(instance, created: bool, raw: bool, **kwargs) -> None:  # pylint: disable=unused-argument
+    """
+    Increments `Commentable.comment_count` for new comments. New versions of a comment are no new comments.
+    """
+    if created and not raw and instance.version_number == 1:
+        counters.add_comments([instance.commented_on_id], 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(instance, using: str, **kwargs) -> None:  # pylint: disable=unused-argument
+    """
+    Decrements `Commentable.comment_count` if the last version of a comment is deleted.
+    The receiver runs after the rows of the deleted comments but before the rows of their `Versionable` parents are
+    deleted. If no comment of the version group is left, the remaining `Versionable` rows are the deleted versions.
+    Only the newest of them decrements the counter, i.e. deleting all versions at once counts once.
+    """
+    group = Versionable.objects.using(using).filter(version_group=instance.version_group)
+    remaining = group.aggregate(comments=Count("comment"), newest=Max("version_number"))
+    if remaining["comments"] == 0 and remaining["newest"] in (None, instance.version_number):
+        counters.add_comments([instance.commented_on_id], -1)
+
+
+@receiver(request_finished)
+def flush_counters(**kwargs) -> None:  # pylint: disable=unused-argument
+    """
+    Writes the buffered counter increments at the end of a request if the flush interval elapsed. Otherwise, they are
+    written together with the increments of the following requests.
+    """
+    counters.flush_if_due()
+
+
+@receiver(post_save, sender=Article)
+def index_article(instance, raw: bool, **kwargs) -> None:  # pylint: disable=unused-argument
+    """
+    Updates the search index if the newest version of an article is saved.
+    """
+    if instance.is_latest and not raw:
+        search.index_article(instance)
+
+
+@receiver(post_delete, sender=Article)
+def reindex_article_group(instance, using: str, **kwargs) -> None:  # pylint: disable=unused-argument
+    """
+    Indexes the next older version if the newest version of an article is deleted.
+    """
+    if instance.is_latest:
+        search.index_article_group(instance.version_group, using=using)
+
+
+@receiver(pre_delete, sender=Article)
+def restore_previous_revision(instance, using: str, **kwargs) -> None:  # pylint: disable=unused-argument
+    """
+    Restores the full text of the next older revision if it is stored as delta to a deleted article. The receiver runs
+    for deletes of single objects, querysets and cascades alike.
+    """
+    instance.restore_previous_revision(using)
+
+
+@receiver(post_save, sender=Project)
+def index_project(instance, raw: bool, **kwargs) -> None:  # pylint: disable=unused-argument
+    """
+    Updates the search index if a project is saved.
+    """
+    if not raw:
+        search.index_project(instance)
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_save, sender=Project)
+def create_thumbnail_variants(instance, raw: bool, **kwargs) -> None:  # pylint: disable=unused-argument
+    """
+    Creates the resized variants of a new thumbnail in the background.
+    """
+    if not raw and images.needs_variants(instance):
+        images.schedule_variants(instance)
@@ -63,3 +63,38 @@ FrameQueue.prototype = {
 function BlockingFrameQueue(size) {
 
 }
+
+/**
+ * Requests trajectories integrated by the server (see homepage/deqsolver.py) and passes every chunk of frames to
+ * onChunk as soon as it arrives. The trajectories are cached by the server, so only the first reader waits for them.
+ *
+ * @param {String} system The name of the system, e.g. "lorenz"
+ * @param {{tableau:(String|Object), h:Number, y0:Number[][], frames:Number, steps_per_frame:Number, t0:Number,
+ *          parameters:Object}} options
+ * @param {function({t:Number[], y:Number[][][]})} onChunk
+ * @returns {Promise<void>} Resolves after the last chunk
+ */
+async function streamTrajectories (system, options, onChunk) {
+    let params = new URLSearchParams();
+    for (let [name, value] of Object.entries(options)) {
+        if (value !== undefined)
+            params.set(name, typeof value === "object" ? JSON.stringify(value) : value);
+    }
+    let response = await fetch("/deq/" + system + "?" + params);
+    if (!response.ok)
+        throw "Integration failed: " + response.status;
+    let reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = "";
+    while (true) {
+        let { value, done } = await reader.read();
+        if (done)
+            break;
+        buffer += value;
+        let lines = buffer.split("\n");
+        buffer = lines.pop();
+        for (let line of lines) {
+            if (line)
+                onChunk(JSON.parse(line));
+        }
+    }
+}
@@ -0,0 +1,25 @@
+"""
+Contains the template tags including the bundled static assets (see `homepage.assets`).
+"""
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html_join
+
+from homepage import assets
+
+register = template.Library()
+
+
+@register.simple_tag
+def bundle(name: str) -> str:
+    """
+    Includes a bundle of scripts or stylesheets. If the static files aren't built by the bundling storage (e.g. with
+    the development server), the source files of the bundle are included instead.
+    Usage: `{% load assets %}{% bundle "homepage/js/base.bundle.js" %}`
+    """
+    names = [name] if assets.is_bundled() else assets.get_bundles()[name]
+    if name.endswith(".css"):
+        element = '<link rel="stylesheet" type="text/css" href="{}">'
+    else:
+        element = '<script src="{}"></script>'
+    return format_html_join("\n", element, ((static(source),) for source in names))
@@ -0,0 +1,18 @@
+"""
+Contains the template tags rendering the placeholders of the user specific fragments (see `homepage.fragments`).
+"""
+from django import template
+from django.utils.safestring import mark_safe
+
+from homepage import fragments
+
+register = template.Library()
+
+
+@register.simple_tag
+def fragment(name: str) -> str:
+    """
+    Renders the placeholder of a user specific fragment. It is substituted by the view before the page is sent.
+    Usage: `{% load fragments %}{% fragment "loginout" %}`
+    """
+    return mark_safe(fragments.get_placeholder(name))  # nosec
@@ -0,0 +1,40 @@
+"""
+Contains the template tags rendering the thumbnails of articles and projects with their resized variants.
+"""
+from typing import Union
+
+from django import template
+from django.utils.html import format_html
+
+from homepage import images
+from homepage.models import Article, Project
+
+register = template.Library()
+
+
+@register.simple_tag
+def thumbnail(instance: Union[Article, Project], sizes: str = "100vw", alt: str = "") -> str:
+    """
+    Renders the thumbnail of an article or a project as `<picture>` offering the WebP variants and the variants in the
+    fallback format. The browser chooses the width by the `sizes` attribute. The original image is rendered until the
+    variants are created. Nothing is rendered if there is no thumbnail.
+    Usage: `{% load images %}{% thumbnail article "(min-width: 800px) 50vw, 100vw" %}`
+    """
+    if not instance.thumbnail:
+        return ""
+    variants = instance.thumbnail_variants
+    if images.needs_variants(instance):
+        return format_html('<img src="{}" alt="{}" loading="lazy">', instance.thumbnail.url, alt)
+    return format_html(
+        '<picture><source type="{}" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" alt="{}" loading="lazy"></picture>',
+        images.WEBP,
+        images.get_srcset(variants, images.WEBP),
+        sizes,
+        images.get_url(variants, variants["fallback"]),
+        images.get_srcset(variants, variants["fallback"]),
+        sizes,
+        variants["width"],
+        variants["height"],
+        alt,
+    )
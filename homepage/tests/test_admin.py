@@ -0,0 +1,80 @@
+"""
+Includes tests to test the admins of the homepage app.
+"""
+# pylint: disable=imported-auth-user
+from django.contrib.auth.models import User as AuthUser
+from django.db import connection
+from django.test import TestCase, override_settings, tag
+from django.urls import reverse
+
+from homepage import admin
+from homepage.models import Article, Category, Comment, Project, Tag, User, Visibility
+
+
+@tag("admin")
+class TestAdmin(TestCase):
+    """
+    Includes tests to test the change lists and change forms of the admins.
+    """
+
+    def setUp(self) -> None:
+        self.client.force_login(AuthUser.objects.create_superuser(username="admin", password="12345"))
+
+    def test_estimated_count(self) -> None:
+        """
+        Test if the number of rows of large unfiltered tables is estimated by the statistics of the database.
+        """
+        Tag.objects.bulk_create(Tag(name=f"tag{number}") for number in range(5))
+        self.assertIsNone(admin.estimate_count(Tag.objects.all()))
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        Tag.objects.create(name="unknown to the statistics")
+        self.assertEqual(admin.estimate_count(Tag.objects.all()), 5)
+        self.assertIsNone(admin.estimate_count(Tag.objects.filter(name="tag1")))
+        self.assertEqual(admin.EstimatedCountPaginator(Tag.objects.order_by("pk"), 2).count, 6)
+        with override_settings(HOMEPAGE_ADMIN_EXACT_COUNT_LIMIT=5):
+            self.assertEqual(admin.EstimatedCountPaginator(Tag.objects.order_by("pk"), 2).count, 5)
+            response = self.client.get(reverse("admin:homepage_tag_changelist"))
+        self.assertContains(response, "5 tags")
+
+    def test_search(self) -> None:
+        """
+        Test if the articles and projects are found by the full-text index and the other models by prefixes.
+        """
+        Article.objects.create(title="Quantum computers", content="Superposition", visibility=Visibility.PUBLIC)
+        Article.objects.create(title="Selfish genes", content="Genes are selfish.", visibility=Visibility.PUBLIC)
+        Project.objects.create(title="Secret project", description="Building quantum computers")
+        response = self.client.get(reverse("admin:homepage_article_changelist"), {"q": "superposition"})
+        self.assertEqual([article.title for article in response.context["cl"].result_list], ["Quantum computers"])
+        response = self.client.get(reverse("admin:homepage_project_changelist"), {"q": "quantum"})
+        self.assertEqual([project.title for project in response.context["cl"].result_list], ["Secret project"])
+        user = User.objects.create(alias="marie", name="Marie")
+        User.objects.create(alias="amaria", name="Maria")
+        response = self.client.get(reverse("admin:homepage_user_changelist"), {"q": "mar"})
+        self.assertEqual(list(response.context["cl"].result_list), [user])
+
+    def test_change_lists(self) -> None:
+        """
+        Test if the change lists show the counts and the concrete commented entities.
+        """
+        physics = Category.objects.get(name="physics")
+        article = Article.objects.create(title="Article", visibility=Visibility.PUBLIC)
+        article.related_categories.add(physics)
+        Comment.objects.create(content="Comment", commented_on=article)
+        response = self.client.get(reverse("admin:homepage_category_changelist"), {"q": "phys"})
+        self.assertContains(response, '<td class="field-article_count">1</td>', html=True)
+        response = self.client.get(reverse("admin:homepage_comment_changelist"))
+        self.assertContains(response, "Article: Article")
+
+    def test_change_form(self) -> None:
+        """
+        Test if the relations are edited without listing all related objects.
+        """
+        article = Article.objects.create(title="Article")
+        User.objects.create(alias="unrelated", name="Unrelated")
+        response = self.client.get(reverse("admin:homepage_article_change", args=[article.pk]))
+        self.assertContains(response, 'class="admin-autocomplete"', count=3)
+        self.assertNotContains(response, "unrelated")
+        user_id = User.objects.get(alias="unrelated").pk
+        response = self.client.get(reverse("admin:homepage_user_change", args=[user_id]))
+        self.assertContains(response, 'class="vManyToManyRawIdAdminField"')
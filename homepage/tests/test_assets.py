@@ -0,0 +1,89 @@
+"""
+Includes tests to test the bundling of the static assets.
+"""
+import gzip
+import shutil
+import tempfile
+
+import brotli
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import SimpleTestCase, override_settings, tag
+
+from homepage import assets
+
+
+class FastBundlingStaticFilesStorage(assets.BundlingStaticFilesStorage):  # pylint: disable=too-many-ancestors
+    """
+    Compresses the files faster to speed up the tests.
+    """
+
+    brotli_quality = 1
+
+
+BUNDLING_STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "homepage.tests.test_assets.FastBundlingStaticFilesStorage"},
+}
+
+
+@tag("assets")
+class TestAssets(SimpleTestCase):
+    """
+    Includes tests to test the bundles, the hashed names and the precompressed files.
+    """
+
+    def test_concatenate_css(self) -> None:
+        """
+        Test if local imports are inlined, imports of other hosts are moved to the beginning and relative URLs are
+        rebased to the directory of the bundle.
+        """
+        files = {
+            "app/css/main.css": '@import url("https://fonts.example.com/font.css");\n@import "parts/icons.css";\n'
+            "body { background: url(../images/bg.png); }",
+            "app/css/parts/icons.css": "@import url(../main.css);\n.icon { src: url('../../fonts/icons.woff2'); }",
+        }
+        css = assets.concatenate_css(files.__getitem__, ["app/css/main.css"], "app/bundle.css")
+        self.assertEqual(
+            css,
+            '@import url("https://fonts.example.com/font.css");\n'
+            '\n\n.icon { src: url("fonts/icons.woff2"); }\nbody { background: url("images/bg.png"); }',
+        )
+
+    def test_development_tag(self) -> None:
+        """
+        Test if the source files are included without the bundling storage.
+        """
+        html = Template('{% load assets %}{% bundle "homepage/js/index.bundle.js" %}').render(Context())
+        self.assertEqual(
+            html,
+            '<script src="/assets/homepage/js/navbar.js"></script>\n'
+            '<script src="/assets/homepage/js/main.js"></script>',
+        )
+
+    def test_collectstatic(self) -> None:
+        """
+        Test if collectstatic builds the minified bundles with hashed names and their compressed siblings.
+        """
+        static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, static_root)
+        # The static files of the admin are skipped to speed up the test
+        finders = ["django.contrib.staticfiles.finders.FileSystemFinder"]
+        with override_settings(STATIC_ROOT=static_root, STORAGES=BUNDLING_STORAGES, STATICFILES_FINDERS=finders):
+            call_command("collectstatic", interactive=False, verbosity=0)
+            html = Template('{% load assets %}{% bundle "homepage/css/base.bundle.css" %}').render(Context())
+            name = staticfiles_storage.stored_name("homepage/css/base.bundle.css")
+            with staticfiles_storage.open(name) as file:
+                content = file.read()
+            with staticfiles_storage.open(name + ".gz") as file:
+                self.assertEqual(gzip.decompress(file.read()), content)
+            with staticfiles_storage.open(name + ".br") as file:
+                self.assertEqual(brotli.decompress(file.read()), content)
+        self.assertRegex(name, r"^homepage/css/base\.bundle\.[0-9a-f]{12}\.css$")
+        self.assertEqual(html, f'<link rel="stylesheet" type="text/css" href="/assets/{name}">')
+        css = content.decode("utf-8")
+        self.assertTrue(css.startswith('@import url("https://fonts.googleapis.com/'))
+        self.assertIn(".fa-lg{", css)
+        self.assertRegex(css, r'url\("\.\./webfonts/fa-solid-900\.[0-9a-f]{12}\.woff2"\)')
+        self.assertNotIn("\n  ", css)
@@ -0,0 +1,113 @@
+"""
+Includes tests to test the server-side integration of the deqsolver widget.
+"""
+import json
+import math
+
+import numpy as np
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings, tag
+from django.urls import reverse
+
+from homepage import deqsolver
+
+
+@tag("deqsolver")
+@override_settings(HOMEPAGE_DEQ_CHUNK_FRAMES=4)
+class TestDeqSolver(SimpleTestCase):
+    """
+    Includes tests to test the integration, the caching and the streaming of the trajectories.
+    """
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_order_of_accuracy(self) -> None:
+        """
+        Test if a batch of harmonic oscillators is integrated with the order of the tableaus.
+        """
+        errors = {}
+        for name in ["euler", "heun", "rk4"]:
+            problem = deqsolver.create_problem(
+                "harmonic-oscillator", name, 0.01, [[1, 0], [0, 1]], 11, steps_per_frame=10
+            )
+            chunks = list(deqsolver.get_trajectory_chunks(problem))
+            times = [t for chunk in chunks for t in chunk["t"]]
+            self.assertEqual(len(times), 11)
+            self.assertAlmostEqual(times[-1], 1.0)
+            final = np.array(chunks[-1]["y"][-1])
+            exact = np.array([[math.cos(1), -math.sin(1)], [math.sin(1), math.cos(1)]])
+            errors[name] = np.abs(final - exact).max()
+        self.assertLess(errors["euler"], 1e-2)
+        self.assertLess(errors["heun"], 1e-4)
+        self.assertLess(errors["rk4"], 1e-9)
+
+    def test_custom_tableau(self) -> None:
+        """
+        Test if tableaus in the format of the widget are accepted and implicit ones are rejected.
+        """
+        tableau = {"a": [[], [0.5], [0, 0.5], [0, 0, 1]], "b": [1 / 6, 1 / 3, 1 / 3, 1 / 6], "c": [0, 0.5, 0.5, 1]}
+        custom = deqsolver.create_problem("lorenz", tableau, 0.01, [1, 1, 1], 10)
+        named = deqsolver.create_problem("lorenz", "rk4", 0.01, [1, 1, 1], 10)
+        self.assertEqual(custom.get_cache_key(), named.get_cache_key())
+        with self.assertRaises(ValueError):
+            deqsolver.create_problem("lorenz", {"a": [[0.5]], "b": [1], "c": [0.5]}, 0.01, [1, 1, 1], 10)
+        with self.assertRaises(ValueError):
+            deqsolver.create_problem("lorenz", "rk4", 0.01, [1, 1], 10)
+        stages = deqsolver.MAX_STAGES + 1
+        large = {"a": [[]] + [[1 / stages]] * (stages - 1), "b": [1 / stages] * stages, "c": [0] * stages}
+        with self.assertRaises(ValueError):
+            deqsolver.create_problem("lorenz", large, 0.01, [1, 1, 1], 2)
+
+    def test_evaluation_budget(self) -> None:
+        """
+        Test if the stage evaluations of all trajectories are limited.
+        """
+        frames = deqsolver.MAX_EVALUATIONS // (4 * 8)
+        deqsolver.create_problem("pendulum", "rk4", 0.01, [[1, 0]] * 4, frames, steps_per_frame=2)
+        with self.assertRaises(ValueError):
+            deqsolver.create_problem("pendulum", "rk4", 0.01, [[1, 0]] * 4, frames + 1, steps_per_frame=2)
+        with self.assertRaises(ValueError):
+            deqsolver.create_problem("pendulum", "rk4", 0.01, [[1, 0]] * 8, frames, steps_per_frame=2)
+        deqsolver.create_problem("pendulum", "heun", 0.01, [[1, 0]] * 8, frames, steps_per_frame=2)
+
+    def test_cached_chunks(self) -> None:
+        """
+        Test if longer trajectories continue the cached chunks and yield the same frames.
+        """
+        short = deqsolver.create_problem(
+            "van-der-pol", "rk4", 0.05, [[2, 0], [0.1, 0]], 6, steps_per_frame=2, parameters={"mu": 2}
+        )
+        short_chunks = list(deqsolver.get_trajectory_chunks(short))
+        self.assertEqual([len(chunk["t"]) for chunk in short_chunks], [1, 4, 1])
+        long = short._replace(frames=12)
+        long_chunks = list(deqsolver.get_trajectory_chunks(long))
+        self.assertEqual([len(chunk["t"]) for chunk in long_chunks], [1, 4, 4, 3])
+        self.assertEqual(long_chunks[1], short_chunks[1])
+        self.assertEqual(long_chunks[2]["y"][0], short_chunks[2]["y"][0])
+        cache.clear()
+        self.assertEqual(list(deqsolver.get_trajectory_chunks(long)), long_chunks)
+
+    def test_endpoint(self) -> None:
+        """
+        Test if the trajectories are streamed as NDJSON and invalid requests are rejected.
+        """
+        url = reverse("homepage:deq", kwargs={"system": "lorenz"})
+        response = self.client.get(url, {"h": 0.01, "y0": "[[1, 1, 1], [2, 2, 2]]", "frames": 7, "tableau": "heun"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["Content-Type"], "application/x-ndjson")
+        self.assertEqual(response.headers["Cache-Control"], "public, max-age=86400")
+        chunks = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([len(chunk["t"]) for chunk in chunks], [1, 4, 2])
+        self.assertEqual(chunks[0]["y"], [[[1, 1, 1], [2, 2, 2]]])
+        self.assertEqual(len(chunks[2]["y"][1]), 2)
+
+        self.assertEqual(self.client.get(url, {"h": 0.01, "y0": "[1, 1, 1]"}).status_code, 400)
+        response = self.client.get(url, {"h": 0.01, "y0": "[1, 1, 1]", "frames": 3, "parameters": '{"x": 1}'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(url, {"h": 0.01, "y0": "[1, 1, 1]", "frames": 10**9})
+        self.assertEqual(response.status_code, 400)
+        tableau = json.dumps({"a": [[]] * 100, "b": [0] * 100, "c": [0] * 100})
+        response = self.client.get(url, {"h": 0.01, "y0": "[1, 1, 1]", "frames": 3, "tableau": tableau})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(reverse("homepage:deq", kwargs={"system": "unknown"})).status_code, 404)
@@ -0,0 +1,112 @@
+"""
+Includes tests to test the resized variants of the thumbnails.
+"""
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, override_settings, tag
+from PIL import Image
+
+from homepage import images
+from homepage.models import Article, Project
+
+
+def create_image(name: str, width: int, height: int, mode: str = "RGB") -> SimpleUploadedFile:
+    """
+    Returns an uploaded PNG image.
+    """
+    output = BytesIO()
+    Image.new(mode, (width, height), "red").save(output, "PNG")
+    return SimpleUploadedFile(name, output.getvalue(), content_type="image/png")
+
+
+@tag("images")
+class TestImages(TestCase):
+    """
+    Includes tests to test the creation of the variants and their rendering.
+    """
+
+    def setUp(self) -> None:
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(
+            MEDIA_ROOT=media_root, HOMEPAGE_THUMBNAIL_WIDTHS=(100, 200, 400), HOMEPAGE_THUMBNAIL_WORKERS=0
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_variants(self) -> None:
+        """
+        Test if the variants are created after the commit without enlarging the image.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            article = Article.objects.create(title="Article", thumbnail=create_image("photo.png", 300, 150))
+        self.assertIsNone(article.thumbnail_variants)
+        article.refresh_from_db()
+        variants = article.thumbnail_variants
+        self.assertEqual(variants["original"], article.thumbnail.name)
+        self.assertEqual((variants["width"], variants["height"], variants["fallback"]), (300, 150, "image/jpeg"))
+        self.assertEqual([width for width, _ in variants["sources"]["image/webp"]], [100, 200, 300])
+        for width, name in variants["sources"]["image/jpeg"]:
+            self.assertTrue(name.startswith(f"thumbnails/{variants['digest'][:2]}/"))
+            with Image.open(default_storage.path(name)) as image:
+                self.assertEqual((image.format, image.width), ("JPEG", width))
+        with Image.open(default_storage.path(variants["sources"]["image/webp"][0][1])) as image:
+            self.assertEqual(image.format, "WEBP")
+
+        # New versions share the thumbnail and its variants
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            article.new_version().save()
+        self.assertEqual(callbacks, [])
+
+    def test_shared_variants(self) -> None:
+        """
+        Test if identical images share their variants and transparent images use PNG as fallback.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            first = Project.objects.create(title="First", thumbnail=create_image("logo.png", 120, 120, "RGBA"))
+            second = Project.objects.create(title="Second", thumbnail=create_image("logo.png", 120, 120, "RGBA"))
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertNotEqual(first.thumbnail.name, second.thumbnail.name)
+        self.assertEqual(first.thumbnail_variants["fallback"], "image/png")
+        self.assertEqual(first.thumbnail_variants["sources"], second.thumbnail_variants["sources"])
+        self.assertEqual([width for width, _ in first.thumbnail_variants["sources"]["image/png"]], [100, 120])
+
+    def test_template_tag(self) -> None:
+        """
+        Test if the original image is rendered until the variants exist.
+        """
+        template = Template('{% load images %}{% thumbnail article "50vw" article.title %}')
+        article = Article.objects.create(title="A <title>")
+        self.assertEqual(template.render(Context({"article": article})), "")
+        article.thumbnail = create_image("photo.png", 300, 150)
+        with self.captureOnCommitCallbacks() as callbacks:
+            article.save()
+        self.assertEqual(
+            template.render(Context({"article": article})),
+            f'<img src="/media/{article.thumbnail.name}" alt="A &lt;title&gt;" loading="lazy">',
+        )
+        callbacks[0]()
+        article.refresh_from_db()
+        html = template.render(Context({"article": article}))
+        self.assertIn('<source type="image/webp" srcset="/media/thumbnails/', html)
+        self.assertIn("-200.webp 200w, /media/thumbnails/", html)
+        self.assertIn('sizes="50vw" width="300" height="150"', html)
+
+    def test_command(self) -> None:
+        """
+        Test if the command creates the missing variants.
+        """
+        with self.captureOnCommitCallbacks():
+            article = Article.objects.create(title="Article", thumbnail=create_image("photo.png", 50, 50))
+        output = StringIO()
+        call_command("create_thumbnails", stdout=output)
+        self.assertEqual(output.getvalue(), "Created the variants of 1 images\n")
+        article.refresh_from_db()
+        self.assertEqual(len(images.get_srcset(article.thumbnail_variants, "image/webp").split(", ")), 1)
@@ -3,6 +3,7 @@ Test the login and logout functionality.
 """
 # pylint: disable=imported-auth-user
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase, tag
 from django.urls import reverse
 
@@ -12,6 +13,9 @@ class TestLoginLogout(TestCase):
     Includes tests to test the login and logout functionality.
     """
 
+    def setUp(self) -> None:
+        cache.clear()
+
     @tag("page-login")
     def test_login_ability(self) -> None:
         """
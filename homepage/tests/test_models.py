@@ -3,9 +3,14 @@ Test basic functionality of the models of the homepage app.
 Note that the tests do not test that much (intentionally) to keep some flexibility.
 """
 
-from django.test import TestCase, tag
+from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch
+from django.test import TestCase, override_settings, tag
+from django.urls import reverse
 
-from homepage import models
+from homepage import caching, comments, counters, models, timeline
+from homepage.registry import subclass_registry
 
 
 @tag("models")
@@ -60,3 +65,409 @@ class TestModels(TestCase):
             version_group=loaded_article.version_group, version_number=2
         )
         self.assertEqual(loaded_modified_article.title, "Modified Test Article")
+
+    def test_version_group_allocation(self) -> None:
+        """
+        Test if every new versionable entity gets its own version group while new versions keep theirs.
+        """
+        article = models.Article(title="First", content="First")
+        article.save()
+        other_article = models.Article(title="Second", content="Second")
+        other_article.save()
+        self.assertGreater(other_article.version_group, article.version_group)
+
+        modified_article = article.new_version()
+        modified_article.save()
+        self.assertEqual(modified_article.version_group, article.version_group)
+
+        comment = models.Comment(content="Comment", commented_on=article)
+        comment.save()
+        self.assertNotIn(comment.version_group, (article.version_group, other_article.version_group))
+
+    def test_polymorphic_str(self) -> None:
+        """
+        Test if the objects of the polymorphic super classes are resolved to their concrete subclasses.
+        """
+        user = models.User(alias="testuser", name="Test User")
+        user.save()
+        project = models.Project(title="Test Project", description="Test Description")
+        project.save()
+        article = models.Article(title="Test Article", content="Test Content", related_project=project)
+        article.save()
+        comment = models.Comment(content="Test Comment", commented_on=article, written_by=user)
+        comment.save()
+
+        self.assertEqual(str(models.Followable.objects.get(pk=user.followable_id)), "User: testuser")
+        self.assertEqual(str(models.Versionable.objects.get(pk=article.versionable_id)), "Article: Test Article")
+        self.assertEqual(str(models.Comment.objects.get(pk=comment.pk).commented_on), "Article: Test Article")
+        self.assertEqual(str(models.Versionable(version_group=1, version_number=1)), "Versionable: None")
+
+        ContentType.objects.get_for_models(models.User, models.Project, models.Article, models.Comment)
+        commentables = list(models.Commentable.objects.all())
+        with self.assertNumQueries(4):
+            labels = [str(commentable) for commentable in models.resolve_concrete(commentables)]
+        self.assertEqual(
+            sorted(labels),
+            ["Article: Test Article", "Comment: Test Comment", "Project: Test Project", "User: testuser"],
+        )
+
+    def test_resolve_shared_parent(self) -> None:
+        """
+        Test if all objects referring to the same polymorphic row are resolved by a single query.
+        """
+        article = models.Article.objects.create(title="Test Article")
+        for index in range(3):
+            models.Comment.objects.create(content=f"Comment {index}", commented_on=article)
+        ContentType.objects.get_for_models(models.Article)
+        replies = list(models.Comment.objects.select_related("commented_on"))
+        with self.assertNumQueries(1):
+            models.resolve_concrete(comment.commented_on for comment in replies)
+            labels = [str(comment.commented_on) for comment in replies]
+        self.assertEqual(labels, ["Article: Test Article"] * 3)
+
+    def test_subclass_registry(self) -> None:
+        """
+        Test if the subclasses and parent links are looked up without querying the database.
+        """
+        with self.assertNumQueries(0):
+            self.assertCountEqual(
+                models.Commentable.get_subclasses(), [models.User, models.Comment, models.Project, models.Article]
+            )
+            self.assertCountEqual(models.Followable.get_subclasses(), [models.User, models.Project])
+            self.assertCountEqual(models.Versionable.get_subclasses(), [models.Comment, models.Article])
+            parent_link = subclass_registry.get_parent_link(models.Article, models.Commentable)
+            self.assertEqual(parent_link.name, "commentable_ptr")
+            self.assertIs(subclass_registry.get_subclass_by_parent_link(parent_link), models.Article)
+            self.assertIs(subclass_registry.get_subclass_by_accessor(models.Followable, "project"), models.Project)
+
+    def test_as_concrete(self) -> None:
+        """
+        Test if querysets and prefetches of the polymorphic super classes yield the concrete subclasses in order.
+        """
+        user = models.User(alias="testuser", name="Test User")
+        user.save()
+        project = models.Project(title="Test Project", description="Test Description")
+        project.save()
+        articles = [models.Article(title=f"Article {index}", content="Test Content") for index in range(3)]
+        for article in articles:
+            article.save()
+        comment = models.Comment(content="Test Comment", commented_on=articles[0], written_by=user)
+        comment.save()
+        user.likes.add(comment, project, *articles)
+        user.follows.add(project)
+
+        ContentType.objects.get_for_models(models.Project, models.Article, models.Comment)
+        with self.assertNumQueries(4):
+            liked = list(user.likes.order_by("-commentable_id").as_concrete())  # pylint: disable=no-member
+        self.assertEqual(liked, [comment, *reversed(articles), project])
+        self.assertEqual([type(item) for item in liked][:2], [models.Comment, models.Article])
+
+        with self.assertNumQueries(7):
+            users = list(
+                models.User.objects.prefetch_related(
+                    Prefetch("likes", queryset=models.Commentable.objects.as_concrete()),
+                    Prefetch("follows", queryset=models.Followable.objects.as_concrete()),
+                )
+            )
+            self.assertCountEqual(users[0].likes.all(), [comment, project, *articles])
+            self.assertEqual(list(users[0].follows.all()), [project])
+            self.assertIsInstance(users[0].follows.all()[0], models.Project)
+
+        with self.assertNumQueries(3):
+            loaded_comment = models.Comment.objects.prefetch_related(
+                Prefetch("commented_on", queryset=models.Commentable.objects.as_concrete())
+            ).get(pk=comment.pk)
+            self.assertIsInstance(loaded_comment.commented_on, models.Article)
+
+        # Concrete instances loaded by the reverse accessor of the parent link need no further query
+        with self.assertNumQueries(1):
+            commentables = models.resolve_concrete(
+                models.Commentable.objects.filter(article__isnull=False).select_related("article")
+            )
+            self.assertCountEqual([commentable.get_concrete() for commentable in commentables], articles)
+            self.assertIsInstance(commentables[0].get_concrete(), models.Article)
+
+    def test_latest_versions(self) -> None:
+        """
+        Test if the head of each version group is maintained when versions are added and deleted.
+        """
+        article = models.Article(title="Version 1", content="Test Content")
+        article.save()
+        other_article = models.Article(title="Other", content="Test Content")
+        other_article.save()
+        second_version = article.new_version()
+        second_version.title = "Version 2"
+        second_version.save()
+        third_version = second_version.new_version()
+        third_version.title = "Version 3"
+        third_version.save()
+
+        self.assertCountEqual(
+            models.Article.objects.latest_versions().values_list("title", flat=True), ["Version 3", "Other"]
+        )
+        self.assertEqual(
+            models.Versionable.objects.filter(version_group=article.version_group, is_latest=True).count(), 1
+        )
+
+        third_version.delete()
+        self.assertCountEqual(
+            models.Article.objects.latest_versions().values_list("title", flat=True), ["Version 2", "Other"]
+        )
+
+        # Deletes of querysets (e.g. by the admin) and cascades maintain the heads as well
+        models.Article.objects.filter(pk=second_version.pk).delete()
+        self.assertCountEqual(
+            models.Article.objects.latest_versions().values_list("title", flat=True), ["Version 1", "Other"]
+        )
+        fourth_version = article.new_version()
+        fourth_version.save()
+        models.Versionable.objects.filter(pk=fourth_version.pk).delete()
+        self.assertEqual(models.Article.objects.get(is_latest=True, version_group=article.version_group), article)
+
+    @override_settings(HOMEPAGE_REVISION_KEYFRAME_INTERVAL=3)
+    def test_article_revisions(self) -> None:
+        """
+        Test if old revisions are stored as deltas (except keyframes) and can be rebuilt.
+        """
+        texts = [f"Line 1\nLine 2 of version {number}\nLine 3\n" + "Appendix\n" * number for number in range(1, 7)]
+        article = models.Article(title="Test Article", content=texts[0])
+        article.save()
+        for text in texts[1:]:
+            article = article.new_version()
+            article.content = text
+            article.save()
+
+        stored = models.Article.objects.filter(version_group=article.version_group).order_by("version_number")
+        self.assertEqual(
+            [(revision.content_delta is None, revision.content) for revision in stored],
+            [(False, ""), (False, ""), (True, texts[2]), (False, ""), (False, ""), (True, texts[5])],
+        )
+        self.assertEqual([revision.get_content() for revision in stored], texts)
+
+        article.content = "Rewritten"
+        article.save()
+        stored[4].delete()
+        stored = models.Article.objects.filter(version_group=article.version_group).order_by("version_number")
+        self.assertEqual([revision.get_content() for revision in stored], [*texts[:4], "Rewritten"])
+        self.assertEqual(stored[3].new_version().content, texts[3])
+
+        # Deletes of querysets (e.g. by the admin) restore the full text as well
+        newer = article.new_version()
+        newer.content = "Newer"
+        newer.save()
+        newest = newer.new_version()
+        newest.content = "Newest"
+        newest.save()
+        self.assertIsNotNone(models.Article.objects.get(pk=newer.pk).content_delta)
+        models.Article.objects.filter(pk=newest.pk).delete()
+        stored = models.Article.objects.filter(version_group=article.version_group).order_by("version_number")
+        self.assertEqual([revision.get_content() for revision in stored], [*texts[:4], "Rewritten", "Newer"])
+
+    def test_visible_to(self) -> None:
+        """
+        Test if the visibility rules are applied to articles and projects.
+        """
+        author = models.User.objects.create(alias="author", name="Author")
+        follower = models.User.objects.create(alias="follower", name="Follower")
+        stranger = models.User.objects.create(alias="stranger", name="Stranger")
+        project = models.Project.objects.create(title="Project", description="", visibility=models.Visibility.FOLLOWER)
+        project.related_authors.add(author)
+        follower.follows.add(author)
+        for visibility in models.Visibility.values:
+            article = models.Article.objects.create(title=visibility, visibility=visibility)
+            article.related_authors.add(author)
+        models.Article.objects.create(title="project", visibility=models.Visibility.FOLLOWER, related_project=project)
+
+        def visible_titles(*args, **kwargs) -> set[str]:
+            return set(models.Article.objects.visible_to(*args, **kwargs).values_list("title", flat=True))
+
+        self.assertEqual(visible_titles(None), {"public"})
+        self.assertEqual(visible_titles(None, is_registered=True), {"public", "user"})
+        self.assertEqual(visible_titles(stranger), {"public", "user"})
+        self.assertEqual(
+            visible_titles(stranger, is_reviewer=True), {"public", "user", "follower", "review", "project"}
+        )
+        self.assertEqual(visible_titles(follower), {"public", "user", "follower"})
+        self.assertEqual(visible_titles(author), {"public", "user", "follower", "review", "private"})
+        self.assertEqual(visible_titles(stranger, is_moderator=True), {*models.Visibility.values, "project"})
+
+        follower.follows.add(project)
+        self.assertEqual(visible_titles(follower), {"public", "user", "follower", "project"})
+        self.assertFalse(models.Project.objects.visible_to(stranger).exists())
+        self.assertEqual(list(models.Project.objects.visible_to(follower)), [project])
+        self.assertEqual(list(models.Project.objects.visible_to(author)), [project])
+
+    @override_settings(HOMEPAGE_TIMELINE_FANOUT_LIMIT=2, HOMEPAGE_COUNTER_FLUSH_SIZE=1)
+    def test_timeline(self) -> None:
+        """
+        Test if new articles and comments are fanned out to the followers and popular sources are read at read time.
+        """
+        author = models.User.objects.create(alias="author", name="Author")
+        star = models.User.objects.create(alias="star", name="Star")
+        project = models.Project.objects.create(title="Project", description="", visibility=models.Visibility.PUBLIC)
+        readers = [models.User.objects.create(alias=f"reader{number}", name="Reader") for number in range(3)]
+        with self.captureOnCommitCallbacks(execute=True):
+            readers[0].follows.add(author, project, star)
+            readers[1].follows.add(star)
+            readers[2].follows.add(star)
+
+        article = models.Article.objects.create(title="Article", visibility=models.Visibility.PUBLIC)
+        article.related_authors.add(author)
+        project_article = models.Article.objects.create(
+            title="Project article", visibility=models.Visibility.PUBLIC, related_project=project
+        )
+        private_article = models.Article.objects.create(title="Private article", related_project=project)
+        star_comment = models.Comment.objects.create(content="Star comment", commented_on=article, written_by=star)
+        new_version = article.new_version()
+        new_version.title = "Article revised"
+        new_version.save()
+        # The comments of invisible articles are hidden, whether they are fanned out or read at read time
+        models.Comment.objects.create(content="Hidden", commented_on=private_article, written_by=author)
+        models.Comment.objects.create(content="Hidden", commented_on=private_article, written_by=star)
+
+        self.assertEqual(models.TimelineEntry.objects.filter(owner=readers[0]).count(), 4)
+        self.assertFalse(models.TimelineEntry.objects.filter(item=star_comment).exists())
+        self.assertEqual(
+            [str(item) for item in timeline.get_timeline(readers[0])],
+            ["Star comment", "Project article", "Article revised"],
+        )
+        self.assertEqual(
+            [str(item) for item in timeline.get_timeline(readers[0], before=project_article.created)],
+            ["Article revised"],
+        )
+        self.assertEqual([str(item) for item in timeline.get_timeline(readers[1])], ["Star comment"])
+
+        self.assertEqual(timeline.trim_timelines(retention=1), 3)
+        self.assertEqual([str(item) for item in timeline.get_timeline(readers[0])], ["Star comment"])
+
+    def test_counters(self) -> None:
+        """
+        Test if the like, comment and follower counters are kept in sync and drifted counters are fixed.
+        """
+        counters.flush()
+        users = [models.User.objects.create(alias=f"user{number}", name="User") for number in range(3)]
+        article = models.Article.objects.create(title="Article")
+        with self.captureOnCommitCallbacks(execute=True):
+            for user in users:
+                user.likes.add(article)
+                user.follows.add(users[0])
+            article.liked_by.remove(users[2])
+            users[1].follows.clear()
+            comment = models.Comment.objects.create(content="Comment", commented_on=article, written_by=users[0])
+            comment.new_version().save()
+            models.Comment.objects.create(content="Other comment", commented_on=article, written_by=users[1])
+            comment.delete()
+            # Rolled back changes aren't counted
+            with self.assertRaises(IntegrityError), transaction.atomic():
+                users[2].likes.add(article)
+                models.Comment.objects.create(content="Rolled back", commented_on=article)
+                models.User.objects.create(id=users[0].id, alias="duplicate", name="User")
+        generation = caching.get_page_generation()
+        with self.assertNumQueries(3):
+            counters.flush()
+        self.assertNotEqual(caching.get_page_generation(), generation)
+
+        article.refresh_from_db()
+        users[0].refresh_from_db()
+        self.assertEqual((article.like_count, article.comment_count), (2, 2))
+        self.assertEqual(users[0].follower_count, 2)
+
+        # The increments of several requests are written together
+        with self.captureOnCommitCallbacks(execute=True):
+            users[2].likes.add(article)
+        self.client.get(reverse("homepage:index"))
+        article.refresh_from_db()
+        self.assertEqual(article.like_count, 2)
+        with override_settings(HOMEPAGE_COUNTER_FLUSH_INTERVAL=0):
+            self.client.get(reverse("homepage:index"))
+        article.refresh_from_db()
+        self.assertEqual(article.like_count, 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            users[2].likes.remove(article)
+        counters.flush()
+
+        models.Commentable.objects.filter(pk=article.commentable_id).update(like_count=5)
+        self.assertEqual(counters.reconcile_counters(), 1)
+        article.refresh_from_db()
+        self.assertEqual(article.like_count, 2)
+
+        models.Followable.objects.filter(pk=users[0].followable_id).update(follower_count=0)
+        with self.assertNumQueries(5):
+            counters.recount_counters()
+        users[0].refresh_from_db()
+        self.assertEqual(users[0].follower_count, 2)
+
+    def test_deleted_comment_counter(self) -> None:
+        """
+        Test if the comment counter is decremented once when the last version of a comment is deleted, by single and
+        by queryset deletes.
+        """
+        counters.flush()
+        article = models.Article.objects.create(title="Article")
+        with self.captureOnCommitCallbacks(execute=True):
+            versions = [models.Comment.objects.create(content="Single deletes", commented_on=article)]
+            versions.append(versions[0].new_version())
+            versions[1].save()
+            other = models.Comment.objects.create(content="Queryset delete", commented_on=article)
+            for _ in range(2):
+                other = other.new_version()
+                other.save()
+        counters.flush()
+        article.refresh_from_db()
+        self.assertEqual(article.comment_count, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            versions[1].delete()
+        counters.flush()
+        article.refresh_from_db()
+        self.assertEqual(article.comment_count, 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            versions[0].delete()
+        counters.flush()
+        article.refresh_from_db()
+        self.assertEqual(article.comment_count, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            models.Comment.objects.filter(version_group=other.version_group).delete()
+        counters.flush()
+        article.refresh_from_db()
+        self.assertEqual(article.comment_count, 0)
+        self.assertEqual(counters.reconcile_counters(), 0)
+
+    @override_settings(HOMEPAGE_THREAD_PAGE_SIZE=2)
+    def test_comment_threads(self) -> None:
+        """
+        Test if whole discussions (under all versions of an article) are loaded depth-first by a single query per page.
+        """
+        article = models.Article.objects.create(title="Article")
+        first = models.Comment.objects.create(content="1", commented_on=article)
+        second = models.Comment.objects.create(content="2", commented_on=article)
+        reply = models.Comment.objects.create(content="1.1", commented_on=first)
+        models.Comment.objects.create(content="1.1.1", commented_on=reply)
+        models.Comment.objects.create(content="2.1", commented_on=second)
+        newer = article.new_version()
+        newer.save()
+        models.Comment.objects.create(content="3", commented_on=newer)
+        edited_reply = reply.new_version()
+        edited_reply.content = "1.1 edited"
+        edited_reply.save()
+        models.Comment.objects.create(content="1.2", commented_on=first)
+        other = models.Article.objects.create(title="Other")
+        for content in ("Other 1", "Other 2"):
+            models.Comment.objects.create(content=content, commented_on=other)
+
+        self.assertEqual(edited_reply.path, reply.path)
+        with self.assertNumQueries(1):
+            page = comments.get_thread_page(article)
+        self.assertEqual(
+            [(comment.content, comment.depth) for comment in page.comments],
+            [("1", 1), ("1.1 edited", 2), ("1.1.1", 3), ("1.2", 2), ("2", 1), ("2.1", 2)],
+        )
+        page = comments.get_thread_page(newer, page.next_cursor)
+        self.assertEqual([comment.content for comment in page.comments], ["3"])
+        self.assertIsNone(page.next_cursor)
+
+        # A discussion of exactly one page has no next page
+        page = comments.get_thread_page(other)
+        self.assertEqual([comment.content for comment in page.comments], ["Other 1", "Other 2"])
+        self.assertIsNone(page.next_cursor)
@@ -0,0 +1,115 @@
+"""
+Includes tests to test the article page and the conditional requests of the pages of the homepage app.
+"""
+from django.core.cache import cache
+from django.test import TestCase, tag
+from django.urls import reverse
+from django.utils.http import http_date
+
+from homepage import caching
+from homepage.models import Article, Comment, Visibility
+
+
+@tag("page-article")
+class TestArticlePage(TestCase):
+    """
+    Includes tests to test the article page and its validators.
+    """
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.article = Article.objects.create(title="Article", content="The text", visibility=Visibility.PUBLIC)
+        self.url = reverse("homepage:article", kwargs={"version_group": self.article.version_group})
+
+    def test_article(self) -> None:
+        """
+        Test if the newest version is shown and private articles are hidden from anonymous users.
+        """
+        self.article.new_version().save()
+        response = self.client.get(self.url)
+        self.assertTemplateUsed(response, "homepage/article.html")
+        self.assertContains(response, "Version 2")
+        self.assertContains(response, "The text")
+        private = Article.objects.create(title="Private")
+        response = self.client.get(reverse("homepage:article", kwargs={"version_group": private.version_group}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_if_none_match(self) -> None:
+        """
+        Test if a matching ETag is answered by 304 by a single query and if new versions and comments change it.
+        """
+        etag = self.client.get(self.url).headers["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+        comment = Comment.objects.create(content="Comment", commented_on=self.article)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers["ETag"]
+        # Replies don't change the counter of the article, but the discussion
+        Comment.objects.create(content="Reply", commented_on=comment)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Reply")
+        etag = response.headers["ETag"]
+        self.article.new_version().save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_counters(self) -> None:
+        """
+        Test if the shown counters of the article change the ETag.
+        """
+        etag = self.client.get(self.url).headers["ETag"]
+        Article.objects.filter(pk=self.article.pk).update(like_count=3)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers["ETag"]
+        Article.objects.filter(pk=self.article.pk).update(comment_count=2)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_discussion_of_versions(self) -> None:
+        """
+        Test if the discussion under older versions is shown with the newest version and changes its ETag.
+        """
+        comment = Comment.objects.create(content="Old comment", commented_on=self.article)
+        newer = self.article.new_version()
+        newer.save()
+        Comment.objects.create(content="New comment", commented_on=newer)
+        response = self.client.get(self.url)
+        self.assertContains(response, "Version 2")
+        self.assertContains(response, "Old comment")
+        self.assertContains(response, "New comment")
+        Comment.objects.create(content="Late reply", commented_on=comment)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response.headers["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Late reply")
+
+    def test_if_modified_since(self) -> None:
+        """
+        Test if the Last-Modified date is answered by 304 until the article gets a new version.
+        """
+        last_modified = self.client.get(self.url).headers["Last-Modified"]
+        self.assertEqual(last_modified, http_date(self.article.created.timestamp()))
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+        newer = self.article.new_version()
+        newer.save()
+        Article.objects.filter(pk=newer.pk).update(created=newer.created.replace(year=newer.created.year + 1))
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 200)
+
+    def test_index(self) -> None:
+        """
+        Test if the index page for anonymous users is answered by 304 until the pages get invalidated.
+        """
+        url = reverse("homepage:index", kwargs={"active_category": "physics"})
+        response = self.client.get(url)
+        etag = response.headers["ETag"]
+        self.assertEqual(response.headers["Cache-Control"], "no-cache")
+        # The cached rendering has the same ETag
+        self.assertEqual(self.client.get(url).headers["ETag"], etag)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertNotEqual(self.client.get(reverse("homepage:index")).headers["ETag"], etag)
+        caching.invalidate_pages()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
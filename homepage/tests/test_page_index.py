@@ -1,10 +1,18 @@
 """
 Includes tests to test the index page of the homepage app.
 """
-from django.test import TestCase, tag
+from asgiref.sync import sync_to_async
+
+# pylint: disable=imported-auth-user
+from django.contrib.auth.models import User as AuthUser
+from django.core.cache import cache
+from django.test import TestCase, override_settings, tag
 from django.urls import reverse
 from django.utils.translation import gettext_lazy
 
+from homepage import caching, feed
+from homepage.models import Article, Category, User, Visibility
+
 
 # Create your tests here.
 @tag("page-index")
@@ -13,6 +21,9 @@ class TestIndexPage(TestCase):
     Includes tests to test the index page of the homepage app.
     """
 
+    def setUp(self) -> None:
+        cache.clear()
+
     @tag("template")
     def test_template_used(self) -> None:
         """
@@ -58,3 +69,144 @@ class TestIndexPage(TestCase):
             f'{reverse("homepage:index", kwargs={"active_category": "physics"})}">Physics</a>'
         )
         self.assertContains(response, find_physics, html=True)
+
+    @tag("async")
+    async def test_async_index(self) -> None:
+        """
+        Test if the index page is served by the async client (i.e. like by ASGI) including the feed and the cache.
+        """
+        await Article.objects.acreate(title="Async article", visibility=Visibility.PUBLIC)
+        # The categories are loaded by another connection if the event loop resolves the URL. It can't see the
+        # categories of the test transaction.
+        await sync_to_async(caching.get_categories)()
+        response = await self.async_client.get(reverse("homepage:index", kwargs={"active_category": "physics"}))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Physics")
+        response = await self.async_client.get(reverse("homepage:index"))
+        self.assertContains(response, "Async article")
+        self.assertContains(await self.async_client.get(reverse("homepage:index")), "Async article")
+
+    @tag("cache")
+    def test_anonymous_page_cache(self) -> None:
+        """
+        Test if the index page is served from the cache for anonymous users and invalidated by category changes.
+        """
+        self.client.get(reverse("homepage:index"))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("homepage:index"))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Physics")
+
+        biology_link = reverse("homepage:index", kwargs={"active_category": "biology"})
+        self.assertContains(response, biology_link)
+        Category.objects.get(name="biology").delete()
+        response = self.client.get(reverse("homepage:index"))
+        self.assertNotContains(response, biology_link)
+
+    @tag("cache")
+    def test_evicted_page_generation(self) -> None:
+        """
+        Test if the cached pages of an evicted generation don't become valid again.
+        """
+        caching.set_cached_page("index", None, "anonymous", b"Old page")
+        generation = caching.get_page_generation()
+        cache.delete(caching.PAGE_GENERATION_KEY)
+        self.assertNotEqual(caching.get_page_generation(), generation)
+        self.assertIsNone(caching.get_cached_page("index", None))
+        caching.invalidate_pages()
+        self.assertIsNone(caching.get_cached_page("index", None))
+
+    @tag("cache")
+    def test_registered_page_cache(self) -> None:
+        """
+        Test if all registered users share the cached page shell and get their own login/logout fragment.
+        """
+        AuthUser.objects.create_user(username="first", password="12345")
+        AuthUser.objects.create_user(username="second", password="12345")
+        self.client.login(username="first", password="12345")
+        self.assertContains(self.client.get(reverse("homepage:index")), f'{reverse("auth:logout")}?next=/')
+        self.client.login(username="second", password="12345")
+        # Only the session and the user are loaded
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("homepage:index"))
+        self.assertContains(response, ">Logout</a>")
+        self.client.logout()
+        response = self.client.get(reverse("homepage:index"))
+        self.assertContains(response, ">Login</a>")
+        self.assertNotContains(response, "homepage:fragment")
+
+    @tag("fragments")
+    def test_fragment_endpoint(self) -> None:
+        """
+        Test if the fragments are rendered for the user and only link to local pages.
+        """
+        url = reverse("homepage:fragment", kwargs={"name": "loginout"})
+        response = self.client.get(url, {"page": "/category/physics"})
+        self.assertContains(response, f'{reverse("auth:login")}?next=/category/physics')
+        self.assertEqual(response.headers["Cache-Control"], "private, no-cache")
+        self.assertContains(self.client.get(url, {"page": "https://example.com/"}), "?next=/")
+        self.assertEqual(self.client.get(reverse("homepage:fragment", kwargs={"name": "unknown"})).status_code, 404)
+
+    @tag("routing", "cache")
+    def test_category_subrouting_without_queries(self) -> None:
+        """
+        Test if the category pages are resolved without queries and new categories are available immediately.
+        """
+        self.client.get(reverse("homepage:index", kwargs={"active_category": "physics"}))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("homepage:index", kwargs={"active_category": "physics"}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get("/category/astronomy").status_code, 404)
+
+        Category.objects.create(name="astronomy")
+        response = self.client.get(reverse("homepage:index", kwargs={"active_category": "astronomy"}))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Astronomy")
+
+    @tag("feed")
+    @override_settings(HOMEPAGE_FEED_PAGE_SIZE=4)
+    def test_article_feed(self) -> None:
+        """
+        Test if the article feed shows the newest visible versions page by page with a constant number of queries.
+        """
+        physics = Category.objects.get(name="physics")
+        author = User.objects.create(alias="author", name="Jane Doe")
+        articles = []
+        for number in range(10):
+            article = Article.objects.create(title=f"Article {number}", visibility=Visibility.PUBLIC)
+            article.related_authors.add(author)
+            if number % 2 == 0:
+                article.related_categories.add(physics)
+            articles.append(article)
+        Article.objects.create(title="Private article", visibility=Visibility.PRIVATE)
+        new_version = articles[0].new_version()
+        new_version.title = "Article 0 revised"
+        new_version.save()
+
+        titles = []
+        cursor = None
+        while True:
+            with self.assertNumQueries(2):
+                page = feed.get_feed_page(Article.objects.visible_to(None), None, cursor)
+                titles.extend(article.title for article in page.articles)
+                for article in page.articles:
+                    list(article.related_authors.all())
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        self.assertEqual(titles, ["Article 0 revised"] + [f"Article {number}" for number in range(9, 0, -1)])
+
+        page = feed.get_feed_page(Article.objects.visible_to(None), physics)
+        self.assertEqual(
+            [article.title for article in page.articles], ["Article 8", "Article 6", "Article 4", "Article 2"]
+        )
+        self.assertIsNone(page.next_cursor)
+
+        response = self.client.get(reverse("homepage:index"))
+        self.assertContains(response, "Article 0 revised")
+        self.assertContains(response, "Jane Doe")
+        self.assertNotContains(response, "Private article")
+        response = self.client.get(reverse("homepage:index"), {"after": response.context["next_cursor"]})
+        self.assertContains(response, "Article 6")
+        self.assertNotContains(response, "Article 7")
+        self.assertEqual(self.client.get(reverse("homepage:index"), {"after": "invalid"}).status_code, 404)
@@ -0,0 +1,90 @@
+"""
+Includes tests to test the profiling of the requests.
+"""
+# pylint: disable=imported-auth-user
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings, tag
+from django.urls import reverse
+
+from homepage import profiling
+from homepage.models import Category
+
+
+@tag("profiling")
+@override_settings(HOMEPAGE_PROFILING=True, HOMEPAGE_PROFILING_REPEATED_QUERY_THRESHOLD=3)
+class TestProfiling(TestCase):
+    """
+    Includes tests to test the profiling middleware and its histograms.
+    """
+
+    def setUp(self) -> None:
+        cache.clear()
+        profiling.stats.reset()
+        # The connection of the test was opened before the middleware was created. The connections of the server
+        # threads are instrumented when they are connected.
+        profiling.instrument_queries()
+
+    def test_request_profile(self) -> None:
+        """
+        Test if the queries and the template rendering of a request are recorded by view and category.
+        """
+        self.client.get(reverse("homepage:index", kwargs={"active_category": "physics"}))
+        views = profiling.stats.to_dict()
+        self.assertEqual(list(views), ["homepage:index[physics]"])
+        view = views["homepage:index[physics]"]
+        self.assertEqual(view["duration_ms"]["count"], 1)
+        self.assertGreater(view["queries"]["sum"], 0)
+        self.assertGreater(view["template_time_ms"]["sum"], 0)
+        self.assertEqual(view["repeated_query_requests"], 0)
+
+    async def test_async_request(self) -> None:
+        """
+        Test if the queries of async requests are recorded although they run in other threads.
+        """
+        await self.async_client.get(reverse("homepage:index"))
+        view = profiling.stats.to_dict()["homepage:index"]
+        self.assertEqual(view["duration_ms"]["count"], 1)
+        self.assertGreater(view["queries"]["sum"], 0)
+        self.assertGreater(view["template_time_ms"]["sum"], 0)
+
+    def test_repeated_queries(self) -> None:
+        """
+        Test if queries executed many times by one request are counted and logged.
+        """
+
+        def view(request):  # pylint: disable=unused-argument
+            for _ in range(3):
+                list(Category.objects.filter(name="physics"))
+            list(Category.objects.filter(name="biology"))
+            return HttpResponse()
+
+        middleware = profiling.RequestProfilingMiddleware(view)
+        with self.assertLogs("homepage.profiling", "WARNING") as logs:
+            middleware(RequestFactory().get("/"))
+        self.assertIn("executed the same query 4 times", logs.output[0])
+        stats = profiling.stats.to_dict()["<unresolved>"]
+        self.assertEqual(stats["duplicates"], 2)
+        self.assertEqual(stats["repeated_query_requests"], 1)
+        self.assertEqual(stats["queries"]["buckets"]["2"], 0)
+        self.assertEqual(stats["queries"]["buckets"]["5"], 1)
+
+    def test_stats_view(self) -> None:
+        """
+        Test if the histograms are only returned to staff users.
+        """
+        self.assertEqual(self.client.get(reverse("homepage:profiling")).status_code, 404)
+        self.client.force_login(User.objects.create_user(username="staff", is_staff=True))
+        response = self.client.get(reverse("homepage:profiling"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("homepage:profiling", response.json())
+
+    @override_settings(HOMEPAGE_PROFILING=False)
+    def test_disabled(self) -> None:
+        """
+        Test if the middleware isn't used if the profiling is disabled.
+        """
+        with self.assertRaises(MiddlewareNotUsed):
+            profiling.RequestProfilingMiddleware(lambda request: HttpResponse())
@@ -0,0 +1,117 @@
+"""
+Includes tests to detect N+1 queries of the pages of the homepage app and of the admin.
+"""
+# pylint: disable=imported-auth-user
+from django.contrib import admin
+from django.contrib.auth.models import User as AuthUser
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, tag
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from homepage import counters
+from homepage.models import Article, Category, Comment, Project, Tag, User
+
+
+def get_urls() -> dict[str, str]:
+    """
+    Returns the URLs of the pages to check by their names: The pages of the homepage app and the change lists of all
+    models registered in the admin.
+    """
+    urls = {
+        "index": reverse("homepage:index"),
+        "category": reverse("homepage:index", kwargs={"active_category": "physics"}),
+        "login": reverse("auth:login"),
+    }
+    for model in admin.site._registry:  # pylint: disable=protected-access
+        name = f"admin:{model._meta.app_label}_{model._meta.model_name}_changelist"
+        urls[name] = reverse(name)
+    return urls
+
+
+@tag("query-counts")
+class TestQueryCounts(TestCase):
+    """
+    Includes tests which ensure that the number of queries of a page doesn't grow with the number of shown rows.
+    """
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.admin_user = AuthUser.objects.create_superuser(username="admin", password="12345")
+        self.physics = Category.objects.get(name="physics")
+        self.tag = Tag.objects.create(name="quantum")
+
+    def create_rows(self, count: int) -> None:
+        """
+        Creates `count` users, projects and articles with authors, tags, categories, comments, likes and follows.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            for number in range(count):
+                user = User.objects.create(alias=f"user{User.objects.count()}", name="User")
+                project = Project.objects.create(title=f"Project {number}", visibility="public")
+                project.related_authors.add(user)
+                for other in User.objects.exclude(pk=user.pk):
+                    other.follows.add(user, project)
+                article = Article.objects.create(
+                    title=f"Article {number}", visibility="public", related_project=project
+                )
+                article.related_authors.add(user)
+                article.related_tags.add(self.tag)
+                article.related_categories.add(self.physics)
+                article.new_version().save()
+                comment = Comment.objects.create(content="Comment", commented_on=article, written_by=user)
+                Comment.objects.create(content="Reply", commented_on=comment, written_by=user)
+                for other in User.objects.exclude(pk=user.pk):
+                    other.likes.add(article)
+        counters.flush()
+
+    def count_queries(self, urls: dict[str, str]) -> dict[str, int]:
+        """
+        Requests every URL with an empty cache and returns the number of queries by the names of the URLs.
+        """
+        query_counts = {}
+        for name, url in urls.items():
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, name)
+            query_counts[name] = len(queries)
+        return query_counts
+
+    def test_constant_query_counts(self) -> None:
+        """
+        Test if the pages need the same number of queries for few and for more rows.
+        """
+        urls = get_urls()
+        self.create_rows(2)
+        few_anonymous = self.count_queries({"index": urls["index"], "category": urls["category"]})
+        self.client.force_login(self.admin_user)
+        few = self.count_queries(urls)
+
+        self.create_rows(4)
+        more = self.count_queries(urls)
+        self.client.logout()
+        more_anonymous = self.count_queries({"index": urls["index"], "category": urls["category"]})
+
+        for name, url in urls.items():
+            with self.subTest(name, url=url):
+                self.assertEqual(few[name], more[name])
+        self.assertEqual(few_anonymous, more_anonymous)
+
+    def test_replies_to_one_parent(self) -> None:
+        """
+        Test if the change list of the comments needs the same number of queries for few and for more replies to the
+        same parent. The parents of a page are resolved by a single query.
+        """
+        url = reverse("admin:homepage_comment_changelist")
+        self.client.force_login(self.admin_user)
+        self.create_rows(1)
+        parent = Comment.objects.get(content="Comment")
+        for _ in range(2):
+            Comment.objects.create(content="Reply", commented_on=parent)
+        few = self.count_queries({"comments": url})
+
+        for _ in range(8):
+            Comment.objects.create(content="Reply", commented_on=parent)
+        self.assertEqual(few, self.count_queries({"comments": url}))
@@ -0,0 +1,74 @@
+"""
+Includes tests to test the full-text search of the homepage app.
+"""
+from django.test import TestCase, tag
+
+from homepage import search
+from homepage.models import Article, Category, Project, SearchDocument, User, Visibility
+
+
+@tag("search")
+class TestSearch(TestCase):
+    """
+    Includes tests to test the full-text search of the homepage app.
+    """
+
+    def setUp(self) -> None:
+        self.physics = Category.objects.get(name="physics")
+        self.article = Article.objects.create(
+            title="Quantum computers",
+            content="Why quantum computers aren't just faster computers.\nThey use superposition.",
+            visibility=Visibility.PUBLIC,
+        )
+        self.article.related_categories.add(self.physics)
+        Article.objects.create(
+            title="Selfish genes",
+            content="Genes are selfish. Not even quantum effects change that.",
+            visibility=Visibility.PUBLIC,
+        )
+        self.project = Project.objects.create(
+            title="Secret project", description="Building quantum computers <b>at home</b>"
+        )
+
+    def test_ranking_and_snippets(self) -> None:
+        """
+        Test if matches in the title rank higher and the snippets are highlighted and escaped.
+        """
+        with self.assertNumQueries(2):
+            results = search.search("Quantum!")
+        self.assertEqual([result.entity.title for result in results], ["Quantum computers", "Selfish genes"])
+        self.assertIn("<mark>quantum</mark>", results[0].snippet)
+        self.assertEqual(search.search("superposition genes"), [])
+        self.assertEqual(search.search('"'), [])
+
+        results = search.search("home", is_moderator=True)
+        self.assertEqual([result.entity for result in results], [self.project])
+        self.assertIn("&lt;b&gt;at <mark>home</mark>&lt;/b&gt;", results[0].snippet)
+
+    def test_filters(self) -> None:
+        """
+        Test if the results are filtered by visibility and categories.
+        """
+        author = User.objects.create(alias="author", name="Author")
+        self.assertEqual(len(search.search("computers")), 1)
+        self.assertEqual(len(search.search("computers", user=author)), 1)
+        self.project.related_authors.add(author)
+        self.assertEqual(len(search.search("computers", user=author)), 2)
+        self.assertEqual(len(search.search("computers", is_moderator=True)), 2)
+        results = search.search("quantum", categories=[self.physics])
+        self.assertEqual([result.entity for result in results], [self.article])
+
+    def test_incremental_update(self) -> None:
+        """
+        Test if only the newest version of an article is indexed.
+        """
+        new_version = self.article.new_version()
+        new_version.content = "Entanglement"
+        new_version.save()
+        self.assertEqual([result.entity for result in search.search("entanglement")], [new_version])
+        self.assertEqual([result.entity.title for result in search.search("superposition")], [])
+
+        new_version.delete()
+        self.assertEqual([result.entity for result in search.search("superposition")], [self.article])
+        self.assertEqual(SearchDocument.objects.count(), 3)
+        self.assertEqual(search.rebuild_index(), 3)
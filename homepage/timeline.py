@@ -0,0 +1,149 @@
+"""
+Contains the timelines of the users, i.e. the new articles and comments of everything a user follows.
+The timelines are materialized: When a new article or comment is saved, an entry is created for every follower of its
+sources (fan-out on write). Followables with more followers than the fan-out limit are skipped. Their items are
+fetched when the timeline is read (fan-out on read) to keep the writes bounded.
+"""
+from datetime import datetime
+from typing import Iterable, Optional, Union
+
+from django.conf import settings
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+
+from homepage.models import Article, Comment, Followable, Project, TimelineEntry, User, Versionable
+
+DEFAULT_FANOUT_LIMIT = 1000
+DEFAULT_RETENTION = 500
+DEFAULT_TIMELINE_SIZE = 20
+BATCH_SIZE = 500
+
+
+def get_fanout_limit() -> int:
+    """
+    Followables with more followers are read at read time. It can be configured by the setting
+    `HOMEPAGE_TIMELINE_FANOUT_LIMIT`.
+    """
+    return getattr(settings, "HOMEPAGE_TIMELINE_FANOUT_LIMIT", DEFAULT_FANOUT_LIMIT)
+
+
+def get_retention() -> int:
+    """
+    The maximum number of entries kept per timeline by `trim_timelines()`. It can be configured by the setting
+    `HOMEPAGE_TIMELINE_RETENTION`.
+    """
+    return getattr(settings, "HOMEPAGE_TIMELINE_RETENTION", DEFAULT_RETENTION)
+
+
+def get_popular_sources(followable_ids: Iterable[int]) -> set[int]:
+    """
+    Returns the IDs of the followables which have more followers than the fan-out limit.
+    """
+    return set(
+        Followable.objects.filter(pk__in=followable_ids, follower_count__gt=get_fanout_limit()).values_list(
+            "pk", flat=True
+        )
+    )
+
+
+def get_sources(item: Union[Article, Comment]) -> list[int]:
+    """
+    Returns the IDs of the followables whose followers should see the item, i.e. the project and the authors of an
+    article or the author of a comment.
+    """
+    if isinstance(item, Article):
+        sources = list(item.related_authors.values_list("followable_ptr_id", flat=True))
+        if item.related_project_id is not None:
+            sources.append(item.related_project.followable_ptr_id)
+        return sources
+    if item.written_by_id is None:
+        return []
+    return [item.written_by.followable_ptr_id]
+
+
+def fan_out(item: Versionable, source_ids: Iterable[int]) -> int:
+    """
+    Adds the item to the timelines of the followers of the sources. Popular sources are skipped.
+    :param item: The first version of a new article or comment
+    :param source_ids: The IDs of the followables the item belongs to
+    :return: The number of timelines the item was added to
+    """
+    source_ids = set(source_ids)
+    source_ids -= get_popular_sources(source_ids)
+    if not source_ids:
+        return 0
+    entries: dict[int, TimelineEntry] = {}
+    follows = User.follows.through.objects.filter(followable_id__in=source_ids).values_list("user_id", "followable_id")
+    for owner_id, source_id in follows.iterator():
+        if owner_id not in entries:
+            entries[owner_id] = TimelineEntry(owner_id=owner_id, item=item, source_id=source_id, created=item.created)
+    TimelineEntry.objects.bulk_create(entries.values(), batch_size=BATCH_SIZE, ignore_conflicts=True)
+    return len(entries)
+
+
+def get_timeline(user: User, size: Optional[int] = None, before: Optional[datetime] = None) -> list[Versionable]:
+    """
+    Returns the newest versions of the latest articles and comments of everything the user follows (newest first).
+    The items are instances of their concrete subclasses. Only visible articles and the comments of visible articles
+    and projects are included.
+    :param user: The owner of the timeline
+    :param size: The maximum number of items. Defaults to `DEFAULT_TIMELINE_SIZE`.
+    :param before: Only return items created before this date (used for pagination)
+    """
+    size = size or DEFAULT_TIMELINE_SIZE
+    entries = user.timeline_entries.all()
+    popular = get_popular_sources(user.follows.values("followable_id"))
+    read_items = Versionable.objects.filter(
+        Q(article__related_project__followable_ptr__in=popular)
+        | Q(article__related_authors__followable_ptr__in=popular)
+        | Q(comment__written_by__followable_ptr__in=popular),
+        version_number=1,
+    )
+    if before is not None:
+        entries = entries.filter(created__lt=before)
+        read_items = read_items.filter(created__lt=before)
+    items = list(entries.order_by("-created").values_list("created", "item__version_group")[:size])
+    if popular:
+        items += read_items.order_by("-created").values_list("created", "version_group").distinct()[:size]
+        items.sort(reverse=True)
+    version_groups = list(dict.fromkeys(version_group for _, version_group in items))[:size]
+    visible_articles = Article.objects.latest_versions().visible_to(user)
+    heads = (
+        Versionable.objects.latest_versions()
+        .filter(version_group__in=version_groups)
+        .filter(
+            Q(article__in=visible_articles)
+            | Q(comment__thread_root__article__version_group__in=visible_articles.values("version_group"))
+            | Q(comment__thread_root__project__in=Project.objects.visible_to(user))
+        )
+        .as_concrete()
+    )
+    heads_by_group = {head.version_group: head for head in heads}
+    return [heads_by_group[version_group] for version_group in version_groups if version_group in heads_by_group]
+
+
+def trim_timelines(retention: Optional[int] = None) -> int:
+    """
+    Deletes the oldest entries of every timeline exceeding the retention.
+    :param retention: The number of entries to keep per timeline. Defaults to `get_retention()`.
+    :return: The number of deleted entries
+    """
+    retention = get_retention() if retention is None else retention
+    expired = (
+        TimelineEntry.objects.annotate(
+            position=Window(RowNumber(), partition_by=[F("owner")], order_by=[F("created").desc(), F("pk").desc()])
+        )
+        .filter(position__gt=retention)
+        .values_list("pk", flat=True)
+    )
+    deleted = 0
+    batch: list[int] = []
+    # The expired entries are streamed and deleted in batches, i.e. they are never all loaded at once.
+    for pk in expired.iterator(chunk_size=BATCH_SIZE):
+        batch.append(pk)
+        if len(batch) == BATCH_SIZE:
+            deleted += TimelineEntry.objects.filter(pk__in=batch).delete()[0]
+            batch = []
+    if batch:
+        deleted += TimelineEntry.objects.filter(pk__in=batch).delete()[0]
+    return deleted
@@ -13,4 +13,8 @@ register_converter(CategoryConverter, "category")
 urlpatterns = [
     path("", views.index, name="index"),
     path("category/<category:active_category>", views.index, name="index"),
+    path("article/<int:version_group>", views.article, name="article"),
+    path("fragment/<slug:name>", views.fragment, name="fragment"),
+    path("deq/<slug:system>", views.deq_trajectories, name="deq"),
+    path("profiling", views.profiling_stats, name="profiling"),
 ]
@@ -1,51 +1,269 @@
 """
 Include the views of the homepage app.
 """
-from typing import Optional
+import json
+from datetime import datetime
+from typing import Optional, TypedDict
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import BadRequest
+from django.db.models import Count, Max, OuterRef, Subquery
 
 # pylint: disable=unused-import
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.utils.translation import get_language
+from django.views.decorators.http import condition
 from django.views.generic import TemplateView
 
-from homepage.models import Category
+from homepage import caching, comments, deqsolver, feed, fragments, profiling
+from homepage.models import Article, Category, Comment
 
 
-def index(request, active_category: Optional[Category] = None):
+async def index(request, active_category: Optional[Category] = None):
     """
     The index page of the homepage. It uses the `index.html` in the template folder.
+    The content area shows the article feed. Further pages are requested by the cursor in the `after` parameter.
+    The first page is rendered as a shell per audience (anonymous or registered users) which is cached as a whole. The
+    user specific fragments (see `homepage.fragments`) are filled into the shell on every request. Thus, the cache is
+    shared by all users of an audience.
+    The pages for anonymous users carry an ETag of the page generation (see `caching.get_page_generation`). A request
+    with a matching `If-None-Match` is answered by 304 before the feed is loaded.
+    The view is async, i.e. it doesn't block a worker thread while waiting for the cache or the database if the app is
+    served by ASGI. Only the session and the rendering of the templates run in a thread as they aren't async.
     """
+    anonymous = not await _is_authenticated(request)
+    audience = "anonymous" if anonymous else "registered"
+    cursor = request.GET.get("after")
+    etag = None
+    if anonymous:
+        etag = await _aget_index_etag(active_category, cursor)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+    current_url = (
+        reverse("homepage:index")
+        if active_category is None
+        else reverse("homepage:index", kwargs={"active_category": active_category.name})
+    )
+    shell = None
+    if cursor is None:
+        shell = await caching.aget_cached_page("index", active_category, audience)
+    if shell is None:
+        shell = await _arender_index_shell(request, active_category, cursor, current_url, is_registered=not anonymous)
+        if cursor is None:
+            await caching.aset_cached_page("index", active_category, audience, shell)
+    content = await sync_to_async(fragments.fill_fragments)(request, shell, current_url)
+    return _add_validators(HttpResponse(content), etag)
+
+
+async def _arender_index_shell(
+    request, active_category: Optional[Category], cursor: Optional[str], current_url: str, is_registered: bool
+) -> bytes:
     categories = []
-    for category in Category.objects.all():
-        add_class = "" if active_category is None or active_category != category else " active"
+    for category in await caching.aget_category_nav():
+        add_class = "" if active_category is None or active_category.name != category["name"] else " active"
         categories.append(
             {
-                "label": category.name.capitalize(),
+                "label": category["label"],
                 "add_class": add_class,
-                "link": reverse("homepage:index", kwargs={"active_category": category.name}),
+                "link": category["link"],
             }
         )
     page_title = "Pulp Science"
     if active_category is not None:
         page_title += f" - {active_category.name.capitalize()}"
 
-    template_name = "homepage/index.html"
-    current_url = (
-        reverse("homepage:index")
-        if active_category is None
-        else reverse("homepage:index", kwargs={"active_category": active_category.name})
-    )
-    if request.user.is_authenticated:
-        loginout = "Logout"
-        loginout_url = reverse("auth:logout") + f"?next={current_url}"
-    else:
-        loginout = "Login"
-        loginout_url = reverse("auth:login") + f"?next={current_url}"
+    # The users of django's authentication system have no `homepage.models.User` profile yet.
+    articles = Article.objects.visible_to(None, is_registered=is_registered)
+    try:
+        feed_page = await feed.aget_feed_page(articles, active_category, cursor)
+    except ValueError as error:
+        raise Http404("Invalid feed cursor") from error
+
     context = {
         "categories": categories,
         "page_title": page_title,
-        "loginout": loginout,
-        "loginout_url": loginout_url,
         "current_url": current_url,
+        "articles": feed_page.articles,
+        "next_cursor": feed_page.next_cursor,
     }
-    return render(request, template_name, context)
+    # The context processors access the (lazy) user of the request
+    response = await sync_to_async(render)(request, "homepage/index.html", context)
+    return response.content
+
+
+async def _aget_index_etag(category: Optional[Category], cursor: Optional[str]) -> str:
+    # The pages change with the generation of the cached pages. The cursor is ASCII (base64).
+    generation = await caching.aget_page_generation()
+    category_name = category.name if category is not None else ""
+    return quote_etag(f"index-{generation}-{category_name}-{get_language()}-{cursor or ''}")
+
+
+def _add_validators(response: HttpResponse, etag: Optional[str]) -> HttpResponse:
+    # The browsers and nginx have to revalidate the page on every request (which is cheap by the ETag)
+    if etag is not None:
+        response.headers["ETag"] = etag
+        patch_cache_control(response, no_cache=True)
+    return response
+
+
+async def _is_authenticated(request) -> bool:
+    # The user of the request is loaded lazily from the session, i.e. by the database
+    return await sync_to_async(lambda: request.user.is_authenticated)()
+
+
+class ArticleHead(TypedDict):
+    """
+    The validators of an article page. They are loaded without the article itself.
+    """
+
+    pk: int
+    version_number: int
+    created: datetime
+    discussion_size: int
+    """
+    The number of comment versions in the discussion under all versions of the article. Replies and edits of comments
+    increase it.
+    """
+    last_commented: Optional[datetime]
+    like_count: int
+    comment_count: int
+
+
+def get_article_head(request, version_group: int) -> Optional[ArticleHead]:
+    """
+    Returns the validators of the newest version of an article visible to the user of the request or None if there is
+    no such article. The result is stored in the request as both validators of `article` need it.
+    """
+    if getattr(request, "_article_head", (None, None))[0] != version_group:
+        # The discussion spans all versions of the article (see `homepage.comments`)
+        discussion = Comment.objects.filter(thread_root__article__version_group=OuterRef("version_group")).order_by()
+        discussion = discussion.values("thread_root__article__version_group")
+        head = (
+            Article.objects.visible_to(None, is_registered=request.user.is_authenticated)
+            .filter(version_group=version_group, is_latest=True)
+            .annotate(
+                discussion_size=Subquery(discussion.annotate(count=Count("pk")).values("count")),
+                last_commented=Subquery(discussion.annotate(last=Max("created")).values("last")),
+            )
+            .values(
+                "pk", "version_number", "created", "discussion_size", "last_commented", "like_count", "comment_count"
+            )
+            .first()
+        )
+        if head is not None:
+            head = ArticleHead(
+                pk=head["pk"],
+                version_number=head["version_number"],
+                created=head["created"],
+                discussion_size=head["discussion_size"] or 0,
+                last_commented=head["last_commented"],
+                like_count=head["like_count"],
+                comment_count=head["comment_count"],
+            )
+        request._article_head = (version_group, head)  # pylint: disable=protected-access
+    return request._article_head[1]  # pylint: disable=protected-access
+
+
+def _get_article_etag(request, version_group: int) -> Optional[str]:
+    head = get_article_head(request, version_group)
+    if head is None:
+        return None
+    audience = "user" if request.user.is_authenticated else "anonymous"
+    counters = f"{head['discussion_size']}-{head['like_count']}-{head['comment_count']}"
+    return f"article-{version_group}-{head['version_number']}-{counters}-{audience}"
+
+
+def _get_article_last_modified(request, version_group: int) -> Optional[datetime]:
+    head = get_article_head(request, version_group)
+    if head is None:
+        return None
+    return max(head["created"], head["last_commented"] or head["created"])
+
+
+@condition(etag_func=_get_article_etag, last_modified_func=_get_article_last_modified)
+def article(request, version_group: int):
+    """
+    The page of an article. It shows the newest version of the article and the first page of the discussion under all
+    its versions. The page is determined by the version of the article, its counters and its discussion. Thus, the
+    validators (ETag and Last-Modified) are computed by a single query without loading the article and a conditional
+    request is answered by 304 before anything is rendered.
+    """
+    head = get_article_head(request, version_group)
+    if head is None:
+        raise Http404("Article not found")
+    shown_article = Article.objects.prefetch_related("related_authors").get(pk=head["pk"])
+    thread_page = comments.get_thread_page(shown_article)
+    context = {
+        "page_title": f"Pulp Science - {shown_article.title}",
+        "article": shown_article,
+        "content": shown_article.get_content(),
+        "comments": thread_page.comments,
+        "index_url": reverse("homepage:index"),
+    }
+    response = render(request, "homepage/article.html", context)
+    if request.user.is_authenticated:
+        patch_cache_control(response, no_cache=True, private=True)
+    else:
+        patch_cache_control(response, no_cache=True)
+    return response
+
+
+def fragment(request, name: str):
+    """
+    Returns a user specific fragment of the pages (see `homepage.fragments`), e.g. to be included by a proxy into a
+    cached page shell. The URL of the page containing the fragment is given by the `page` parameter.
+    """
+    if name not in fragments.FRAGMENTS:
+        raise Http404("Unknown fragment")
+    response = HttpResponse(fragments.render_fragment(request, name, request.GET.get("page", "")))
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def deq_trajectories(request, system: str):
+    """
+    Streams the trajectories of a system of differential equations for the deqsolver widget as NDJSON, i.e. a JSON
+    object per chunk of frames (see `deqsolver.get_trajectory_chunks`). The parameters of the request:
+    - `tableau`: The name of a Butcher tableau (see `deqsolver.TABLEAUS`) or a tableau as JSON object
+    - `h`: The step size
+    - `y0`: The initial conditions as JSON array (one or more states)
+    - `frames`: The number of frames including the initial condition
+    - `steps_per_frame` (optional): The number of steps between two frames
+    - `t0` (optional): The initial time
+    - `parameters` (optional): The parameters of the system as JSON object
+    The trajectories never change, so the responses can be cached by the browsers and proxies.
+    """
+    if system not in deqsolver.SYSTEMS:
+        raise Http404("Unknown system")
+    try:
+        tableau = request.GET.get("tableau", "rk4")
+        problem = deqsolver.create_problem(
+            system,
+            json.loads(tableau) if tableau.startswith("{") else tableau,
+            float(request.GET["h"]),
+            json.loads(request.GET["y0"]),
+            int(request.GET["frames"]),
+            steps_per_frame=int(request.GET.get("steps_per_frame", 1)),
+            t0=float(request.GET.get("t0", 0)),
+            parameters=json.loads(request.GET.get("parameters", "{}")),
+        )
+    except (KeyError, ValueError, TypeError) as error:
+        raise BadRequest(f"Invalid parameters: {error}") from error
+    chunks = (json.dumps(chunk) + "\n" for chunk in deqsolver.get_trajectory_chunks(problem))
+    response = StreamingHttpResponse(chunks, content_type="application/x-ndjson")
+    patch_cache_control(response, public=True, max_age=86400)
+    return response
+
+
+def profiling_stats(request):
+    """
+    Returns the aggregated profiling histograms of this process as JSON (see `homepage.profiling`). It is only
+    available to staff users if the profiling is enabled.
+    """
+    if not profiling.is_enabled() or not request.user.is_staff:
+        raise Http404()
+    return JsonResponse(profiling.stats.to_dict())
@@ -45,6 +45,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "homepage.profiling.RequestProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -92,6 +93,51 @@ DATABASES = {
     }
 }
 
+# Database connections
+# Opening a connection costs a TCP and an authentication handshake with the database server. Thus, every gunicorn
+# worker keeps its connection open for POSTGRES_CONN_MAX_AGE seconds ("none" for unlimited) and checks it at the
+# beginning of each request. Django recommends disabling persistent connections for ASGI as every request runs in its
+# own thread. Use the pgbouncer service of docker-compose.yaml instead (POSTGRES_POOL=1): The app connects to
+# pgbouncer (POSTGRES_POOL_SERVER), which shares a pool of at most POSTGRES_POOL_SIZE (default: GUNICORN_WORKERS)
+# server connections among all workers in transaction mode. Server-side cursors don't work in transaction mode, so
+# they are disabled.
+
+POSTGRES_POOL = os.getenv("POSTGRES_POOL", "0") == "1"
+DEFAULT_CONN_MAX_AGE = "0" if os.getenv("SERVER_INTERFACE") == "asgi" else "60"
+POSTGRES_CONN_MAX_AGE = os.getenv("POSTGRES_CONN_MAX_AGE") or DEFAULT_CONN_MAX_AGE
+DATABASES["default"]["CONN_MAX_AGE"] = None if POSTGRES_CONN_MAX_AGE.lower() == "none" else int(POSTGRES_CONN_MAX_AGE)
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = os.getenv("POSTGRES_CONN_HEALTH_CHECKS", "1") == "1"
+if POSTGRES_POOL:
+    DATABASES["default"]["HOST"] = os.getenv("POSTGRES_POOL_SERVER", "pgbouncer")
+    DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# The cache has to be shared by all gunicorn workers. Otherwise, e.g. changed categories would not be noticed by
+# the other workers.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("DJANGO_CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"),
+        "LOCATION": os.getenv("DJANGO_CACHE_LOCATION", "/var/tmp/pulp_science_cache"),
+    }
+}
+
+
+# Profiling
+# The requests are only profiled if `HOMEPAGE_PROFILING` is enabled (see homepage/profiling.py).
+
+HOMEPAGE_PROFILING = os.getenv("HOMEPAGE_PROFILING", "0") == "1"
+HOMEPAGE_PROFILING_SAMPLE_RATE = float(os.getenv("HOMEPAGE_PROFILING_SAMPLE_RATE", "0.1"))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {"homepage.profiling": {"handlers": ["console"], "level": "INFO"}},
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
@@ -134,6 +180,20 @@ STATIC_ROOT = "/opt/app/assets/"
 STATICFILES_DIRS = [
     "homepage/static",
 ]
+# collectstatic bundles and minifies the scripts and stylesheets, hashes the file names and precompresses the files
+# (see homepage/assets.py). nginx serves them with far-future caching.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "homepage.assets.BundlingStaticFilesStorage"},
+}
+
+# Uploaded files (e.g. the thumbnails of articles and projects and their resized variants)
+
+MEDIA_URL = "/media/"
+MEDIA_ROOT = "/opt/app/media/"
+
+# The resized variants of the thumbnails are created by a thread pool of every worker process (see homepage/images.py).
+HOMEPAGE_THUMBNAIL_WORKERS = int(os.getenv("HOMEPAGE_THUMBNAIL_WORKERS", "2"))
 
 LOGIN_URL = "login"
 LOGOUT_URL = "logout"
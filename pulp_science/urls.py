@@ -13,6 +13,8 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
@@ -21,3 +23,5 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("registration/", include(("django.contrib.auth.urls", "auth"))),
 ]
+# In production the uploaded files are served by nginx. static() only adds the URL pattern if DEBUG is enabled.
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
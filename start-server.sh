@@ -5,7 +5,14 @@ python manage.py migrate
 if [ -n "$DJANGO_SUPERUSER_USERNAME" ] && [ -n "$DJANGO_SUPERUSER_PASSWORD" ] ; then
     python manage.py createsuperuser --no-input
 fi
-(gunicorn pulp_science.wsgi --user www-data --bind 0.0.0.0:8010 --workers 3) &
+# GUNICORN_WORKERS also sizes the pgbouncer pool of docker-compose.yaml (POSTGRES_POOL_SIZE defaults to it).
+# SERVER_INTERFACE=asgi serves the app by uvicorn workers. The async views don't block a worker while waiting for the
+# database then. The default is the synchronous WSGI worker.
+if [ "$SERVER_INTERFACE" = "asgi" ] ; then
+    (gunicorn pulp_science.asgi:application --worker-class uvicorn.workers.UvicornWorker --user www-data --bind 0.0.0.0:8010 --workers "${GUNICORN_WORKERS:-3}") &
+else
+    (gunicorn pulp_science.wsgi --user www-data --bind 0.0.0.0:8010 --workers "${GUNICORN_WORKERS:-3}") &
+fi
 nginx -g "daemon off;"
 # Gunicorn recommends the number of workers to be set at (2 x $num_cores) + 1.
 # You can read more on configuration of Gunicorn here: http://docs.gunicorn.org/en/stable/design.html
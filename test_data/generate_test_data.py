@@ -2,18 +2,43 @@
 Contains functions to fill in example data into the sqlite database for testing purposes.
 """
 import json
+import os
+import sys
 import traceback
 from datetime import datetime
 from functools import lru_cache
 from pathlib import Path
 from sqlite3 import Connection, Cursor, connect
-from typing import TypedDict
+from typing import Optional, TypedDict
 
 import click
+import django
 from bidict import bidict
 
 DATABASE_PATH = Path(__file__).parents[1] / "test_db/db.sqlite3"
 SAMPLE_CONTENT_PATH = Path(__file__).parent / "sample_content.json"
+WIPED_TABLES = [
+    "homepage_timelineentry",
+    "homepage_searchdocument",
+    "homepage_user_likes",
+    "homepage_user_follows",
+    "homepage_article_related_categories",
+    "homepage_article_related_tags",
+    "homepage_article_related_authors",
+    "homepage_article",
+    "homepage_project_related_categories",
+    "homepage_project_related_tags",
+    "homepage_project_related_authors",
+    "homepage_project",
+    "homepage_comment",
+    "homepage_user",
+    "homepage_category",
+    "homepage_tag",
+    "homepage_versionable",
+    "homepage_followable",
+    "homepage_commentable",
+]
+"The tables emptied by `--wipe` in the order of their dependencies"
 
 
 class SampleContent(TypedDict):
@@ -53,6 +78,26 @@ def load_sample_content() -> list[SampleContent]:
     return json.load(SAMPLE_CONTENT_PATH.open("r"))
 
 
+def allocate_version_group(cursor: Cursor) -> int:
+    """
+    Allocate a new version group from the sequence table (see `homepage.sequences`)
+    Returns: The allocated version group
+    """
+    cursor.execute("UPDATE homepage_version_group_seq SET value = value + 1 WHERE id = 1")
+    return cursor.execute("SELECT value FROM homepage_version_group_seq WHERE id = 1").fetchone()[0]
+
+
+@lru_cache(maxsize=32)
+def get_content_type_id(cursor: Cursor, model: str) -> int:
+    """
+    Get the ID of the content type of a model in the homepage app. It is needed to set the concrete type of the
+    polymorphic super classes (see `homepage.models.PolymorphicMixin`).
+    Returns: The content type ID
+    """
+    cursor.execute("SELECT id FROM django_content_type WHERE app_label = 'homepage' AND model = ?", (model,))
+    return cursor.fetchone()[0]
+
+
 @lru_cache(maxsize=32)
 def create_tags(cursor: Cursor) -> bidict[int, str]:
     """
@@ -95,10 +140,16 @@ def create_users(cursor: Cursor) -> bidict[int, str]:
         ("daniel_son", "Daniel"),
     ]
     inserted_users = bidict()
+    content_type_id = get_content_type_id(cursor, "user")
     for user in users:
-        cursor.execute("INSERT INTO homepage_commentable DEFAULT VALUES")
+        cursor.execute(
+            "INSERT INTO homepage_commentable (commentable_type_id, like_count, comment_count) VALUES (?, 0, 0)",
+            (content_type_id,),
+        )
         commentable_id = cursor.lastrowid
-        cursor.execute("INSERT INTO homepage_followable DEFAULT VALUES")
+        cursor.execute(
+            "INSERT INTO homepage_followable (followable_type_id, follower_count) VALUES (?, 0)", (content_type_id,)
+        )
         followable_id = cursor.lastrowid
         cursor.execute(
             "INSERT INTO homepage_user (alias, name, commentable_ptr_id, followable_ptr_id) VALUES (?, ?, ?, ?)",
@@ -138,10 +189,16 @@ def create_projects(cursor: Cursor) -> bidict[int, str]:
     categories = create_categories(cursor)
     tags = create_tags(cursor)
     inserted_projects = bidict()
+    content_type_id = get_content_type_id(cursor, "project")
     for project in projects:
-        cursor.execute("INSERT INTO homepage_commentable DEFAULT VALUES")
+        cursor.execute(
+            "INSERT INTO homepage_commentable (commentable_type_id, like_count, comment_count) VALUES (?, 0, 0)",
+            (content_type_id,),
+        )
         commentable_id = cursor.lastrowid
-        cursor.execute("INSERT INTO homepage_followable DEFAULT VALUES")
+        cursor.execute(
+            "INSERT INTO homepage_followable (followable_type_id, follower_count) VALUES (?, 0)", (content_type_id,)
+        )
         followable_id = cursor.lastrowid
         cursor.execute(
             "INSERT INTO homepage_project ("
@@ -183,17 +240,19 @@ def create_articles(cursor: Cursor) -> bidict[int, str]:
     categories = create_categories(cursor)
     tags = create_tags(cursor)
     inserted_articles = bidict()
-    max_versionable_group_result = cursor.execute("SELECT MAX(version_group) FROM homepage_versionable").fetchone()
-    version_group = max_versionable_group_result[0] + 1 if max_versionable_group_result[0] is not None else 1
+    content_type_id = get_content_type_id(cursor, "article")
     for article in sample_content:
-        cursor.execute("INSERT INTO homepage_commentable DEFAULT VALUES")
+        cursor.execute(
+            "INSERT INTO homepage_commentable (commentable_type_id, like_count, comment_count) VALUES (?, 0, 0)",
+            (content_type_id,),
+        )
         commentable_id = cursor.lastrowid
         created_at = datetime.strptime(article["date"], "%d/%m/%Y")
         cursor.execute(
-            "INSERT INTO homepage_versionable (version_group, version_number, created)  VALUES (?, ?, ?)",
-            (version_group, 1, created_at),
+            "INSERT INTO homepage_versionable (version_group, version_number, created, versionable_type_id, is_latest) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (allocate_version_group(cursor), 1, created_at, content_type_id, True),
         )
-        version_group += 1
         versionable_id = cursor.lastrowid
         cursor.execute(
             "INSERT INTO homepage_article ("
@@ -236,21 +295,8 @@ def wipe_database(cursor: Cursor):
     """
     Wipe the database
     """
-    cursor.execute("DELETE FROM homepage_article_related_categories")
-    cursor.execute("DELETE FROM homepage_article_related_tags")
-    cursor.execute("DELETE FROM homepage_article_related_authors")
-    cursor.execute("DELETE FROM homepage_article")
-    cursor.execute("DELETE FROM homepage_project_related_categories")
-    cursor.execute("DELETE FROM homepage_project_related_tags")
-    cursor.execute("DELETE FROM homepage_project_related_authors")
-    cursor.execute("DELETE FROM homepage_project")
-    cursor.execute("DELETE FROM homepage_comment")
-    cursor.execute("DELETE FROM homepage_user")
-    cursor.execute("DELETE FROM homepage_category")
-    cursor.execute("DELETE FROM homepage_tag")
-    cursor.execute("DELETE FROM homepage_versionable")
-    cursor.execute("DELETE FROM homepage_followable")
-    cursor.execute("DELETE FROM homepage_commentable")
+    for table in WIPED_TABLES:
+        cursor.execute(f"DELETE FROM {table}")
 
 
 def generate_test_data(wipe: bool):
@@ -285,13 +331,41 @@ def generate_test_data(wipe: bool):
     print("Done.")
 
 
+def generate_scaled_test_data(wipe: bool, scale: float, seed: int, batch_size: int, use_copy: Optional[bool]):
+    """
+    Generate a large synthetic data set (see `scale.py`). Unlike `generate_test_data`, it uses the database configured
+    in the django settings, i.e. it works for SQLite and PostgreSQL.
+    """
+    sys.path.insert(0, str(Path(__file__).parents[1]))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "pulp_science.settings")
+    django.setup()
+    # The models can only be imported after django is set up
+    # pylint: disable=import-outside-toplevel
+    import scale as scaled_data
+
+    if wipe:
+        print("Wiping database.")
+        scaled_data.wipe_database(WIPED_TABLES)
+    scaled_data.generate_scaled_test_data(scale, seed, batch_size, use_copy)
+    print("Done.")
+
+
 @click.command()
 @click.option("--wipe", is_flag=True, help="Wipe the database before generating test data.")
-def click_generate_test_data(wipe: bool):
+@click.option("--scale", type=float, help="Generate a synthetic data set of this scale instead of the sample content.")
+@click.option("--seed", default=42, help="The seed of the random generator of the synthetic data set.")
+@click.option("--batch-size", default=5000, help="The number of rows written at once for the synthetic data set.")
+@click.option("--copy/--no-copy", "use_copy", default=None, help="Write the synthetic data set by COPY (PostgreSQL).")
+def click_generate_test_data(wipe: bool, scale: Optional[float], seed: int, batch_size: int, use_copy: Optional[bool]):
     """
     Click command to generate test data.
+    One unit of `--scale` are 10,000 users, 500 projects and 20,000 articles with their versions, comments, likes and
+    follows. The database can be SQLite or PostgreSQL in this mode.
     """
-    generate_test_data(wipe)
+    if scale is None:
+        generate_test_data(wipe)
+    else:
+        generate_scaled_test_data(wipe, scale, seed, batch_size, use_copy)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,644 @@
+"""
+Contains the generation of large synthetic data sets for load testing and capacity planning.
+Unlike the sample content, the data is written through the database connection of django (i.e. SQLite or PostgreSQL,
+depending on the settings) and in batches: PostgreSQL is filled by COPY, other databases by `executemany`.
+The distributions are skewed like on a real platform: Few users write most articles and comments, few users and
+projects have most followers and few articles get most likes and comments. All random values are drawn from a seeded
+generator, i.e. the same seed and scale create the same data set.
+Django has to be set up before this module is imported.
+"""
+import io
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from typing import Callable, Optional, Sequence
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from homepage import counters, revisions, search, timeline
+from homepage.models import (
+    Article,
+    Category,
+    Comment,
+    Commentable,
+    Followable,
+    Project,
+    Tag,
+    User,
+    Versionable,
+    Visibility,
+    format_path_segment,
+)
+from homepage.sequences import VERSION_GROUP_SEQUENCE, next_values
+
+USERS = 10_000
+"The number of users per unit of the scale. The numbers of projects and articles are scaled alike."
+PROJECTS = 500
+ARTICLES = 20_000
+AUTHOR_SHARE = 0.1
+"The share of the users writing articles and leading projects"
+TAGS = 200
+CATEGORIES = ["physics", "biology", "chemistry", "informatics", "mathematics"]
+PROJECT_SHARE = 0.7
+"The share of the articles belonging to a project"
+NEW_VERSION_PROBABILITY = 0.35
+"The probability of every version of an article to have a newer version"
+REPLY_PROBABILITY = 0.5
+"The probability of a comment to reply to another comment instead of the article"
+MEAN_COMMENTS = 3.0
+"The mean number of comments per article"
+MEAN_ARTICLE_LIKES = 10.0
+MEAN_COMMENT_LIKES = 0.5
+MEAN_FOLLOWS = 10.0
+"The mean number of users and projects followed by a user"
+PARETO_ALPHA = 1.5
+"The shape of the Pareto distribution of the counts above. The smaller, the more skewed."
+VISIBILITY_WEIGHTS = {
+    Visibility.PUBLIC: 70,
+    Visibility.USER: 15,
+    Visibility.FOLLOWER: 8,
+    Visibility.REVIEW: 4,
+    Visibility.PRIVATE: 3,
+}
+START = datetime(2020, 1, 1, tzinfo=timezone.utc)
+"The creation date of the first article. It is fixed to keep the data set reproducible."
+DURATION = timedelta(days=3 * 365)
+"The time span over which the articles are created"
+SYLLABLES = ["ka", "lo", "mi", "ne", "qua", "ri", "su", "ton", "vel", "xa", "yo", "zen", "ph", "or", "an", "ex"]
+"The syllables of the pseudo words of the generated texts (see `make_vocabulary`)"
+
+TIMELINE_SOURCES = """
+SELECT v.versionable_id AS item_id, v.created, p.followable_ptr_id AS source_id
+FROM homepage_versionable v
+JOIN homepage_article a ON a.versionable_ptr_id = v.versionable_id
+JOIN homepage_project p ON p.id = a.related_project_id
+WHERE v.version_number = 1 AND v.versionable_id >= %s
+UNION ALL
+SELECT v.versionable_id, v.created, u.followable_ptr_id
+FROM homepage_versionable v
+JOIN homepage_article a ON a.versionable_ptr_id = v.versionable_id
+JOIN homepage_article_related_authors ra ON ra.article_id = a.id
+JOIN homepage_user u ON u.id = ra.user_id
+WHERE v.version_number = 1 AND v.versionable_id >= %s
+UNION ALL
+SELECT v.versionable_id, v.created, u.followable_ptr_id
+FROM homepage_versionable v
+JOIN homepage_comment c ON c.versionable_ptr_id = v.versionable_id
+JOIN homepage_user u ON u.id = c.written_by_id
+WHERE v.version_number = 1 AND v.versionable_id >= %s
+"""
+TIMELINE_INSERT = f"""
+INSERT INTO homepage_timelineentry (owner_id, item_id, source_id, created)
+SELECT owner_id, item_id, source_id, created FROM (
+    SELECT candidate.*, ROW_NUMBER() OVER (PARTITION BY owner_id ORDER BY created DESC, item_id DESC) AS position
+    FROM (
+        SELECT follow.user_id AS owner_id, source.item_id, MIN(source.source_id) AS source_id, source.created
+        FROM ({TIMELINE_SOURCES}) source
+        JOIN homepage_followable followable ON followable.followable_id = source.source_id
+        JOIN homepage_user_follows follow ON follow.followable_id = source.source_id
+        WHERE followable.follower_count <= %s
+        GROUP BY follow.user_id, source.item_id, source.created
+    ) candidate
+) ranked WHERE position <= %s
+"""
+"Does the fan-out on write of `homepage.timeline` for all new articles and comments at once."
+
+
+def zipf_cum_weights(count: int) -> list[float]:
+    """
+    Returns the cumulative weights of a Zipf distribution for `random.choices`: The n-th item is chosen 1/n as often
+    as the first one.
+    """
+    return list(accumulate(1 / rank for rank in range(1, count + 1)))
+
+
+def skewed_count(rng: random.Random, mean: float, limit: int) -> int:
+    """
+    Draws a count from a Pareto distribution with roughly the given mean: Most counts are small, few are very large.
+    """
+    return min(int(rng.paretovariate(PARETO_ALPHA) * mean * (PARETO_ALPHA - 1) / PARETO_ALPHA), limit)
+
+
+def make_vocabulary(rng: random.Random, size: int) -> list[str]:
+    """
+    Creates `size` distinct pseudo words of two to four `SYLLABLES` in random order.
+    """
+    words: set[str] = set()
+    while len(words) < size:
+        words.add("".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    vocabulary = sorted(words)
+    rng.shuffle(vocabulary)
+    return vocabulary
+
+
+class TextGenerator:
+    """
+    Creates random texts whose words follow a Zipf distribution like natural language.
+    """
+
+    def __init__(self, rng: random.Random, vocabulary_size: int = 5000) -> None:
+        self.rng = rng
+        self.vocabulary = make_vocabulary(rng, vocabulary_size)
+        self.cum_weights = zipf_cum_weights(vocabulary_size)
+
+    def words(self, count: int) -> str:
+        """
+        Returns `count` random words separated by spaces.
+        """
+        return " ".join(self.rng.choices(self.vocabulary, cum_weights=self.cum_weights, k=count))
+
+    def title(self, max_length: int = 64) -> str:
+        """
+        Returns a random title.
+        """
+        return self.words(self.rng.randint(3, 8)).capitalize()[:max_length].strip()
+
+    def paragraph(self) -> str:
+        """
+        Returns a random paragraph.
+        """
+        return self.words(self.rng.randint(20, 60)).capitalize() + "."
+
+    def edit(self, paragraphs: list[str]) -> list[str]:
+        """
+        Returns the paragraphs of the next version of a text: One paragraph is rewritten or a new one is appended.
+        """
+        edited = list(paragraphs)
+        if self.rng.random() < 0.5:
+            edited.append(self.paragraph())
+        else:
+            edited[self.rng.randrange(len(edited))] = self.paragraph()
+        return edited
+
+
+def format_copy_value(value) -> str:
+    """
+    Formats a value for the text format of PostgreSQL's COPY.
+    """
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, bytes):
+        return "\\\\x" + value.hex()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, str):
+        return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+    return str(value)
+
+
+class RowWriter:
+    """
+    Buffers rows per table and writes them in batches. PostgreSQL is written by COPY, other databases by
+    `executemany`. The foreign keys created by django are deferred, i.e. the order in which the tables are written
+    doesn't matter as long as all rows are written in the same transaction.
+    """
+
+    def __init__(self, batch_size: int, use_copy: Optional[bool] = None) -> None:
+        self.batch_size = batch_size
+        self.use_copy = connection.vendor == "postgresql" if use_copy is None else use_copy
+        self.columns: dict[str, Sequence[str]] = {}
+        self.rows: dict[str, list[tuple]] = defaultdict(list)
+        self.written = 0
+        "The number of written rows"
+
+    def add(self, table: str, columns: Sequence[str], row: tuple) -> None:
+        """
+        Adds a row to the buffer of the table. The buffer is written once it is full.
+        """
+        self.columns[table] = columns
+        self.rows[table].append(row)
+        if len(self.rows[table]) >= self.batch_size:
+            self.flush(table)
+
+    def flush(self, table: Optional[str] = None) -> None:
+        """
+        Writes the buffered rows of the table or of all tables if no table is given.
+        """
+        for name in [table] if table else list(self.rows):
+            rows, self.rows[name] = self.rows[name], []
+            if not rows:
+                continue
+            columns = self.columns[name]
+            with connection.cursor() as cursor:
+                if self.use_copy:
+                    self._copy(cursor.cursor, name, columns, rows)
+                else:
+                    placeholders = ", ".join(["%s"] * len(columns))
+                    cursor.executemany(f"INSERT INTO {name} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+            self.written += len(rows)
+
+    @staticmethod
+    def _copy(cursor, table: str, columns: Sequence[str], rows: list[tuple]) -> None:
+        data = "".join("\t".join(format_copy_value(value) for value in row) + "\n" for row in rows)
+        sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+        if hasattr(cursor, "copy_expert"):
+            # psycopg2
+            cursor.copy_expert(sql, io.StringIO(data))
+        else:
+            # psycopg 3
+            with cursor.copy(sql) as copy:
+                copy.write(data)
+
+
+class ScaledDataGenerator:
+    """
+    Generates a synthetic data set of the given scale. One unit of the scale are `USERS` users, `PROJECTS` projects and
+    `ARTICLES` articles with their versions, comments, likes and follows.
+    The IDs of the new rows are allocated after the existing ones by the generator itself. This way, the rows of the
+    multi-table inheritance can be linked without reading them back.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, scale: float, seed: int, batch_size: int, use_copy: Optional[bool] = None) -> None:
+        self.scale = scale
+        self.rng = random.Random(seed)
+        self.text = TextGenerator(self.rng)
+        self.writer = RowWriter(batch_size, use_copy)
+        self.batch_size = batch_size
+        self.next_ids: dict[str, int] = {}
+        with connection.cursor() as cursor:
+            for table, column in (
+                ("homepage_commentable", "commentable_id"),
+                ("homepage_followable", "followable_id"),
+                ("homepage_versionable", "versionable_id"),
+                ("homepage_user", "id"),
+                ("homepage_project", "id"),
+                ("homepage_article", "id"),
+                ("homepage_comment", "id"),
+            ):
+                cursor.execute(f"SELECT COALESCE(MAX({column}), 0) FROM {table}")
+                self.next_ids[table] = cursor.fetchone()[0] + 1
+        self.first_versionable_id = self.next_ids["homepage_versionable"]
+        self.content_types = {
+            model: ContentType.objects.get_for_model(model).pk for model in (User, Project, Article, Comment)
+        }
+        self.version_groups: list[int] = []
+        self.users: list[tuple[int, int, int]] = []
+        "The IDs (user, commentable, followable) of the users ordered by their popularity, i.e. number of followers"
+        self.active_users: list[int] = []
+        "The IDs of the users ordered by their activity, i.e. number of comments and likes"
+        self.authors: list[int] = []
+        "The IDs of the users writing articles ordered by their activity"
+        self.projects: list[tuple[int, int]] = []
+        "The IDs (project, followable) of the projects ordered by their popularity"
+        self.tags: list[int] = []
+        self.categories: list[int] = []
+        self.weights: dict[str, list[float]] = {}
+        "The cumulative Zipf weights of the lists above by their name"
+
+    def count(self, count_per_scale: int) -> int:
+        """
+        Returns the number of entities for the scale.
+        """
+        return max(round(count_per_scale * self.scale), 1)
+
+    def generate(self) -> None:
+        """
+        Generates the whole data set and reports the throughput of every step.
+        """
+        start = time.perf_counter()
+        self._step("Creating tags and categories", self.create_taxonomy)
+        self._step("Creating users", self.create_users)
+        self._step("Creating projects", self.create_projects)
+        self._step("Creating articles, comments and likes", self.create_articles)
+        self._step("Creating follows", self.create_follows)
+        self._step("Resetting sequences", self.reset_sequences)
+        self._step("Recounting counters", counters.recount_counters)
+        self._step("Creating timelines", self.create_timelines)
+        self._step("Creating search index", self.create_search_index)
+        print(f"Generated {self.writer.written} rows in {time.perf_counter() - start:.1f}s.")
+
+    def _step(self, name: str, func) -> None:
+        print(f"{name}.")
+        start, written = time.perf_counter(), self.writer.written
+        func()
+        duration = time.perf_counter() - start
+        rows = self.writer.written - written
+        if rows:
+            print(f"  {rows} rows in {duration:.1f}s ({rows / duration:.0f} rows/s)")
+        else:
+            print(f"  done in {duration:.1f}s")
+
+    def _allocate(self, table: str) -> int:
+        value = self.next_ids[table]
+        self.next_ids[table] += 1
+        return value
+
+    def _allocate_version_group(self) -> int:
+        if not self.version_groups:
+            self.version_groups = next_values(VERSION_GROUP_SEQUENCE, self.batch_size)[::-1]
+        return self.version_groups.pop()
+
+    def _add_commentable(self, model) -> int:
+        commentable_id = self._allocate("homepage_commentable")
+        self.writer.add(
+            "homepage_commentable",
+            ("commentable_id", "commentable_type_id", "like_count", "comment_count"),
+            (commentable_id, self.content_types[model], 0, 0),
+        )
+        return commentable_id
+
+    def _add_followable(self, model) -> int:
+        followable_id = self._allocate("homepage_followable")
+        self.writer.add(
+            "homepage_followable",
+            ("followable_id", "followable_type_id", "follower_count"),
+            (followable_id, self.content_types[model], 0),
+        )
+        return followable_id
+
+    def _add_versionable(self, model, version_group: int, version_number: int, created: datetime, is_latest: bool):
+        # pylint: disable=too-many-arguments
+        versionable_id = self._allocate("homepage_versionable")
+        self.writer.add(
+            "homepage_versionable",
+            ("versionable_id", "versionable_type_id", "version_group", "version_number", "created", "is_latest"),
+            (versionable_id, self.content_types[model], version_group, version_number, created, is_latest),
+        )
+        return versionable_id
+
+    def _choose(self, population: list, cum_weights: list[float], count: int) -> set:
+        return set(self.rng.choices(population, cum_weights=cum_weights, k=count))
+
+    def _write_in_batches(self, count: int, add: Callable[[int], None]) -> None:
+        """
+        Calls `add` with the numbers 0 to `count - 1` and writes the added rows in one transaction per batch.
+        """
+        for start in range(0, count, self.batch_size):
+            with transaction.atomic():
+                for number in range(start, min(start + self.batch_size, count)):
+                    add(number)
+                self.writer.flush()
+
+    def create_taxonomy(self) -> None:
+        """
+        Creates the missing categories and tags.
+        """
+        if not Category.objects.exists():
+            Category.objects.bulk_create([Category(name=name) for name in CATEGORIES])
+        names = [word[:32] for word in self.text.vocabulary[:TAGS]]
+        existing = set(Tag.objects.filter(name__in=names).values_list("name", flat=True))
+        Tag.objects.bulk_create([Tag(name=name) for name in names if name not in existing])
+        self.categories = list(Category.objects.order_by("pk").values_list("pk", flat=True))
+        tags = dict(Tag.objects.filter(name__in=names).values_list("name", "pk"))
+        self.tags = [tags[name] for name in names]
+        self.weights["tags"] = zipf_cum_weights(len(self.tags))
+
+    def create_users(self) -> None:
+        """
+        Creates the users.
+        """
+        self._write_in_batches(self.count(USERS), self._add_user)
+        self.rng.shuffle(self.users)
+        self.active_users = [user_id for user_id, _, _ in self.users]
+        self.rng.shuffle(self.active_users)
+        # The popular users write most articles
+        self.authors = [user_id for user_id, _, _ in self.users[: max(round(len(self.users) * AUTHOR_SHARE), 1)]]
+        self.weights["users"] = self.weights["active_users"] = zipf_cum_weights(len(self.users))
+        self.weights["authors"] = zipf_cum_weights(len(self.authors))
+
+    def _add_user(self, _) -> None:
+        commentable_id = self._add_commentable(User)
+        followable_id = self._add_followable(User)
+        user_id = self._allocate("homepage_user")
+        name = " ".join(word.capitalize() for word in self.rng.sample(self.text.vocabulary, 2))
+        self.writer.add(
+            "homepage_user",
+            ("id", "alias", "name", "commentable_ptr_id", "followable_ptr_id"),
+            (user_id, f"user{user_id}", name[:32], commentable_id, followable_id),
+        )
+        self.users.append((user_id, commentable_id, followable_id))
+
+    def _choose_authors(self) -> set:
+        return self._choose(self.authors, self.weights["authors"], self.rng.randint(1, 3))
+
+    def _add_relations(self, table: str, column: str, entity_id: int, authors: set) -> None:
+        for user_id in authors:
+            self.writer.add(f"{table}_related_authors", (column, "user_id"), (entity_id, user_id))
+        for tag_id in self._choose(self.tags, self.weights["tags"], self.rng.randint(0, 4)):
+            self.writer.add(f"{table}_related_tags", (column, "tag_id"), (entity_id, tag_id))
+        for category_id in set(self.rng.choices(self.categories, k=self.rng.randint(1, 2))):
+            self.writer.add(f"{table}_related_categories", (column, "category_id"), (entity_id, category_id))
+
+    def _choose_visibility(self) -> str:
+        return self.rng.choices(list(VISIBILITY_WEIGHTS), weights=list(VISIBILITY_WEIGHTS.values()))[0]
+
+    def create_projects(self) -> None:
+        """
+        Creates the projects with their authors, tags and categories.
+        """
+        self._write_in_batches(self.count(PROJECTS), self._add_project)
+        self.rng.shuffle(self.projects)
+        self.weights["projects"] = zipf_cum_weights(len(self.projects))
+
+    def _add_project(self, _) -> None:
+        commentable_id = self._add_commentable(Project)
+        followable_id = self._add_followable(Project)
+        project_id = self._allocate("homepage_project")
+        self.writer.add(
+            "homepage_project",
+            ("id", "title", "subtitle", "description", "visibility", "commentable_ptr_id", "followable_ptr_id"),
+            (
+                project_id,
+                self.text.title(),
+                self.text.title(128),
+                self.text.paragraph(),
+                self._choose_visibility(),
+                commentable_id,
+                followable_id,
+            ),
+        )
+        self._add_relations("homepage_project", "project_id", project_id, self._choose_authors())
+        self.projects.append((project_id, followable_id))
+
+    def create_articles(self) -> None:
+        """
+        Creates the articles in the order of their creation. Every article has a random number of versions, comments
+        and likes.
+        """
+        count = self.count(ARTICLES)
+
+        def add(number: int) -> None:
+            created = START + DURATION * number / count + timedelta(seconds=self.rng.randrange(3600))
+            head_commentable_id, created = self._add_article(created)
+            self._add_likes(head_commentable_id, MEAN_ARTICLE_LIKES)
+            self._add_comments(head_commentable_id, created)
+
+        self._write_in_batches(count, add)
+
+    def _add_article(self, created: datetime) -> tuple[int, datetime]:
+        """
+        Adds all versions of an article. Old versions are stored as reverse deltas like `Article.save()` does. All
+        versions have the same authors.
+        :return: The ID of the commentable and the creation date of the newest version
+        """
+        version_group = self._allocate_version_group()
+        project_id = None
+        if self.projects and self.rng.random() < PROJECT_SHARE:
+            project_id = self.rng.choices(self.projects, cum_weights=self.weights["projects"])[0][0]
+        title, visibility, authors = self.text.title(), self._choose_visibility(), self._choose_authors()
+        subtitle = self.text.title(128) if self.rng.random() < 0.7 else None
+        versions = [[self.text.paragraph() for _ in range(self.rng.randint(2, 8))]]
+        while self.rng.random() < NEW_VERSION_PROBABILITY:
+            versions.append(self.text.edit(versions[-1]))
+        texts = ["\n".join(paragraphs) for paragraphs in versions]
+        for index, text in enumerate(texts):
+            version_number = index + 1
+            is_latest = version_number == len(texts)
+            if is_latest or revisions.is_keyframe(version_number):
+                content, content_delta = text, None
+            else:
+                content, content_delta = "", revisions.make_delta(texts[index + 1], text)
+            commentable_id = self._add_commentable(Article)
+            versionable_id = self._add_versionable(Article, version_group, version_number, created, is_latest)
+            article_id = self._allocate("homepage_article")
+            self.writer.add(
+                "homepage_article",
+                (
+                    "id",
+                    "title",
+                    "subtitle",
+                    "content",
+                    "content_delta",
+                    "visibility",
+                    "related_project_id",
+                    "commentable_ptr_id",
+                    "versionable_ptr_id",
+                ),
+                (
+                    article_id,
+                    title,
+                    subtitle,
+                    content,
+                    content_delta,
+                    visibility,
+                    project_id,
+                    commentable_id,
+                    versionable_id,
+                ),
+            )
+            self._add_relations("homepage_article", "article_id", article_id, authors)
+            if not is_latest:
+                created += timedelta(minutes=self.rng.randrange(1, 60 * 24 * 30))
+        return commentable_id, created
+
+    def _add_comments(self, thread_root_id: int, created: datetime) -> None:
+        """
+        Adds the comments of the discussion under an article. Comments reply to the article or to earlier comments.
+        """
+        thread: list[tuple[int, str, datetime]] = []
+        for _ in range(skewed_count(self.rng, MEAN_COMMENTS, 1000)):
+            if thread and self.rng.random() < REPLY_PROBABILITY:
+                commented_on_id, parent_path, parent_created = self.rng.choice(thread)
+            else:
+                commented_on_id, parent_path, parent_created = thread_root_id, "", created
+            comment_created = parent_created + timedelta(minutes=self.rng.randrange(1, 60 * 24 * 7))
+            version_group = self._allocate_version_group()
+            path = parent_path + format_path_segment(version_group)
+            commentable_id = self._add_commentable(Comment)
+            versionable_id = self._add_versionable(Comment, version_group, 1, comment_created, True)
+            self.writer.add(
+                "homepage_comment",
+                (
+                    "id",
+                    "content",
+                    "commented_on_id",
+                    "written_by_id",
+                    "thread_root_id",
+                    "path",
+                    "commentable_ptr_id",
+                    "versionable_ptr_id",
+                ),
+                (
+                    self._allocate("homepage_comment"),
+                    self.text.words(self.rng.randint(5, 40)),
+                    commented_on_id,
+                    self.rng.choices(self.active_users, cum_weights=self.weights["active_users"])[0],
+                    thread_root_id,
+                    path,
+                    commentable_id,
+                    versionable_id,
+                ),
+            )
+            self._add_likes(commentable_id, MEAN_COMMENT_LIKES)
+            thread.append((commentable_id, path, comment_created))
+
+    def _add_likes(self, commentable_id: int, mean: float) -> None:
+        count = skewed_count(self.rng, mean, len(self.active_users))
+        for user_id in self._choose(self.active_users, self.weights["active_users"], count):
+            self.writer.add("homepage_user_likes", ("user_id", "commentable_id"), (user_id, commentable_id))
+
+    def create_follows(self) -> None:
+        """
+        Lets every user follow a random number of popular users and projects.
+        """
+        followables = [followable_id for _, _, followable_id in self.users]
+
+        def add(index: int) -> None:
+            user_id, _, own_followable_id = self.users[index]
+            count = skewed_count(self.rng, MEAN_FOLLOWS, len(followables) - 1)
+            followed = self._choose(followables, self.weights["users"], count)
+            if self.projects and count > 1:
+                projects = self.rng.choices(self.projects, cum_weights=self.weights["projects"], k=count // 5)
+                followed |= {followable_id for _, followable_id in projects}
+            followed.discard(own_followable_id)
+            for followable_id in followed:
+                self.writer.add("homepage_user_follows", ("user_id", "followable_id"), (user_id, followable_id))
+
+        self._write_in_batches(len(self.users), add)
+
+    @staticmethod
+    def reset_sequences() -> None:
+        """
+        Lets the sequences of the databases (e.g. of PostgreSQL) continue after the explicitly set IDs.
+        """
+        models = [Commentable, Followable, Versionable, User, Project, Article, Comment]
+        with connection.cursor() as cursor:
+            for statement in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(statement)
+
+    def create_timelines(self) -> None:
+        """
+        Fills the timelines with the new articles and comments like the fan-out of `homepage.timeline` would have
+        done. Only the newest entries up to the retention are kept.
+        """
+        first_id = self.first_versionable_id
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                TIMELINE_INSERT,
+                [first_id, first_id, first_id, timeline.get_fanout_limit(), timeline.get_retention()],
+            )
+            self.writer.written += cursor.rowcount
+
+    def create_search_index(self) -> None:
+        """
+        Rebuilds the search index, which includes the new articles and projects.
+        """
+        self.writer.written += search.rebuild_index(batch_size=self.batch_size)
+
+
+def wipe_database(tables: Sequence[str]) -> None:
+    """
+    Deletes all rows of the tables.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        for table in tables:
+            cursor.execute(f"DELETE FROM {table}")
+
+
+def generate_scaled_test_data(scale: float, seed: int, batch_size: int, use_copy: Optional[bool] = None) -> None:
+    """
+    Generates a synthetic data set of the given scale.
+    :param scale: One unit of the scale are `USERS` users, `PROJECTS` projects and `ARTICLES` articles
+    :param seed: The seed of the random generator
+    :param batch_size: The number of rows written at once
+    :param use_copy: Whether to write the rows by COPY. Defaults to True on PostgreSQL.
+    """
+    ScaledDataGenerator(scale, seed, batch_size, use_copy).generate()